@@ -0,0 +1,106 @@
+# 파일명: backtest/data_loader.py
+import logging
+import os
+import time
+import numpy as np
+import pandas as pd
+from config import settings
+from strategies.batch_bands import kimchi_premium
+
+logger = logging.getLogger(__name__)
+
+
+def load_market_data(path: str) -> dict:
+    """
+    CSV 또는 Parquet 파일에서 백테스트용 시장 데이터를 읽어 {컬럼명: numpy 배열} 형태로 반환합니다.
+
+    컬럼 이름은 fetch_all_data가 만드는 키와 같아야 합니다.
+    (예: timestamp, usdt_price, usdt_krw_price, eth_usdt_price, krw_eth_price)
+    timestamp 컬럼(또는 DatetimeIndex)은 UTC 기준 timestamp_ms로 변환됩니다.
+    """
+    if path.endswith(".parquet"):
+        frame = pd.read_parquet(path)
+    else:
+        frame = pd.read_csv(path)
+    return frame_to_columns(frame)
+
+
+def frame_to_columns(frame: pd.DataFrame) -> dict:
+    """DataFrame을 백테스트 엔진이 사용하는 컬럼 dict로 변환합니다."""
+    frame = frame.copy()
+
+    if 'timestamp_ms' not in frame.columns:
+        raw = frame.pop('timestamp') if 'timestamp' in frame.columns else frame.index
+        timestamps = pd.DatetimeIndex(pd.to_datetime(raw, utc=True))
+        frame['timestamp_ms'] = (timestamps - pd.Timestamp(0, tz='UTC')) // pd.Timedelta(milliseconds=1)
+
+    frame = frame.sort_values('timestamp_ms').reset_index(drop=True)
+
+    columns = {'timestamp_ms': frame['timestamp_ms'].to_numpy(dtype=np.int64)}
+    for name in frame.columns:
+        if name != 'timestamp_ms':
+            columns[name] = frame[name].to_numpy(dtype=np.float64)
+
+    # 김프 컬럼이 없으면 업비트 USDT 가격과 환율로 계산
+    if 'kimchi_premium' not in columns and 'usdt_price' in columns and 'usdt_krw_price' in columns:
+        columns['kimchi_premium'] = kimchi_premium(columns['usdt_price'], columns['usdt_krw_price'])
+
+    return columns
+
+
+def load_candle_columns(store, exchange: str, ticker: str, interval: str, key: str,
+                        start_ms: int = None, end_ms: int = None) -> dict:
+    """
+    로컬 캔들 저장소(storage/candle_store.py)의 종가를 백테스트 컬럼으로 읽습니다.
+    배열은 메모리 매핑된 상태 그대로 전달되어 필요한 구간만 디스크에서 읽습니다.
+
+    :param key: 종가를 담을 컬럼명 (예: "eth_usdt_price", "usdt_price")
+    """
+    candles = store.read(exchange, ticker, interval, start_ms, end_ms)
+    return {'timestamp_ms': candles['timestamp_ms'], key: candles['close']}
+
+
+def merge_series(series_by_key: dict) -> pd.DataFrame:
+    """
+    서로 다른 주기의 시계열(예: 분봉 가격, 일봉 환율)을 하나의 표로 합칩니다.
+    각 시점에는 그 시점까지 알려진 마지막 값을 사용합니다. (미래 데이터 누수 방지)
+
+    :param series_by_key: {컬럼명: DatetimeIndex를 가진 pd.Series}
+    """
+    frame = pd.concat(series_by_key, axis=1).sort_index().ffill()
+    return frame.dropna()
+
+
+def fetch_ohlcv_cached(upbit_api, ticker: str, interval: str = "minute1", count: int = 200, to: str = None,
+                       cache_dir: str = None, max_age_sec: float = None, refresh: bool = False) -> pd.DataFrame:
+    """
+    UpbitAPI.get_ohlcv 결과를 디스크(CSV)에 캐시하여 반환합니다.
+
+    캐시 키는 (티커, 주기, 개수, 종료 시각)입니다. 종료 시각(to)을 지정한 과거 구간은 바뀌지 않으므로 계속 재사용하고,
+    최신 캔들까지 받은 캐시(to=None)는 max_age_sec가 지나면 다시 다운로드합니다.
+
+    :param to: 이 시각 이전의 캔들까지 조회 (예: "2024-01-01 00:00:00", None이면 최신 캔들까지)
+    :param max_age_sec: to=None 캐시의 유효 시간 (기본: BACKTEST_CACHE_MAX_AGE_SEC)
+    :param refresh: True이면 캐시를 무시하고 다시 다운로드
+    """
+    cache_dir = cache_dir or settings.BACKTEST_CACHE_DIR
+    max_age_sec = settings.BACKTEST_CACHE_MAX_AGE_SEC if max_age_sec is None else max_age_sec
+    os.makedirs(cache_dir, exist_ok=True)
+    end_tag = "latest" if to is None else "".join(ch if ch.isalnum() else "-" for ch in str(to))
+    cache_path = os.path.join(cache_dir, f"{ticker}_{interval}_{count}_{end_tag}.csv")
+
+    if not refresh and os.path.exists(cache_path):
+        if to is not None or time.time() - os.path.getmtime(cache_path) < max_age_sec:
+            return pd.read_csv(cache_path, index_col=0, parse_dates=True)
+        logger.info(f"{ticker} {interval} OHLCV 캐시가 {max_age_sec:.0f}초보다 오래되어 다시 다운로드합니다.")
+
+    frame = upbit_api.get_ohlcv(ticker, interval=interval, count=count, to=to)
+    if frame is None or frame.empty:
+        logger.error(f"{ticker} {interval} OHLCV 데이터를 가져오지 못했습니다.")
+        return None
+
+    # pyupbit는 KST 기준 naive 시각을 반환하므로 시간대를 명시하여 저장
+    if frame.index.tz is None:
+        frame.index = frame.index.tz_localize("Asia/Seoul")
+    frame.to_csv(cache_path)
+    return frame
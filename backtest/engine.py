@@ -0,0 +1,236 @@
+# 파일명: backtest/engine.py
+import numpy as np
+from config import settings
+from core.clock import StepClock
+from core.market_snapshot import ColumnRowView
+from monitoring import log
+from backtest.simulated_order_manager import SimulatedOrderManager
+
+
+class BacktestResult:
+    """백테스트 결과 (체결 내역, 자산 곡선, 요약 지표)"""
+
+    def __init__(self, strategy_name: str, timestamp_ms: np.ndarray, equity_krw: np.ndarray,
+                 trades: list, initial_equity_krw: float, evaluated_rows: int):
+        self.strategy_name = strategy_name
+        self.timestamp_ms = timestamp_ms
+        self.equity_krw = equity_krw
+        self.trades = trades
+        self.initial_equity_krw = initial_equity_krw
+        self.evaluated_rows = evaluated_rows
+
+        self.final_equity_krw = float(equity_krw[-1]) if len(equity_krw) else initial_equity_krw
+        self.pnl_krw = self.final_equity_krw - initial_equity_krw
+        self.pnl_pct = self.pnl_krw / initial_equity_krw * 100.0 if initial_equity_krw else 0.0
+        self.max_drawdown_pct = max_drawdown_percent(equity_krw)
+        self.trade_count = len(trades)
+
+    def summary(self) -> dict:
+        return {
+            'strategy': self.strategy_name,
+            'pnl_krw': self.pnl_krw,
+            'pnl_pct': self.pnl_pct,
+            'max_drawdown_pct': self.max_drawdown_pct,
+            'trade_count': self.trade_count,
+            'final_equity_krw': self.final_equity_krw,
+            'evaluated_rows': self.evaluated_rows,
+            'total_rows': len(self.timestamp_ms),
+        }
+
+
+def max_drawdown_percent(equity: np.ndarray) -> float:
+    """자산 곡선의 최대 낙폭 (%)"""
+    if len(equity) == 0:
+        return 0.0
+    running_max = np.maximum.accumulate(equity)
+    drawdown = (equity - running_max) / np.where(running_max > 0, running_max, 1.0) * 100.0
+    return float(-drawdown.min())
+
+
+class BacktestEngine:
+    """
+    과거 시장 데이터를 기존 전략 클래스에 그대로 흘려 보내는 백테스트 엔진입니다.
+
+    전략 코드는 수정 없이 사용하고, 주문은 SimulatedOrderManager가 가상 잔고로 체결합니다.
+    전략의 시계는 StepClock으로 바꿔 평가하는 행의 시각으로 옮기므로 실제 시간과 무관하게 최대 속도로 실행됩니다.
+    평가는 전략의 evaluate_batch로 한 번에 수행하며, 벡터화된 밴드 키(strategies/batch_bands.py)로
+    '판단이 바뀔 수 있는 행'만 골라 평가하므로 가격이 같은 레벨 구간 안에서 움직이는 대부분의 분봉은 전략 호출 없이 건너뜁니다.
+    밴드 안에서도 판단이 바뀌는 경우(손절가 도달, 김프 전략의 보유 가치 감소로 인한 추가 매수)는 전략의
+    next_batch_candidate가 찾아 주며, 건너뛰기 결과는 compare_with_row_by_row로 모든 행 평가와 비교해 검증합니다.
+    """
+
+    def __init__(self, strategy, columns: dict, initial_krw: float, initial_symbol_balance: float = 0.0,
+                 fee_rate: float = None):
+        self.strategy = strategy
+        self.columns = columns
+        self.clock = StepClock(int(columns['timestamp_ms'][0]) if len(columns['timestamp_ms']) else 0)
+        strategy.clock = self.clock
+        self.symbol = strategy.symbol
+        self._initial_balances = (float(initial_krw), float(initial_symbol_balance))
+        self.order_mgr = SimulatedOrderManager(
+            {'KRW': initial_krw, self.symbol: initial_symbol_balance}, fee_rate=fee_rate)
+        self.fill_prices_krw = self._build_fill_prices()
+        self.initial_equity_krw = initial_krw + initial_symbol_balance * self._first_valid(self.fill_prices_krw)
+
+    def _build_fill_prices(self) -> np.ndarray:
+        """행별 업비트 체결 가격 (KRW). krw_<sym>_price 컬럼이 없으면 USD 가격 x USDT 원화 가격으로 추정"""
+        columns = self.columns
+        if self.symbol == "USDT":
+            return columns['usdt_price']
+
+        krw_key = f"krw_{self.symbol.lower()}_price"
+        if krw_key in columns:
+            return columns[krw_key]
+
+        usd_price = columns[f"{self.symbol.lower()}_usdt_price"]
+        krw_per_usdt = columns.get('usdt_price', columns.get('usdt_krw_price'))
+        return usd_price * krw_per_usdt
+
+    @staticmethod
+    def _first_valid(values: np.ndarray) -> float:
+        valid = values[~np.isnan(values)]
+        return float(valid[0]) if len(valid) else 0.0
+
+    def run(self, quiet: bool = True, row_by_row: bool = False) -> BacktestResult:
+        """
+        :param quiet: True이면 전략 로그를 버려 속도를 높입니다.
+        :param row_by_row: True이면 건너뛰지 않고 모든 행을 전략에 넣습니다. (느리지만 건너뛰기 결과의 검증 기준)
+        """
+        run = self._run_row_by_row if row_by_row else self._run
+        if quiet:
+            with log.silenced():
+                return run()
+        return run()
+
+    def _run(self) -> BacktestResult:
+        krw_balance, symbol_balance = self._initial_balances
+        decisions = self.strategy.evaluate_batch(self.columns, krw_balance, symbol_balance, on_order=self._execute)
+        return BacktestResult(self.strategy.name, self.columns['timestamp_ms'], self._equity_curve(),
+                              self.order_mgr.trades, self.initial_equity_krw, decisions.evaluated_rows)
+
+    def _run_row_by_row(self) -> BacktestResult:
+        """실거래 루프처럼 모든 행마다 determine_action_and_amount를 호출합니다."""
+        krw_balance, symbol_balance = self._initial_balances
+        timestamp_ms = self.columns['timestamp_ms']
+        rows = ColumnRowView(self.columns)
+        for index in range(len(timestamp_ms)):
+            self.clock.set_time_ms(timestamp_ms[index])
+            action, _, amount = self.strategy.determine_action_and_amount(rows.at(index), krw_balance, symbol_balance)
+            if action in ('BUY', 'SELL') and amount > 0:
+                balances = self._execute(index, action, amount)
+                if balances is not None:
+                    krw_balance, symbol_balance = balances
+        return BacktestResult(self.strategy.name, timestamp_ms, self._equity_curve(),
+                              self.order_mgr.trades, self.initial_equity_krw, len(timestamp_ms))
+
+    def _execute(self, index: int, action: str, amount: float):
+        """evaluate_batch의 주문 콜백: 해당 행 가격으로 가상 체결 후 바뀐 잔고 반환 (가격이 없으면 None)"""
+        fill_price = float(self.fill_prices_krw[index])
+        if fill_price != fill_price:
+            return None
+        order_mgr = self.order_mgr
+        order_mgr.set_fill_price(self.symbol, fill_price, index)
+        if order_mgr.execute_market_order(action, amount, symbol=self.symbol) is None:
+            return None
+        balances = order_mgr.get_balance_snapshot()
+        return balances.get('KRW', 0.0), balances.get(self.symbol, 0.0)
+
+    def _equity_curve(self) -> np.ndarray:
+        """체결 내역으로 행별 잔고를 복원하여 자산 곡선(KRW)을 벡터 연산으로 계산합니다."""
+        row_count = len(self.columns['timestamp_ms'])
+        krw = np.empty(row_count)
+        holdings = np.empty(row_count)
+
+        krw_balance, symbol_balance = self._initial_balances
+        last_index = 0
+        for trade in self.order_mgr.trades:
+            trade_index = trade['index']
+            krw[last_index:trade_index] = krw_balance
+            holdings[last_index:trade_index] = symbol_balance
+            if trade['action'] == 'BUY':
+                krw_balance -= trade['krw_amount']
+                symbol_balance += trade['volume']
+            else:
+                krw_balance += trade['krw_amount']
+                symbol_balance -= trade['volume']
+            last_index = trade_index
+        krw[last_index:] = krw_balance
+        holdings[last_index:] = symbol_balance
+
+        # 가격이 비어 있는 행은 직전 가격으로 평가
+        prices = self.fill_prices_krw.copy()
+        mask = np.isnan(prices)
+        if mask.any():
+            valid_index = np.where(~mask, np.arange(row_count), 0)
+            np.maximum.accumulate(valid_index, out=valid_index)
+            prices = prices[valid_index]
+            prices = np.nan_to_num(prices)
+        return krw + holdings * prices
+
+
+def build_strategy(strategy_name: str):
+    """settings.STRATEGY_LIST에서 이름으로 전략 설정을 찾아 전략 인스턴스를 생성합니다."""
+    from strategies.registry import create_strategy
+
+    for config in settings.STRATEGY_LIST:
+        if config['name'] == strategy_name:
+            return create_strategy(config)
+    raise ValueError(f"전략을 찾을 수 없습니다: {strategy_name}")
+
+
+def compare_with_row_by_row(strategy_config: dict, columns: dict, initial_krw: float) -> list:
+    """
+    같은 설정의 전략 두 개로 밴드 키 건너뛰기 백테스트와 모든 행 백테스트를 각각 실행하여 체결 내역을 비교합니다.
+
+    :return: 서로 다른 체결 목록 [(순번, 건너뛰기 체결, 모든 행 체결), ...] (한쪽에만 있으면 None). 일치하면 빈 목록
+    """
+    from strategies.registry import create_strategy
+
+    fast = BacktestEngine(create_strategy(strategy_config), columns, initial_krw).run()
+    naive = BacktestEngine(create_strategy(strategy_config), columns, initial_krw).run(row_by_row=True)
+
+    def key(trade):
+        return trade['index'], trade['action'], trade['volume'], trade['krw_amount']
+
+    mismatches = []
+    for number in range(max(len(fast.trades), len(naive.trades))):
+        fast_trade = fast.trades[number] if number < len(fast.trades) else None
+        naive_trade = naive.trades[number] if number < len(naive.trades) else None
+        if fast_trade is None or naive_trade is None or key(fast_trade) != key(naive_trade):
+            mismatches.append((number, fast_trade, naive_trade))
+    return mismatches
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+    from backtest.data_loader import load_market_data
+
+    parser = argparse.ArgumentParser(description="settings.STRATEGY_LIST의 전략을 과거 데이터로 백테스트합니다.")
+    parser.add_argument("strategy", help="전략 이름 (예: ETH_Trendline_Buy_V1)")
+    parser.add_argument("data", help="시장 데이터 CSV/Parquet 경로")
+    parser.add_argument("--krw", type=float, default=None, help="초기 원화 잔고 (기본: 전략 TOTAL_TRADE_SEED_KRW)")
+    parser.add_argument("--verify", action="store_true", help="모든 행을 평가한 백테스트와 체결 내역이 같은지 확인")
+    args = parser.parse_args()
+    log.setup_logging(to_file=False)
+
+    strategy = build_strategy(args.strategy)
+    columns = load_market_data(args.data)
+    initial_krw = args.krw if args.krw is not None else strategy.params['TOTAL_TRADE_SEED_KRW']
+
+    started = time.time()
+    result = BacktestEngine(strategy, columns, initial_krw).run()
+    elapsed = time.time() - started
+
+    for key, value in result.summary().items():
+        print(f"{key:>18}: {value:,.4f}" if isinstance(value, float) else f"{key:>18}: {value}")
+    print(f"{'elapsed_sec':>18}: {elapsed:.3f}")
+
+    if args.verify:
+        config = next(conf for conf in settings.STRATEGY_LIST if conf['name'] == args.strategy)
+        mismatches = compare_with_row_by_row(config, columns, initial_krw)
+        for number, fast_trade, naive_trade in mismatches[:10]:
+            print(f"  ❌ 체결 #{number}: 건너뛰기 {fast_trade} / 모든 행 {naive_trade}")
+        print(f"{'row_by_row_match':>18}: {not mismatches} (불일치 {len(mismatches)}건)")
+        if mismatches:
+            raise SystemExit(1)
@@ -0,0 +1,281 @@
+# 파일명: backtest/fake_exchange.py
+import logging
+import threading
+from config import settings
+from connectors.external_data import ExternalData
+from connectors.fx_provider import FxQuote
+from connectors.orderbook import OrderBook
+from execution.order_manager import OrderManager
+
+logger = logging.getLogger(__name__)
+
+
+class FakeExchange:
+    """
+    리플레이용 가상 업비트 거래소입니다.
+
+    MarketTimeline(backtest/replay.py)에서 가상 시계의 현재 시각 이전 마지막 값을 시세로 내주고,
+    시장가 주문은 그 시각의 호가창(기록된 호가창, 없으면 현재가 주변의 가상 호가창)을
+    최우선 호가부터 소진하며 즉시 체결합니다. 호가 잔량이 부족하면 남은 주문은 취소(cancel)됩니다.
+    """
+
+    def __init__(self, timeline, clock, initial_balances: dict, fee_rate: float = None):
+        self.timeline = timeline
+        self.clock = clock
+        self.fee_rate = settings.BACKTEST_FEE_RATE if fee_rate is None else fee_rate
+        self.balances = {currency: float(amount) for currency, amount in initial_balances.items()}
+        self.orders = {} # uuid -> 업비트 주문 응답 형식 dict
+        self.trades = []
+        self._order_seq = 0
+        self._lock = threading.Lock()
+
+    # ---------------------------------------------------------
+    # 시세 / 호가
+    # ---------------------------------------------------------
+    def get_price_krw(self, code: str):
+        """마켓(예: "KRW-ETH")의 현재 원화 가격 또는 데이터가 없으면 None"""
+        return self.timeline.price_krw(code.split("-", 1)[1], self.clock.time())
+
+    def get_orderbook(self, code: str):
+        """기록된 호가창 또는 현재가 기준으로 만든 가상 호가창 (가격이 없으면 None)"""
+        now = self.clock.time()
+        book = self.timeline.orderbook_at(code, now)
+        if book is not None:
+            return book
+        price = self.get_price_krw(code)
+        if price is None:
+            return None
+        return synthetic_orderbook(code, price, int(now * 1000))
+
+    # ---------------------------------------------------------
+    # 계좌 / 주문
+    # ---------------------------------------------------------
+    def get_balances(self) -> list:
+        with self._lock:
+            return [{"currency": currency, "balance": str(balance), "locked": "0", "unit_currency": "KRW"}
+                    for currency, balance in self.balances.items()]
+
+    def place_market_order(self, code: str, side: str, price: float = None, volume: float = None):
+        """
+        시장가 주문을 체결합니다.
+
+        :param side: "bid"(price 원화만큼 매수) 또는 "ask"(volume만큼 매도)
+        :return: 업비트 주문 응답 형식 dict 또는 잔고/호가 부족 시 None
+        """
+        symbol = code.split("-", 1)[1]
+        book = self.get_orderbook(code)
+        if book is None:
+            logger.error(f"[리플레이] {code} 시세가 없어 주문을 체결할 수 없습니다.")
+            return None
+
+        with self._lock:
+            krw_balance = self.balances.get('KRW', 0.0)
+            symbol_balance = self.balances.get(symbol, 0.0)
+
+            if side == "bid":
+                # 업비트 시장가 매수: 주문 금액과 별도로 수수료를 원화 잔고에서 차감
+                if price is None or price <= 0 or price * (1 + self.fee_rate) > krw_balance + 1e-6:
+                    logger.error(f"[리플레이] {code} 매수 잔고 부족 (주문 {price}, 잔고 {krw_balance:,.0f} KRW)")
+                    return None
+                executed_volume, executed_funds = _fill_by_funds(book.ask_prices, book.ask_sizes, price)
+                fee = executed_funds * self.fee_rate
+                self.balances['KRW'] = krw_balance - executed_funds - fee
+                self.balances[symbol] = symbol_balance + executed_volume
+                state = "done" if executed_funds >= price - 1e-6 else "cancel"
+            elif side == "ask":
+                if volume is None or volume <= 0 or volume > symbol_balance + 1e-12:
+                    logger.error(f"[리플레이] {code} 매도 잔고 부족 (주문 {volume}, 잔고 {symbol_balance})")
+                    return None
+                executed_volume, executed_funds = _fill_by_volume(book.bid_prices, book.bid_sizes, volume)
+                fee = executed_funds * self.fee_rate
+                self.balances[symbol] = symbol_balance - executed_volume
+                self.balances['KRW'] = krw_balance + executed_funds - fee
+                state = "done" if executed_volume >= volume - 1e-12 else "cancel"
+            else:
+                return None
+
+            self._order_seq += 1
+            uuid = f"REPLAY-{self._order_seq}"
+            order = {
+                'uuid': uuid,
+                'side': side,
+                'ord_type': "price" if side == "bid" else "market",
+                'market': code,
+                'price': None if price is None else str(price),
+                'volume': None if volume is None else str(volume),
+                'state': state,
+                'executed_volume': str(executed_volume),
+                'executed_funds': str(executed_funds),
+                'paid_fee': str(fee),
+                'created_at_ms': int(self.clock.time() * 1000),
+            }
+            self.orders[uuid] = order
+            self.trades.append({
+                'uuid': uuid,
+                'timestamp_ms': order['created_at_ms'],
+                'action': "BUY" if side == "bid" else "SELL",
+                'symbol': symbol,
+                'price': executed_funds / executed_volume if executed_volume > 0 else 0.0,
+                'volume': executed_volume,
+                'krw_amount': executed_funds,
+                'fee': fee,
+            })
+            return dict(order)
+
+    def get_orders(self, uuids) -> list:
+        with self._lock:
+            return [dict(self.orders[uuid]) for uuid in uuids if uuid in self.orders]
+
+    def equity_krw(self) -> float:
+        """현재 시세로 평가한 총 자산 (KRW)"""
+        now = self.clock.time()
+        with self._lock:
+            balances = dict(self.balances)
+        total = balances.pop('KRW', 0.0)
+        for currency, balance in balances.items():
+            price = self.timeline.price_krw(currency, now)
+            if balance and price is not None:
+                total += balance * price
+        return total
+
+
+class FakeUpbitAPI:
+    """UpbitAPI와 같은 메서드를 FakeExchange로 처리하는 가짜 커넥터 (네트워크 요청 없음)"""
+
+    def __init__(self, exchange: FakeExchange):
+        self.exchange = exchange
+
+    def get_usdt_krw_price(self):
+        return self.get_current_price("KRW-USDT")
+
+    def get_current_price(self, ticker):
+        return self.exchange.get_price_krw(ticker)
+
+    def get_orderbooks(self, tickers):
+        books = {}
+        for code in tickers:
+            book = self.exchange.get_orderbook(code)
+            if book is not None:
+                books[code] = book
+        return books
+
+    def has_credentials(self) -> bool:
+        return True
+
+    def get_balances(self):
+        return self.exchange.get_balances()
+
+    def buy_market_order(self, ticker, price):
+        return self.exchange.place_market_order(ticker, "bid", price=float(price))
+
+    def sell_market_order(self, ticker, volume):
+        return self.exchange.place_market_order(ticker, "ask", volume=float(volume))
+
+    def get_orders_by_uuids(self, uuids):
+        return self.exchange.get_orders(uuids)
+
+    def get_order(self, uuid):
+        orders = self.exchange.get_orders([uuid])
+        return orders[0] if orders else None
+
+
+class ReplayFxProvider:
+    """FxRateProvider 대신 타임라인의 usdt_krw_price(USD/KRW 환율) 컬럼을 내주는 환율 제공자"""
+
+    def __init__(self, timeline, clock):
+        self.timeline = timeline
+        self.clock = clock
+        self.refresh_interval_sec = settings.FX_REFRESH_INTERVAL_SEC
+
+    def get_quote(self):
+        now = self.clock.time()
+        sample = self.timeline.sample_at('usdt_krw_price', now)
+        if sample is None:
+            return None
+        rate, timestamp_ms = sample
+        return FxQuote(rate, "replay", timestamp_ms / 1000, clock=self.clock)
+
+    def refresh(self):
+        return self.get_quote()
+
+
+class FakeExternalData(ExternalData):
+    """바이낸스 가격과 환율을 타임라인에서 읽는 ExternalData (김프 계산 등 나머지 동작은 그대로 사용)"""
+
+    def __init__(self, timeline, clock):
+        super().__init__(fx_provider=ReplayFxProvider(timeline, clock), clock=clock)
+        self.timeline = timeline
+        self.clock = clock
+
+    def get_binance_price(self, symbol):
+        return self.timeline.value_at(_binance_key(symbol), self.clock.time())
+
+    def get_binance_prices(self, symbols):
+        now = self.clock.time()
+        return {symbol: self.timeline.value_at(_binance_key(symbol), now) for symbol in dict.fromkeys(symbols)}
+
+
+class FakeOrderManager(OrderManager):
+    """
+    주문을 항상 FakeUpbitAPI로 보내는 OrderManager입니다.
+    (IS_SIMULATION / API 키 미설정 분기 없이 가상 거래소에서 체결, 잔고 캐시와 지표는 그대로 사용)
+    """
+
+    def _send_market_order(self, action: str, amount: float, symbol: str):
+        ticker = f"KRW-{symbol}"
+        if action == 'BUY':
+            result = self.upbit_api.buy_market_order(ticker, amount)
+        elif action == 'SELL':
+            result = self.upbit_api.sell_market_order(ticker, amount)
+        else:
+            logger.error(f"알 수 없는 주문 액션: {action}")
+            return None
+        if result is not None:
+            logger.info(f"[ORDER] (리플레이) {action} {symbol} 체결: 수량 {float(result['executed_volume']):,.8f}, "
+                        f"금액 {float(result['executed_funds']):,.0f} KRW")
+        return result
+
+
+def synthetic_orderbook(code: str, price: float, timestamp_ms: int = None, levels: int = None) -> OrderBook:
+    """
+    현재가 주변에 REPLAY_BOOK_* 설정대로 호가를 깔아 만든 가상 호가창입니다.
+    (호가창 기록이 없는 구간에서도 주문 분할/슬리피지 로직이 동작하도록)
+    """
+    levels = levels or settings.REPLAY_BOOK_LEVELS
+    half_spread = settings.REPLAY_BOOK_SPREAD_PCT / 2 / 100.0
+    step = settings.REPLAY_BOOK_LEVEL_STEP_PCT / 100.0
+    size = settings.REPLAY_BOOK_LEVEL_KRW / price
+    asks = [(price * (1 + half_spread + step * index), size) for index in range(levels)]
+    bids = [(price * (1 - half_spread - step * index), size) for index in range(levels)]
+    return OrderBook(code, asks=asks, bids=bids, timestamp_ms=timestamp_ms)
+
+
+def _binance_key(symbol: str) -> str:
+    """"ETHUSDT" -> "eth_usdt_price" (fetch_all_data가 만드는 키 형식)"""
+    return f"{symbol[:-4].lower()}_usdt_price" if symbol.endswith("USDT") else f"{symbol.lower()}_price"
+
+
+def _fill_by_funds(prices, sizes, funds: float):
+    """매도 호가를 최우선부터 소진하며 funds 원화만큼 매수 -> (체결 수량, 체결 금액)"""
+    volume = spent = 0.0
+    for price, size in zip(prices, sizes):
+        remaining = funds - spent
+        if remaining <= 0:
+            break
+        take = min(size, remaining / price)
+        volume += take
+        spent += take * price
+    return volume, spent
+
+
+def _fill_by_volume(prices, sizes, volume: float):
+    """매수 호가를 최우선부터 소진하며 volume만큼 매도 -> (체결 수량, 체결 금액)"""
+    filled = funds = 0.0
+    for price, size in zip(prices, sizes):
+        remaining = volume - filled
+        if remaining <= 0:
+            break
+        take = min(size, remaining)
+        filled += take
+        funds += take * price
+    return filled, funds
@@ -0,0 +1,176 @@
+# 파일명: backtest/optimizer.py
+import copy
+import csv
+import itertools
+import json
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from config import settings
+from backtest.engine import BacktestEngine
+from monitoring import log
+
+# 레벨 목록 전체를 같은 값만큼 평행 이동시키는 가상 파라미터 -> 실제 파라미터 이름
+LEVEL_OFFSET_PARAMS = {
+    "BUY_LEVELS_OFFSET": "BUY_LEVELS",
+    "SELL_LEVELS_OFFSET": "SELL_LEVELS",
+    "SELL_PLAN_OFFSET": "SELL_PLAN",
+}
+
+# 실패한 조합은 error 열에 예외 메시지를 남김 (성공한 조합은 빈 값)
+RESULT_FIELDS = ['rank', 'pnl_krw', 'pnl_pct', 'max_drawdown_pct', 'trade_count', 'final_equity_krw', 'error']
+
+
+def expand_values(spec):
+    """
+    파라미터 범위 정의를 값 목록으로 펼칩니다.
+
+    - 리스트: 그대로 사용 (예: [1.5, 2.0, 2.5])
+    - dict: {"start": -0.5, "stop": 0.5, "step": 0.25} -> stop 포함 등간격 값
+    """
+    if isinstance(spec, dict):
+        count = int(round((spec['stop'] - spec['start']) / spec['step'])) + 1
+        return [round(spec['start'] + spec['step'] * i, 10) for i in range(count)]
+    return list(spec)
+
+
+def expand_grid(param_ranges: dict) -> list:
+    """{파라미터: 범위} 를 모든 조합의 {파라미터: 값} 목록으로 펼칩니다."""
+    names = list(param_ranges)
+    value_lists = [expand_values(param_ranges[name]) for name in names]
+    return [dict(zip(names, values)) for values in itertools.product(*value_lists)]
+
+
+def apply_overrides(base_config: dict, overrides: dict) -> dict:
+    """전략 설정 사본에 파라미터 조합을 적용합니다. (*_OFFSET은 레벨 값을 평행 이동)"""
+    config = copy.deepcopy(base_config)
+    params = config['params']
+    for name, value in overrides.items():
+        if name in LEVEL_OFFSET_PARAMS:
+            target = LEVEL_OFFSET_PARAMS[name]
+            params[target] = [(level + value, ratio) for level, ratio in params[target]]
+        else:
+            params[name] = value
+    return config
+
+
+class SharedColumns:
+    """
+    시장 데이터 컬럼을 임시 디렉터리의 .npy 파일로 한 번만 기록하고,
+    워커 프로세스는 np.load(mmap_mode='r')로 메모리 매핑하여 복사 없이 공유합니다.
+    (모든 워커가 OS 페이지 캐시의 같은 물리 메모리를 읽음)
+    """
+
+    def __init__(self, columns: dict):
+        self.directory = tempfile.mkdtemp(prefix="sweep_")
+        self.names = list(columns)
+        for name, values in columns.items():
+            np.save(os.path.join(self.directory, f"{name}.npy"), np.ascontiguousarray(values))
+
+    @staticmethod
+    def attach(directory: str, names) -> dict:
+        return {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode='r') for name in names}
+
+    def close(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+# 워커 프로세스 전역 상태 (initializer에서 한 번만 설정)
+_worker_columns = None
+_worker_base_config = None
+_worker_initial_krw = None
+
+
+def _init_worker(directory: str, names, base_config: dict, initial_krw: float):
+    global _worker_columns, _worker_base_config, _worker_initial_krw
+    _worker_columns = SharedColumns.attach(directory, names)
+    _worker_base_config = base_config
+    _worker_initial_krw = initial_krw
+
+
+def _run_combination(overrides: dict) -> dict:
+    from strategies.registry import create_strategy
+
+    config = apply_overrides(_worker_base_config, overrides)
+    with log.silenced():
+        try:
+            strategy = create_strategy(config)
+            summary = BacktestEngine(strategy, _worker_columns, _worker_initial_krw).run(quiet=False).summary()
+        except Exception as e:
+            summary = {'pnl_krw': float('nan'), 'pnl_pct': float('nan'), 'max_drawdown_pct': float('nan'),
+                       'trade_count': 0, 'final_equity_krw': float('nan'), 'error': str(e)}
+    summary.update(overrides)
+    return summary
+
+
+def run_sweep(base_config: dict, columns: dict, param_ranges: dict, initial_krw: float,
+              max_workers: int = None) -> list:
+    """
+    모든 파라미터 조합을 프로세스 풀에서 병렬로 백테스트하고, 수익률 순으로 정렬된 결과를 반환합니다.
+    """
+    combinations = expand_grid(param_ranges)
+    max_workers = max_workers or os.cpu_count()
+    shared = SharedColumns(columns)
+
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                 initargs=(shared.directory, shared.names, base_config, initial_krw)) as executor:
+            chunksize = max(1, len(combinations) // (max_workers * 8))
+            results = list(executor.map(_run_combination, combinations, chunksize=chunksize))
+    finally:
+        shared.close()
+
+    # 수익률 내림차순, 같으면 낙폭이 작은 순 (실패한 조합은 맨 뒤)
+    results.sort(key=lambda r: (-np.nan_to_num(r['pnl_pct'], nan=-np.inf), np.nan_to_num(r['max_drawdown_pct'], nan=np.inf)))
+    for rank, result in enumerate(results, start=1):
+        result['rank'] = rank
+    return results
+
+
+def write_results(results: list, param_names, path: str):
+    """순위표를 CSV로 저장합니다."""
+    fields = RESULT_FIELDS + list(param_names)
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fields, extrasaction='ignore')
+        writer.writeheader()
+        for result in results:
+            writer.writerow(result)
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+    from backtest.data_loader import load_market_data
+
+    parser = argparse.ArgumentParser(description="전략 파라미터 조합을 병렬 백테스트하여 순위표를 만듭니다.")
+    parser.add_argument("spec", help='스윕 정의 JSON (예: {"strategy": "USDT_Kimp_Grid_V1", "data": "bars.csv", '
+                                     '"params": {"SELL_BASE_RESET_THRESHOLD": [1.5, 2.0], '
+                                     '"BUY_LEVELS_OFFSET": {"start": -0.5, "stop": 0.5, "step": 0.25}}})')
+    parser.add_argument("--out", default="sweep_results.csv", help="결과 CSV 경로")
+    parser.add_argument("--workers", type=int, default=None, help="워커 프로세스 수 (기본: CPU 코어 수)")
+    parser.add_argument("--top", type=int, default=10, help="화면에 출력할 상위 결과 개수")
+    args = parser.parse_args()
+    log.setup_logging(to_file=False)
+
+    with open(args.spec) as f:
+        spec = json.load(f)
+
+    base_config = next(conf for conf in settings.STRATEGY_LIST if conf['name'] == spec['strategy'])
+    columns = load_market_data(spec['data'])
+    initial_krw = spec.get('initial_krw', base_config['params']['TOTAL_TRADE_SEED_KRW'])
+
+    started = time.time()
+    results = run_sweep(base_config, columns, spec['params'], initial_krw, args.workers)
+    elapsed = time.time() - started
+
+    write_results(results, spec['params'], args.out)
+    print(f"✅ {len(results)}개 조합 완료 ({elapsed:.1f}초). 결과: {args.out}")
+    failed = [result for result in results if result.get('error')]
+    if failed:
+        print(f"⚠️ {len(failed)}개 조합 실행 실패 (결과 CSV의 error 열 참고). 예: {failed[0]['error']}")
+    for result in results[:args.top]:
+        params_text = ", ".join(f"{name}={result[name]}" for name in spec['params'])
+        print(f"  #{result['rank']:<4} 수익률 {result['pnl_pct']:+.2f}% | 낙폭 {result['max_drawdown_pct']:.2f}% | "
+              f"거래 {result['trade_count']}회 | {params_text}")
@@ -0,0 +1,319 @@
+# 파일명: backtest/replay.py
+"""
+결정적(deterministic) 시장 리플레이 하네스입니다.
+
+실제 main_loop을 그대로 실행하되 업비트/바이낸스/환율 API 대신 가짜 거래소(backtest/fake_exchange.py)가
+기록된(또는 합성한) 시세 타임라인을 내주고, 주문은 그 시각의 호가창에 체결합니다.
+가상 시계가 대기 시간을 건너뛰므로 몇 달치 루프를 몇 분 안에 돌려 사고 재현/장기 구동 시험에 사용합니다.
+
+    python -m backtest.replay data/market.csv --strategy ETH_Trendline_Buy_V1
+    python -m backtest.replay --synthetic-days 90 --seed 7
+    python -m backtest.replay --recording data/market --start 2024-05-01 --end 2024-05-08
+"""
+import contextlib
+import copy
+import datetime
+import shutil
+import tempfile
+import time
+import numpy as np
+from config import settings
+from core.clock import VirtualClock
+from monitoring import log
+from backtest.fake_exchange import FakeExchange, FakeUpbitAPI, FakeExternalData, FakeOrderManager
+
+# 합성 타임라인의 컬럼별 시작 값 (없는 심볼은 SYNTHETIC_DEFAULT_PRICE)
+SYNTHETIC_START_PRICES = {
+    'usdt_price': 1380.0,      # 업비트 KRW-USDT
+    'usdt_krw_price': 1350.0,  # USD/KRW 환율
+    'btc_usdt_price': 65000.0,
+    'eth_usdt_price': 3000.0,
+}
+SYNTHETIC_DEFAULT_PRICE = 100.0
+
+
+class MarketTimeline:
+    """
+    리플레이에 사용할 시각별 시장 데이터입니다.
+
+    columns는 백테스트와 같은 {컬럼명: numpy 배열} 형식이고(backtest/data_loader.py),
+    orderbooks는 {마켓: (timestamp_ms 배열, [OrderBook, ...])} 형식의 기록된 호가창입니다.
+    조회 시각 이전의 마지막 행만 사용하므로 미래 데이터를 보지 않습니다.
+    """
+
+    def __init__(self, columns: dict, orderbooks: dict = None):
+        self.columns = columns
+        self.timestamp_ms = np.asarray(columns['timestamp_ms'], dtype=np.int64)
+        self.orderbooks = {code: (np.asarray(timestamps, dtype=np.int64), list(books))
+                           for code, (timestamps, books) in (orderbooks or {}).items()}
+
+    @classmethod
+    def from_file(cls, path: str):
+        from backtest.data_loader import load_market_data
+        return cls(load_market_data(path))
+
+    @classmethod
+    def from_recording(cls, root_dir: str = None, start_ms: int = None, end_ms: int = None):
+        """MarketRecorder(storage/market_recorder.py)로 기록한 스냅샷과 호가창을 읽습니다."""
+        from storage.market_recorder import MarketRecordReader
+        reader = MarketRecordReader(root_dir)
+        columns = reader.to_columns(start_ms, end_ms)
+        if len(columns['timestamp_ms']) == 0:
+            raise ValueError(f"{reader.root_dir}에 기록된 시세가 없습니다.")
+        orderbooks = {code: reader.load_orderbooks(code, start_ms, end_ms)
+                      for code in reader.orderbook_codes(start_ms, end_ms)}
+        return cls(columns, orderbooks)
+
+    @property
+    def start_sec(self) -> float:
+        return int(self.timestamp_ms[0]) / 1000
+
+    @property
+    def end_sec(self) -> float:
+        return int(self.timestamp_ms[-1]) / 1000
+
+    def _index_at(self, timestamps: np.ndarray, timestamp_sec: float):
+        index = int(np.searchsorted(timestamps, int(timestamp_sec * 1000), side='right')) - 1
+        return index if index >= 0 else None
+
+    def sample_at(self, name: str, timestamp_sec: float):
+        """
+        :return: timestamp_sec 이전 마지막 행의 (값, 행 timestamp_ms) 또는 컬럼이 없거나 값이 NaN이면 None
+        """
+        values = self.columns.get(name)
+        if values is None:
+            return None
+        index = self._index_at(self.timestamp_ms, timestamp_sec)
+        if index is None:
+            return None
+        value = float(values[index])
+        if value != value:
+            return None
+        return value, int(self.timestamp_ms[index])
+
+    def value_at(self, name: str, timestamp_sec: float):
+        sample = self.sample_at(name, timestamp_sec)
+        return sample[0] if sample is not None else None
+
+    def price_krw(self, symbol: str, timestamp_sec: float):
+        """
+        업비트 원화 가격. krw_<sym>_price 컬럼이 없으면 USD 가격 x USDT 원화 가격으로 추정합니다.
+        (BacktestEngine의 체결 가격과 같은 규칙)
+        """
+        if symbol == "USDT":
+            return self.value_at('usdt_price', timestamp_sec)
+        price = self.value_at(f"krw_{symbol.lower()}_price", timestamp_sec)
+        if price is not None:
+            return price
+        usd_price = self.value_at(f"{symbol.lower()}_usdt_price", timestamp_sec)
+        krw_per_usdt = self.value_at('usdt_price', timestamp_sec) or self.value_at('usdt_krw_price', timestamp_sec)
+        if usd_price is None or krw_per_usdt is None:
+            return None
+        return usd_price * krw_per_usdt
+
+    def orderbook_at(self, code: str, timestamp_sec: float):
+        recorded = self.orderbooks.get(code)
+        if recorded is None:
+            return None
+        timestamps, books = recorded
+        index = self._index_at(timestamps, timestamp_sec)
+        return books[index] if index is not None else None
+
+
+def synthetic_timeline(start_ms: int, rows: int, keys, interval_ms: int = 60_000,
+                       volatility_pct: float = 0.05, seed: int = None) -> MarketTimeline:
+    """
+    로그 정규 랜덤 워크로 합성한 타임라인 (장기 구동 시험용)
+
+    :param keys: 만들 컬럼 이름 (예: ["usdt_price", "usdt_krw_price", "eth_usdt_price"])
+    :param volatility_pct: 행 간 수익률 표준편차 (%), 환율은 그 1/10
+    """
+    rng = np.random.default_rng(seed)
+    columns = {'timestamp_ms': start_ms + np.arange(rows, dtype=np.int64) * interval_ms}
+    for key in keys:
+        scale = volatility_pct / 100.0 * (0.1 if key == 'usdt_krw_price' else 1.0)
+        returns = rng.normal(0.0, scale, rows)
+        returns[0] = 0.0
+        columns[key] = SYNTHETIC_START_PRICES.get(key, SYNTHETIC_DEFAULT_PRICE) * np.exp(np.cumsum(returns))
+    return MarketTimeline(columns)
+
+
+def required_keys(strategy_configs) -> list:
+    """전략 설정 목록이 fetch_all_data에서 요구하는 타임라인 컬럼 이름"""
+    keys = ['usdt_price', 'usdt_krw_price']
+    for config in strategy_configs:
+        if config.get('is_active') and config.get('symbol') != "USDT":
+            keys.append(f"{config['symbol'].lower()}_usdt_price")
+    return list(dict.fromkeys(keys))
+
+
+class ReplayResult:
+    """리플레이 결과 (가상 거래소 체결 내역과 최종 잔고)"""
+
+    def __init__(self, start_sec: float, end_sec: float, elapsed_sec: float, trades: list,
+                 balances: dict, initial_equity_krw: float, final_equity_krw: float):
+        self.start_sec = start_sec
+        self.end_sec = end_sec
+        self.elapsed_sec = elapsed_sec
+        self.trades = trades
+        self.balances = balances
+        self.initial_equity_krw = initial_equity_krw
+        self.final_equity_krw = final_equity_krw
+        self.pnl_krw = final_equity_krw - initial_equity_krw
+        self.pnl_pct = self.pnl_krw / initial_equity_krw * 100.0 if initial_equity_krw else 0.0
+
+    def summary(self) -> dict:
+        simulated_sec = self.end_sec - self.start_sec
+        return {
+            'start': _format_time(self.start_sec),
+            'end': _format_time(self.end_sec),
+            'simulated_days': simulated_sec / 86400,
+            'elapsed_sec': self.elapsed_sec,
+            'speedup': simulated_sec / self.elapsed_sec if self.elapsed_sec > 0 else 0.0,
+            'trade_count': len(self.trades),
+            'final_equity_krw': self.final_equity_krw,
+            'pnl_krw': self.pnl_krw,
+            'pnl_pct': self.pnl_pct,
+        }
+
+
+class ReplayHarness:
+    """
+    main_loop을 가짜 커넥터와 가상 시계로 타임라인 처음부터 끝까지 실행합니다.
+
+    - 시세/환율/호가: FakeUpbitAPI / FakeExternalData가 가상 시각 기준으로 타임라인에서 조회
+    - 주문: FakeOrderManager -> FakeExchange에서 호가창 기준으로 즉시 체결, OrderTracker가 다음 틱에 체결 반영
+    - 주문 큐는 워커 없이 동기 실행하고 WebSocket 스트림은 쓰지 않으므로, 같은 입력이면 결과가 항상 같습니다.
+    """
+
+    def __init__(self, timeline: MarketTimeline, strategy_configs=None, initial_balances: dict = None,
+                 start: float = None, end: float = None, state_dir: str = None, fee_rate: float = None):
+        """
+        :param strategy_configs: 실행할 전략 설정 목록 (None이면 settings.STRATEGY_LIST의 활성 전략)
+        :param initial_balances: 가상 계좌 초기 잔고 (기본: {"KRW": REPLAY_INITIAL_KRW})
+        :param start, end: 리플레이 구간 (Unix Time 초, 기본: 타임라인 전체)
+        :param state_dir: 전략 상태 저장 디렉터리. 사고 재현 시 실거래 상태의 '사본'을 지정하면 그 상태에서 시작
+                          (None이면 임시 디렉터리를 쓰고 끝나면 삭제)
+        """
+        self.timeline = timeline
+        self.strategy_configs = settings.STRATEGY_LIST if strategy_configs is None else strategy_configs
+        self.initial_balances = initial_balances or {'KRW': settings.REPLAY_INITIAL_KRW}
+        self.start = timeline.start_sec if start is None else start
+        self.end = timeline.end_sec if end is None else end
+        self.state_dir = state_dir
+        self.fee_rate = fee_rate
+
+    def build_components(self, clock) -> dict:
+        """main_loop에 주입할 가짜 커넥터/주문 처리/상태 저장소 (build_live_components와 같은 키)"""
+        from execution.order_tracker import OrderTracker
+        from execution.order_queue import OrderExecutionQueue
+        from storage.state_journal import StateJournal, StrategyStateStore
+
+        exchange = FakeExchange(self.timeline, clock, self.initial_balances, self.fee_rate)
+        upbit_conn = FakeUpbitAPI(exchange)
+        order_mgr = FakeOrderManager(upbit_conn, clock=clock)
+        return {
+            'exchange': exchange,
+            'upbit_conn': upbit_conn,
+            'external_conn': FakeExternalData(self.timeline, clock),
+            'order_mgr': order_mgr,
+            'order_tracker': OrderTracker(upbit_conn, clock=clock),
+            'order_queue': OrderExecutionQueue(order_mgr, max_workers=0, clock=clock).start(),
+            'market_feed': None,
+            'state_store': StrategyStateStore(StateJournal(root_dir=self.state_dir)).open(),
+            'strategy_configs': self.strategy_configs,
+        }
+
+    def run(self, quiet: bool = True) -> ReplayResult:
+        """
+        :param quiet: True이면 루프/전략 로그를 버려 속도를 높입니다.
+        """
+        from main import main_loop
+
+        temp_dir = None
+        if self.state_dir is None:
+            temp_dir = self.state_dir = tempfile.mkdtemp(prefix="replay_state_")
+        try:
+            clock = VirtualClock(self.start)
+            with log.silenced() if quiet else contextlib.nullcontext():
+                components = self.build_components(clock)
+                exchange = components['exchange']
+                initial_equity_krw = exchange.equity_krw()
+
+                started = time.perf_counter()
+                main_loop(components, clock, until=self.end + 1)
+                elapsed = time.perf_counter() - started
+
+            return ReplayResult(self.start, min(clock.time(), self.end), elapsed, list(exchange.trades),
+                                dict(exchange.balances), initial_equity_krw, exchange.equity_krw())
+        finally:
+            if temp_dir is not None:
+                shutil.rmtree(temp_dir, ignore_errors=True)
+                self.state_dir = None
+
+
+def _format_time(timestamp_sec: float) -> str:
+    return datetime.datetime.fromtimestamp(timestamp_sec, tz=datetime.timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _parse_date(text: str) -> float:
+    return datetime.datetime.strptime(text, "%Y-%m-%d").replace(tzinfo=datetime.timezone.utc).timestamp()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="가짜 거래소와 가상 시계로 main_loop을 리플레이합니다.")
+    parser.add_argument("data", nargs="?", help="시장 데이터 CSV/Parquet 경로 (생략 시 --synthetic-days 필요)")
+    parser.add_argument("--strategy", action="append", help="실행할 전략 이름 (여러 번 지정 가능, 기본: 활성 전략)")
+    parser.add_argument("--krw", type=float, default=None, help="초기 원화 잔고 (기본: REPLAY_INITIAL_KRW)")
+    parser.add_argument("--start", help="시작 날짜 (YYYY-MM-DD, UTC)")
+    parser.add_argument("--end", help="종료 날짜 (YYYY-MM-DD, UTC)")
+    parser.add_argument("--state-dir", help="시작 상태로 사용할 전략 상태 디렉터리 (사본을 지정할 것)")
+    parser.add_argument("--recording", help="데이터 파일 대신 MarketRecorder 기록 디렉터리 사용 (기록된 호가창으로 체결)")
+    parser.add_argument("--synthetic-days", type=float, help="데이터 파일 대신 이 기간(일)의 합성 분봉 사용")
+    parser.add_argument("--seed", type=int, default=None, help="합성 데이터 난수 시드")
+    parser.add_argument("--verbose", action="store_true", help="루프/전략 로그 출력")
+    args = parser.parse_args()
+    log.setup_logging(to_file=False)
+
+    if args.strategy:
+        configs = []
+        for config in settings.STRATEGY_LIST:
+            if config['name'] in args.strategy:
+                config = copy.deepcopy(config)
+                config['is_active'] = True
+                configs.append(config)
+        missing = set(args.strategy) - {config['name'] for config in configs}
+        if missing:
+            parser.error(f"전략을 찾을 수 없습니다: {', '.join(sorted(missing))}")
+    else:
+        configs = settings.STRATEGY_LIST
+
+    if args.data:
+        timeline = MarketTimeline.from_file(args.data)
+    elif args.recording:
+        timeline = MarketTimeline.from_recording(
+            args.recording,
+            start_ms=int(_parse_date(args.start) * 1000) if args.start else None,
+            end_ms=int(_parse_date(args.end) * 1000) if args.end else None,
+        )
+    elif args.synthetic_days:
+        start_ms = int(_parse_date(args.start) * 1000) if args.start else int(time.time() // 86400 * 86400 * 1000)
+        timeline = synthetic_timeline(start_ms, int(args.synthetic_days * 1440), required_keys(configs), seed=args.seed)
+    else:
+        parser.error("데이터 파일, --recording 또는 --synthetic-days를 지정하세요.")
+
+    harness = ReplayHarness(
+        timeline, configs,
+        initial_balances={'KRW': args.krw} if args.krw is not None else None,
+        start=_parse_date(args.start) if args.start and args.data else None,
+        end=_parse_date(args.end) if args.end else None,
+        state_dir=args.state_dir,
+    )
+    result = harness.run(quiet=not args.verbose)
+
+    for key, value in result.summary().items():
+        print(f"{key:>18}: {value:,.4f}" if isinstance(value, float) else f"{key:>18}: {value}")
+    for currency, balance in sorted(result.balances.items()):
+        print(f"{'balance_' + currency:>18}: {balance:,.8f}")
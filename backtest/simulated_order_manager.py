@@ -0,0 +1,72 @@
+# 파일명: backtest/simulated_order_manager.py
+from config import settings
+
+
+class SimulatedOrderManager:
+    """
+    백테스트용 가상 OrderManager입니다.
+
+    실제 OrderManager와 같은 get_balance_snapshot / execute_market_order 인터페이스를 제공하며,
+    set_fill_price()로 지정한 가격에 수수료를 반영하여 즉시 전량 체결된 것으로 처리합니다.
+    """
+
+    def __init__(self, initial_balances: dict, fee_rate: float = None):
+        self.balances = {currency: float(amount) for currency, amount in initial_balances.items()}
+        self.fee_rate = settings.BACKTEST_FEE_RATE if fee_rate is None else fee_rate
+        self.fill_prices = {} # 심볼 -> 현재 체결 가격 (KRW)
+        self.trades = []
+        self.current_index = None
+        self._order_seq = 0
+
+    def set_fill_price(self, symbol: str, price_krw: float, index=None):
+        self.fill_prices[symbol] = price_krw
+        self.current_index = index
+
+    def get_balance_snapshot(self, force_refresh: bool = False) -> dict:
+        return dict(self.balances)
+
+    def invalidate_balance_cache(self):
+        pass
+
+    def get_current_balance(self, ticker="USDT"):
+        return self.balances.get(ticker, 0.0), self.balances.get('KRW', 0.0)
+
+    def execute_market_order(self, action: str, amount: float, symbol: str):
+        """
+        :param amount: 매수 시에는 '원화 금액(KRW)', 매도 시에는 '매도 수량(Coin Volume)'
+        """
+        price = self.fill_prices.get(symbol)
+        if price is None or price <= 0 or amount <= 0:
+            return None
+
+        krw_balance = self.balances.get('KRW', 0.0)
+        symbol_balance = self.balances.get(symbol, 0.0)
+
+        if action == 'BUY':
+            krw_amount = min(amount, krw_balance)
+            volume = krw_amount * (1 - self.fee_rate) / price
+            self.balances['KRW'] = krw_balance - krw_amount
+            self.balances[symbol] = symbol_balance + volume
+            fee = krw_amount * self.fee_rate
+        elif action == 'SELL':
+            volume = min(amount, symbol_balance)
+            krw_amount = volume * price * (1 - self.fee_rate)
+            self.balances[symbol] = symbol_balance - volume
+            self.balances['KRW'] = krw_balance + krw_amount
+            fee = volume * price * self.fee_rate
+        else:
+            return None
+
+        self._order_seq += 1
+        trade = {
+            'uuid': f"BACKTEST-{self._order_seq}",
+            'index': self.current_index,
+            'action': action,
+            'symbol': symbol,
+            'price': price,
+            'volume': volume,
+            'krw_amount': krw_amount,
+            'fee': fee,
+        }
+        self.trades.append(trade)
+        return {"uuid": trade['uuid'], "state": "done"}
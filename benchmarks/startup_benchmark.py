@@ -0,0 +1,96 @@
+# 파일명: benchmarks/startup_benchmark.py
+"""
+봇 기동 시간/메모리 벤치마크입니다.
+
+각 시나리오를 새 파이썬 프로세스에서 여러 번 실행하여 벽시계 시간(중앙값)과 최대 RSS를 측정합니다.
+네트워크 요청은 보내지 않습니다. (커넥터/전략 객체 생성까지만 수행)
+
+    python -m benchmarks.startup_benchmark --runs 10
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 자식 프로세스에서 실행한 뒤 최대 RSS(KB)를 stdout 마지막 줄로 출력
+_RSS_SUFFIX = """
+import resource
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+SCENARIOS = {
+    # 파이썬 인터프리터 자체 기동 비용 (기준선)
+    "python": "pass",
+    # main 모듈 import (커넥터/전략 모듈은 아직 import되지 않음)
+    "import_main": "import main",
+    # main_loop 초기화 단계와 같은 작업: 커넥터 생성 + 활성 전략만 로드/생성
+    "init_active": """
+import main
+from config import settings
+from connectors.upbit_api import UpbitAPI
+from connectors.external_data import ExternalData
+from execution.order_manager import OrderManager
+from storage.state_journal import StrategyStateStore
+from strategies.registry import create_strategy
+upbit_conn = UpbitAPI()
+external_conn = ExternalData()
+order_mgr = OrderManager(upbit_conn)
+for config in settings.STRATEGY_LIST:
+    if config.get("is_active"):
+        create_strategy(config)
+""",
+    # 비교용: 예전처럼 모든 전략 모듈과 pyupbit(pandas 포함)를 미리 import하는 경우
+    "eager_reference": """
+import main
+import pyupbit
+from strategies.registry import BUILTIN_STRATEGIES, get_strategy_class
+for strategy_type in BUILTIN_STRATEGIES:
+    get_strategy_class(strategy_type)
+""",
+}
+
+
+def run_once(code: str):
+    """
+    :return: (경과 시간 초, 최대 RSS MB)
+    """
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-c", code + _RSS_SUFFIX], cwd=_REPO_ROOT,
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, check=True,
+    )
+    elapsed = time.perf_counter() - started
+    max_rss_kb = int(completed.stdout.strip().splitlines()[-1])
+    return elapsed, max_rss_kb / 1024
+
+
+def run_benchmark(scenarios, runs: int) -> dict:
+    results = {}
+    for name in scenarios:
+        samples = [run_once(SCENARIOS[name]) for _ in range(runs)]
+        times = [elapsed for elapsed, _ in samples]
+        results[name] = {
+            "median_ms": statistics.median(times) * 1000,
+            "min_ms": min(times) * 1000,
+            "max_rss_mb": max(rss for _, rss in samples),
+        }
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="봇 기동 시간/메모리를 측정합니다.")
+    parser.add_argument("--runs", type=int, default=5, help="시나리오별 반복 횟수")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="측정할 시나리오 (여러 번 지정 가능, 기본: 전체)")
+    args = parser.parse_args()
+
+    scenarios = args.scenario or list(SCENARIOS)
+    results = run_benchmark(scenarios, args.runs)
+
+    print(f"{'scenario':>16} | {'median_ms':>10} | {'min_ms':>10} | {'max_rss_mb':>10}")
+    for name, result in results.items():
+        print(f"{name:>16} | {result['median_ms']:>10.1f} | {result['min_ms']:>10.1f} | {result['max_rss_mb']:>10.1f}")
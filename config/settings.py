@@ -21,8 +21,121 @@ EXCHANGE_RATE_URL = os.environ.get("EXCHANGE_RATE_URL")
 MONITORING_INTERVAL_SEC = 60  # 가격 조회 및 매매 로직 실행 주기
 MIN_TRADE_KRW_AMOUNT = 10000  # 최소 주문 금액 (KRW)
 MIN_USDT_TO_TRADE = 1.0       # 최소 주문 수량 (USDT/BTC 등)
+BALANCE_CACHE_TTL_SEC = 5     # 잔고 스냅샷 캐시 유지 시간 (초), 주문 실행 시 즉시 무효화
+FETCH_DEADLINE_SEC = 8        # 틱당 시장 데이터 수집 마감 시간 (초), 초과한 항목은 None 처리
+FETCH_MAX_WORKERS = 8         # 시장 데이터 병렬 수집 스레드 수
+ORDER_TRACK_TIMEOUT_SEC = 300 # 이 시간 안에 체결 완료가 확인되지 않은 주문은 추적 중단 (초)
+ORDER_QUEUE_WORKERS = 2       # 주문 실행 워커 스레드 수 (execution/order_queue.py)
+ORDER_QUEUE_MAX_SIZE = 32     # 대기 가능한 최대 주문 수, 초과 시 주문 거부
+ORDER_MAX_SLIPPAGE_PCT = 0.3  # 호가창 기준 예상 슬리피지(%)가 이 값을 넘으면 자식 주문으로 분할 (전략별 MAX_SLIPPAGE_PCT로 변경 가능)
+ORDER_MAX_CHILD_ORDERS = 10   # 한 주문을 나눌 수 있는 최대 자식 주문 수
+ORDER_CHILD_INTERVAL_SEC = 1.0 # 자식 주문 사이 대기 시간 (초), 호가 잔량이 다시 채워질 시간
+
+# --- 2-1. HTTP 연결 설정 (connectors/http_client.py) ---
+HTTP_POOL_MAXSIZE = 10          # 호스트별 keep-alive 연결 풀 크기
+HTTP_MAX_RETRIES = 2            # 통신 오류 / 429 / 5xx 발생 시 최대 재시도 횟수
+HTTP_BACKOFF_BASE_SEC = 0.3     # 재시도 백오프 기본 대기 시간 (지수 증가 + 지터)
+HTTP_BACKOFF_MAX_SEC = 3.0      # 재시도 백오프 최대 대기 시간
+HTTP_DEFAULT_TIMEOUT_SEC = 5    # 호스트별 설정이 없을 때의 요청 타임아웃 (초)
+HTTP_HOST_TIMEOUTS = {          # 호스트별 요청 타임아웃 (초)
+    "api.upbit.com": 3,
+    "api.binance.com": 3,
+    "v6.exchangerate-api.com": 5,
+}
+
+# --- 2-1-1. 요청 제한 설정 (connectors/rate_limiter.py) ---
+RATE_LIMITS = {                 # 엔드포인트 그룹 버킷 이름: (최대 토큰 수, 초당 충전 수)
+    "upbit:quotation": (10, 10),    # 업비트 시세 조회 API (초당 10회)
+    "upbit:exchange": (30, 30),     # 업비트 잔고/주문 조회 API (초당 30회)
+    "upbit:order": (8, 8),          # 업비트 주문 생성/취소 API (초당 8회)
+}
+RATE_LIMIT_POOLS = {            # 거래소 공용 요청 풀: (최대 토큰 수, 초당 충전 수). 우선순위(주문 > 조회 > 시세)가 적용되는 곳
+    "upbit": (30, 30),              # 업비트 전체 요청 (그룹 합계보다 작게 두어 몰릴 때 주문이 시세보다 먼저 나가도록)
+    "binance": (6000, 100),         # 바이낸스 요청 가중치 (분당 6000)
+}
+RATE_LIMIT_MAX_WAIT_SEC = 5     # 토큰을 기다리는 최대 시간 (초), 초과 시 요청 실패 처리
+RATE_LIMIT_PENALTY_SEC = 1.0    # 429/418 응답에 Retry-After가 없을 때 그룹 요청을 멈추는 시간 (초)
+
+# --- 2-1-2. 환율 설정 (connectors/fx_provider.py) ---
+FX_REFRESH_INTERVAL_SEC = 900   # 환율 백그라운드 갱신 주기 (15분)
+FX_RETRY_INTERVAL_SEC = 30      # 모든 소스 조회 실패 시 재시도 간격 (초)
+FX_MAX_AGE_SEC = 3600           # 이 시간보다 오래된 환율은 사용하지 않음 (김프 None -> 전략 대기)
+FX_SOURCES = [                  # 중앙값을 계산할 환율 소스 목록
+    {"type": "exchangerate-api"},
+    {"type": "json", "name": "open-er-api", "url": "https://open.er-api.com/v6/latest/USD", "path": ["rates", "KRW"]},
+    {"type": "json", "name": "frankfurter", "url": "https://api.frankfurter.app/latest?from=USD&to=KRW", "path": ["rates", "KRW"]},
+    # {"type": "implied", "coin": "BTC"},  # 업비트/바이낸스 호가 기반 암시 환율 (코인 김프가 섞이므로 보조용)
+]
+
+# --- 2-2. 실시간 시세 스트림 설정 (connectors/market_stream.py) ---
+USE_WEBSOCKET_FEED = True               # True: WebSocket 스트림 가격 우선 사용 (끊기면 REST로 대체)
+STREAM_MAX_AGE_SEC = 60                 # 스트림이 끊긴 상태에서 저장된 가격을 신뢰하는 최대 경과 시간 (초)
+STREAM_STALE_TIMEOUT_SEC = 120          # 이 시간 동안 메시지가 없으면 강제 재연결 (초)
+STREAM_PING_INTERVAL_SEC = 20           # WebSocket ping 전송 주기 (초)
+STREAM_RECONNECT_BACKOFF_MAX_SEC = 30   # 재연결 백오프 최대 대기 시간 (초)
+STREAM_GAP_THRESHOLD_SEC = 10           # 주기적 스트림에서 이 시간 이상 타임스탬프가 건너뛰면 갭으로 기록 (초)
+ORDERBOOK_ENABLED = True                # True: 업비트 호가창을 수신하여 VWAP 김프 / 주문 분할에 사용
+ORDERBOOK_MAX_AGE_SEC = 10              # 이보다 오래된 스트림 호가창은 쓰지 않고 REST로 다시 조회 (초)
+KIMP_VWAP_ORDER_KRW = 1_000_000         # 시장 데이터의 VWAP 김프(kimchi_premium_vwap_buy/sell)를 계산할 기준 주문 금액 (KRW)
+
+# --- 2-3. 이벤트 기반 전략 평가 설정 (core/scheduler.py) ---
+EVENT_PRICE_CHANGE_THRESHOLD_PCT = 0.05 # 가격이 이 비율(%) 이상 변하면 전략 재평가
+EVENT_KIMP_CHANGE_THRESHOLD = 0.02      # 김프가 이 값(%p) 이상 변하면 전략 재평가
+EVENT_MAX_STALENESS_SEC = 60            # 변화가 없어도 이 주기(초)마다 모든 전략을 한 번씩 평가
+EVENT_MIN_INTERVAL_SEC = 0.5            # 이벤트 처리 최소 간격 (초), 연속 틱을 묶어서 처리
+
+# --- 2-4. 백테스트 설정 (backtest/) ---
+BACKTEST_FEE_RATE = 0.0005              # 가상 체결 수수료율 (업비트 원화마켓 0.05%)
+BACKTEST_CACHE_DIR = "data/cache"       # OHLCV 다운로드 캐시 디렉터리
+BACKTEST_CACHE_MAX_AGE_SEC = 3600       # 종료 시각 없이(최신까지) 받은 OHLCV 캐시의 유효 시간 (초)
+CANDLE_STORE_DIR = "data/candles"       # 로컬 캔들 저장소 디렉터리 (storage/candle_store.py)
+CANDLE_SYNC_MAX_PAGES = 50              # 증분 동기화 1회당 최대 요청 페이지 수 (페이지당 200개)
+
+# --- 2-5. 전략 상태 저장 설정 (storage/state_journal.py) ---
+STATE_DIR = "data/state"                # 전략 상태 스냅샷/저널 저장 디렉터리
+STATE_FSYNC_INTERVAL_SEC = 1.0          # 저널 fsync 묶음 주기 (초), 주문 직후 상태는 즉시 fsync
+STATE_COMPACT_EVERY_RECORDS = 1000      # 저널 레코드가 이 개수만큼 쌓이면 스냅샷으로 압축
+
+# --- 2-6. 멀티 프로세스 실행 설정 (core/sharded_runner.py) ---
+SHARD_WORKERS = 0                       # 전략 평가 워커 프로세스 수 (0이면 단일 프로세스 main_loop)
+SHARD_BY = "symbol"                     # 전략을 워커에 나누는 기준 설정 키 ("symbol" 또는 "name")
+
+# --- 2-7. 지표 수집 설정 (monitoring/metrics.py) ---
+METRICS_ENABLED = True                  # 지연 시간/오류/주문 지표 수집 (False면 빈 객체로 대체되어 비용 거의 없음)
+METRICS_NAMESPACE = "upbit_bot_"        # 지표 이름 접두사
+METRICS_HTTP_HOST = "127.0.0.1"         # 지표 엔드포인트 주소 (외부 노출 금지)
+METRICS_HTTP_PORT = 9108                # http://127.0.0.1:9108/metrics (0이면 엔드포인트를 열지 않음)
+
+# --- 2-8. 로그 설정 (monitoring/log.py) ---
+LOG_LEVEL = "INFO"                      # DEBUG / INFO / WARNING / ERROR
+LOG_CONSOLE_FORMAT = "text"             # 콘솔 출력 형식 ("text" 또는 "json")
+LOG_FILE_PATH = "logs/bot.jsonl"        # JSON 로그 파일 (None이면 콘솔만), 백그라운드 스레드에서 기록/회전
+LOG_FILE_MAX_BYTES = 10 * 1024 * 1024   # 로그 파일 회전 크기
+LOG_FILE_BACKUP_COUNT = 5               # 보관할 회전 파일 수
+LOG_QUEUE_MAX_SIZE = 10000              # 로그 큐 최대 크기 (가득 차면 메인 루프를 막지 않고 버림)
+LOG_REPEAT_INTERVAL_SEC = 60            # 같은 위치의 로그는 이 시간(초) 안에 한 번만 출력 (경고 이상은 같은 메시지만, 0이면 끔)
+
+# --- 2-9. 리플레이 설정 (backtest/replay.py, backtest/fake_exchange.py) ---
+REPLAY_INITIAL_KRW = 10_000_000         # 리플레이 가상 계좌의 초기 원화 잔고
+REPLAY_BOOK_LEVELS = 15                 # 기록된 호가창이 없을 때 만드는 가상 호가 단계 수 (업비트와 같은 15단계)
+REPLAY_BOOK_SPREAD_PCT = 0.02           # 가상 호가창의 최우선 매수/매도 호가 간격 (%)
+REPLAY_BOOK_LEVEL_STEP_PCT = 0.01       # 가상 호가창의 호가 단계 간격 (%)
+REPLAY_BOOK_LEVEL_KRW = 20_000_000      # 가상 호가창의 단계별 잔량 (원화 환산)
+
+# --- 2-10. 시세 기록 설정 (storage/market_recorder.py) ---
+RECORDER_ENABLED = False                # True: fetch_all_data 결과와 스트림 가격을 압축 파일로 기록 (김프 백테스트/리플레이용)
+RECORDER_DIR = "data/market"            # 기록 파일 디렉터리 (UTC 날짜별 YYYYMMDD.mrec)
+RECORDER_CHUNK_RECORDS = 4096           # 청크 하나에 담는 최대 레코드 수
+RECORDER_FLUSH_INTERVAL_SEC = 5.0       # 버퍼를 청크로 압축하여 쓰는 주기 (초)
+RECORDER_COMPRESS_LEVEL = 6             # zlib 압축 레벨 (1: 빠름 ~ 9: 작음)
+RECORDER_ORDERBOOK_LEVELS = 15          # 틱마다 기록할 호가창 단계 수 (0이면 호가창은 기록하지 않음)
+
+# 기본 제공 외 전략 등록 (strategy_type -> "패키지.모듈:클래스"), 활성 전략이 사용할 때만 import
+# 설치 패키지의 "upbit_bot.strategies" entry point로도 등록 가능 (strategies/registry.py)
+STRATEGY_PLUGINS = {
+    # "MY_GRID": "my_strategies.grid:MyGridStrategy",
+}
 
-# --- 3. 통합 전략 리스트 (GUI/DB 대체) ---
 STRATEGY_LIST = [
     {
         "name": "USDT_Kimp_Grid_V1",
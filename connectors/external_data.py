@@ -1,88 +1,58 @@
 # 파일명: connectors/external_data.py
-import requests
 import json
-import time
+import logging
 from config import settings
+from connectors.http_client import get_http_client
+from connectors.fx_provider import FxRateProvider
+
+logger = logging.getLogger(__name__)
 
 GLOBAL_USDT_PRICE_USD = 1.0  # 해외 USDT 가격을 1.0 USD로 가정 (스테이블 코인이므로)
-MIN_FETCH_INTERVAL_SEC = 900 # 환율 캐싱 주기 (15분)
+BINANCE_BASE_URL = "https://api.binance.com"
 
 class ExternalData:
     """
     외부 데이터(환율 등)를 처리하고 김치 프리미엄을 계산하는 클래스입니다.
-    요청 횟수 제한을 관리하기 위해 캐싱 로직을 추가했습니다.
+    환율은 FxRateProvider가 여러 소스에서 백그라운드로 갱신한 캐시 값을 사용합니다.
     """
 
-    def __init__(self):
-        print("✅ ExternalData 초기화 완료")
-        # 캐싱 변수 초기화
-        self.cached_exchange_rate = None
-        self.last_fetched_time = 0 # 마지막으로 성공적으로 요청한 Unix Time (초)
-        
+    def __init__(self, binance_base_url: str = BINANCE_BASE_URL, fx_provider: FxRateProvider = None, clock=None):
+        """
+        :param clock: 환율 캐시 갱신 주기/경과 시간 계산에 쓸 시계 (core/clock.py, None이면 실제 시간)
+        """
+        logger.info("✅ ExternalData 초기화 완료")
+        self.binance_base_url = binance_base_url
+        self.http = get_http_client()
+        self.fx_provider = fx_provider or FxRateProvider.from_settings(self.http, clock=clock)
+
+    def get_fx_quote(self):
+        """
+        USD/KRW 환율을 출처, 경과 시간과 함께 반환합니다. (네트워크를 기다리지 않음)
+
+        :return: FxQuote 또는 환율이 없거나 너무 오래된 경우 None
+        """
+        return self.fx_provider.get_quote()
+
     def get_usd_krw_exchange_rate(self):
         """
-        외부 API를 통해 실시간 USD/KRW 환율을 조회합니다.
+        USD/KRW 환율을 조회합니다. (레거시 지원, 캐시된 값을 즉시 반환)
         
-        요청 횟수 제한 및 갱신 주기를 관리하기 위해 캐싱된 값을 우선 사용합니다.
-        
-        :return: USD/KRW 환율 (float) 또는 조회 실패 시 None
+        :return: USD/KRW 환율 (float) 또는 조회 실패 / 최대 허용 시간 초과 시 None
         """
-        
-        # 1. 갱신 주기 확인: 최소 갱신 주기가 지나지 않았으면 캐싱된 값을 반환
-        current_time = time.time()
-        if self.cached_exchange_rate is not None and \
-           (current_time - self.last_fetched_time) < MIN_FETCH_INTERVAL_SEC:
-            
-            # print(f"[INFO] 환율 캐시 사용: {MIN_FETCH_INTERVAL_SEC}초 주기 미경과 ({int(current_time - self.last_fetched_time)}초 경과)")
-            return self.cached_exchange_rate
-
-        # 2. API 요청 시작 (갱신 주기가 지났거나 캐시가 없는 경우)
-        api_key = settings.EXCHANGE_RATE_API_KEY
-        api_url = f"https://v6.exchangerate-api.com/v6/{api_key}/latest/USD" 
-
-        if "YOUR_EXCHANGE_RATE_API_KEY" in api_key:
-            # 임시 값 사용 시에도 캐싱 로직을 테스트하기 위해 값을 업데이트
-            exchange_rate = 1350.0 
-            self.cached_exchange_rate = exchange_rate
-            self.last_fetched_time = current_time
-            print(f"[WARNING] API 키 누락. 임시값 {exchange_rate:,.2f}를 캐시에 저장.")
-            return exchange_rate
-            
-        try:
-            response = requests.get(api_url, timeout=5)
-            response.raise_for_status() 
-            data = response.json()
-            
-            if data.get('result') == 'success' and 'KRW' in data.get('conversion_rates', {}):
-                exchange_rate = data['conversion_rates']['KRW'] 
-                
-                # 3. 성공 시 캐시 업데이트
-                self.cached_exchange_rate = exchange_rate
-                self.last_fetched_time = current_time
-                print(f"[SUCCESS] 환율 API 갱신 및 캐시 저장: {exchange_rate:,.2f}")
-                return exchange_rate
-            else:
-                # 4. API 응답 오류 시: 최신 캐시 값을 사용 (프로그램 중단 방지)
-                print(f"[ERROR] API 응답 오류. 캐시된 값 사용 시도.")
-                return self.cached_exchange_rate if self.cached_exchange_rate is not None else None
-            
-        except requests.exceptions.RequestException as e:
-            # 5. 통신 오류 시: 최신 캐시 값을 사용 (프로그램 중단 방지)
-            print(f"[ERROR] API 통신 오류 발생: {e}. 캐시된 값 사용 시도.")
-            return self.cached_exchange_rate if self.cached_exchange_rate is not None else None
-        except (json.JSONDecodeError, KeyError) as e:
-            # 6. 파싱 오류 시: 최신 캐시 값을 사용
-            print(f"[ERROR] JSON/파싱 오류 발생: {e}. 캐시된 값 사용 시도.")
-            return self.cached_exchange_rate if self.cached_exchange_rate is not None else None
-
-
-    def calculate_kimchi_premium(self, upbit_usdt_krw_price: float):
-      
-        exchange_rate = self.get_usd_krw_exchange_rate()
-        if upbit_usdt_krw_price is None or exchange_rate is None:
-            print("[ERROR] 환율 데이터 부족으로 김프 계산 불가.")
+        quote = self.get_fx_quote()
+        return quote.rate if quote is not None else None
+
+    def calculate_kimchi_premium(self, upbit_usdt_krw_price: float, fx_quote=None):
+        """
+        :param fx_quote: 이미 조회한 FxQuote (None이면 새로 조회). 환율이 오래되었으면 신뢰도 경고를 출력합니다.
+        """
+        quote = fx_quote or self.get_fx_quote()
+        if upbit_usdt_krw_price is None or quote is None:
+            logger.error("환율 데이터 부족으로 김프 계산 불가.")
             return None
-        global_price_krw = GLOBAL_USDT_PRICE_USD * exchange_rate                         # 해외 가격을 원화로 환산 (글로벌 USDT 가격은 1.0 USD로 가정)
+        if quote.age_sec > self.fx_provider.refresh_interval_sec * 2:
+            logger.warning(f"김프 계산에 {quote.age_sec:.0f}초 전 환율 사용 ({quote.source}). 신뢰도 낮음.")
+        global_price_krw = GLOBAL_USDT_PRICE_USD * quote.rate                           # 해외 가격을 원화로 환산 (글로벌 USDT 가격은 1.0 USD로 가정)
         kimchi_premium_rate = (upbit_usdt_krw_price / global_price_krw - 1) * 100       # 김치 프리미엄 계산 공식
         return kimchi_premium_rate
 
@@ -91,16 +61,113 @@ class ExternalData:
         Binance API에서 특정 심볼(예: BTCUSDT, ETHUSDT)의 현재 가격을 조회합니다.
         :param symbol: 조회할 심볼 문자열 (예: "BTCUSDT")
         """
+        url = f"{self.binance_base_url}/api/v3/ticker/price"
+        data = self.http.get_json(url, params={"symbol": symbol}, label=f"바이낸스 {symbol} 가격 조회")
+
         try:
-            url = "https://api.binance.com/api/v3/ticker/price"
-            params = {"symbol": symbol}
-            
-            response = requests.get(url, params=params, timeout=5)
-            response.raise_for_status()
-            data = response.json()
-            
             return float(data["price"])
-            
-        except Exception as e:
-            print(f"[ERROR] 바이낸스 {symbol} 가격 조회 실패: {e}")
-            return None
\ No newline at end of file
+        except (KeyError, TypeError, ValueError) as e:
+            logger.error(f"바이낸스 {symbol} 가격 조회 실패: {e}")
+            return None
+
+    def get_binance_prices(self, symbols):
+        """
+        Binance API에서 여러 심볼의 현재 가격을 한 번의 요청으로 조회합니다.
+
+        symbols=[...] 파라미터로 필요한 심볼만 요청하고, 존재하지 않는 심볼이 섞여 있어
+        요청 자체가 거부되면 전체 티커를 한 번 받아서 필요한 심볼만 골라냅니다.
+
+        :param symbols: 조회할 심볼 목록 (예: ["BTCUSDT", "ETHUSDT"])
+        :return: {심볼: 가격(float)} 형태의 dict. 조회하지 못한 심볼은 None
+        """
+        symbols = list(dict.fromkeys(symbols)) # 순서를 유지한 중복 제거
+        prices = {symbol: None for symbol in symbols}
+        if not symbols:
+            return prices
+
+        url = f"{self.binance_base_url}/api/v3/ticker/price"
+        # Binance는 공백 없는 JSON 배열 형식을 요구함 (예: ["BTCUSDT","ETHUSDT"])
+        params = {"symbols": json.dumps(symbols, separators=(',', ':'))}
+
+        response = self.http.get(url, params=params)
+        data = None
+
+        if response is not None and response.status_code == 400:
+            # 잘못된 심볼이 하나라도 있으면 400 응답 -> 전체 티커 조회로 대체
+            logger.warning(f"바이낸스 일괄 조회 거부 ({response.text}). 전체 티커 조회로 대체.")
+            data = self.http.get_json(url, label="바이낸스 전체 티커 조회")
+        elif response is not None and response.ok:
+            try:
+                data = response.json()
+            except ValueError as e:
+                logger.error(f"바이낸스 일괄 가격 응답 파싱 실패: {e}")
+        elif response is not None:
+            logger.error(f"바이낸스 일괄 가격 조회 응답 오류: HTTP {response.status_code}")
+
+        if not isinstance(data, list):
+            logger.error(f"바이낸스 일괄 가격 조회 실패 ({len(symbols)}개 심볼)")
+            return prices
+
+        for ticker in data:
+            symbol = ticker.get("symbol")
+            if symbol in prices:
+                try:
+                    prices[symbol] = float(ticker["price"])
+                except (KeyError, TypeError, ValueError):
+                    prices[symbol] = None
+
+        missing = [symbol for symbol, price in prices.items() if price is None]
+        if missing:
+            logger.error(f"바이낸스 가격 누락 심볼: {', '.join(missing)}")
+
+        return prices
+
+if __name__ == "__main__":
+    # 테스트 코드: 로컬 스텁 서버를 띄워 get_binance_prices 동작을 확인합니다.
+    import threading
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from urllib.parse import urlparse, parse_qs
+
+    STUB_PRICES = {"BTCUSDT": "65000.10", "ETHUSDT": "3500.20", "XRPUSDT": "0.5123"}
+    request_log = []
+
+    class StubBinanceHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            query = parse_qs(urlparse(self.path).query)
+            request_log.append(query)
+
+            if "symbols" in query:
+                requested = json.loads(query["symbols"][0])
+                if any(symbol not in STUB_PRICES for symbol in requested):
+                    self._reply(400, {"code": -1121, "msg": "Invalid symbol."})
+                    return
+            else:
+                requested = list(STUB_PRICES)
+
+            self._reply(200, [{"symbol": symbol, "price": STUB_PRICES[symbol]} for symbol in requested])
+
+        def _reply(self, status, body):
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), StubBinanceHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    ext = ExternalData(binance_base_url=f"http://127.0.0.1:{server.server_port}")
+
+    prices = ext.get_binance_prices(["BTCUSDT", "ETHUSDT"])
+    assert prices == {"BTCUSDT": 65000.10, "ETHUSDT": 3500.20}, prices
+    assert len(request_log) == 1
+
+    prices = ext.get_binance_prices(["BTCUSDT", "NOPEUSDT"])
+    assert prices == {"BTCUSDT": 65000.10, "NOPEUSDT": None}, prices
+    assert len(request_log) == 3 # 일괄 요청 거부 후 전체 티커 조회
+
+    server.shutdown()
+    print("get_binance_prices 스텁 서버 테스트 통과")
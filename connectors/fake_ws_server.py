@@ -0,0 +1,185 @@
+# 파일명: connectors/fake_ws_server.py
+import base64
+import hashlib
+import socket
+import struct
+import threading
+
+WS_MAGIC_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+OPCODE_TEXT = 0x1
+OPCODE_BINARY = 0x2
+OPCODE_CLOSE = 0x8
+OPCODE_PING = 0x9
+OPCODE_PONG = 0xA
+
+
+class FakeWebSocketServer:
+    """
+    테스트용 로컬 WebSocket 서버입니다. (표준 라이브러리만 사용)
+
+    실제 거래소 대신 127.0.0.1에 띄워 두고 시세 메시지를 broadcast()로 밀어 넣거나,
+    drop_clients()로 연결을 강제로 끊어 스트림의 재연결/갭 감지 동작을 확인할 때 사용합니다.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self._server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._server.bind((host, port))
+        self._server.listen(8)
+        self.host, self.port = self._server.getsockname()
+
+        self.clients = []
+        self.received = [] # 클라이언트가 보낸 메시지 (구독 요청 확인용)
+        self.connection_count = 0
+        self._lock = threading.Lock()
+        self._running = False
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}"
+
+    def start(self):
+        self._running = True
+        threading.Thread(target=self._accept_loop, name="fake-ws-accept", daemon=True).start()
+        return self
+
+    def stop(self):
+        self._running = False
+        self.drop_clients()
+        try:
+            self._server.close()
+        except OSError:
+            pass
+
+    def broadcast(self, message):
+        """연결된 모든 클라이언트에 메시지를 보냅니다. (str은 텍스트, bytes는 바이너리 프레임)"""
+        opcode = OPCODE_BINARY if isinstance(message, bytes) else OPCODE_TEXT
+        payload = message if isinstance(message, bytes) else message.encode()
+        frame = self._encode_frame(opcode, payload)
+
+        with self._lock:
+            clients = list(self.clients)
+        for client in clients:
+            try:
+                client.sendall(frame)
+            except OSError:
+                self._remove_client(client)
+
+    def drop_clients(self):
+        """모든 클라이언트 연결을 예고 없이 끊습니다. (네트워크 단절 재현용)"""
+        with self._lock:
+            clients, self.clients = self.clients, []
+        for client in clients:
+            try:
+                client.shutdown(socket.SHUT_RDWR)
+                client.close()
+            except OSError:
+                pass
+
+    def _accept_loop(self):
+        while self._running:
+            try:
+                client, _ = self._server.accept()
+            except OSError:
+                break
+            threading.Thread(target=self._serve_client, args=(client,), daemon=True).start()
+
+    def _serve_client(self, client):
+        if not self._handshake(client):
+            client.close()
+            return
+
+        with self._lock:
+            self.clients.append(client)
+            self.connection_count += 1
+
+        try:
+            while self._running:
+                opcode, payload = self._read_frame(client)
+                if opcode is None or opcode == OPCODE_CLOSE:
+                    break
+                if opcode == OPCODE_PING:
+                    client.sendall(self._encode_frame(OPCODE_PONG, payload))
+                elif opcode in (OPCODE_TEXT, OPCODE_BINARY):
+                    with self._lock:
+                        self.received.append(payload.decode(errors="replace"))
+        except OSError:
+            pass
+        finally:
+            self._remove_client(client)
+
+    def _remove_client(self, client):
+        with self._lock:
+            if client in self.clients:
+                self.clients.remove(client)
+        try:
+            client.close()
+        except OSError:
+            pass
+
+    def _handshake(self, client) -> bool:
+        request = b""
+        while b"\r\n\r\n" not in request:
+            chunk = client.recv(4096)
+            if not chunk:
+                return False
+            request += chunk
+
+        key = None
+        for line in request.decode(errors="replace").split("\r\n"):
+            name, _, value = line.partition(":")
+            if name.strip().lower() == "sec-websocket-key":
+                key = value.strip()
+        if key is None:
+            return False
+
+        accept = base64.b64encode(hashlib.sha1((key + WS_MAGIC_GUID).encode()).digest()).decode()
+        client.sendall((
+            "HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept}\r\n\r\n"
+        ).encode())
+        return True
+
+    def _recv_exact(self, client, size: int) -> bytes:
+        data = b""
+        while len(data) < size:
+            chunk = client.recv(size - len(data))
+            if not chunk:
+                raise OSError("connection closed")
+            data += chunk
+        return data
+
+    def _read_frame(self, client):
+        try:
+            head = self._recv_exact(client, 2)
+        except OSError:
+            return None, b""
+
+        opcode = head[0] & 0x0F
+        masked = head[1] & 0x80
+        length = head[1] & 0x7F
+        if length == 126:
+            length = struct.unpack("!H", self._recv_exact(client, 2))[0]
+        elif length == 127:
+            length = struct.unpack("!Q", self._recv_exact(client, 8))[0]
+
+        mask = self._recv_exact(client, 4) if masked else None
+        payload = self._recv_exact(client, length) if length else b""
+        if mask:
+            payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+        return opcode, payload
+
+    @staticmethod
+    def _encode_frame(opcode: int, payload: bytes) -> bytes:
+        header = bytes([0x80 | opcode])
+        length = len(payload)
+        if length < 126:
+            header += bytes([length])
+        elif length < 65536:
+            header += bytes([126]) + struct.pack("!H", length)
+        else:
+            header += bytes([127]) + struct.pack("!Q", length)
+        return header + payload
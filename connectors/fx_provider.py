@@ -0,0 +1,210 @@
+# 파일명: connectors/fx_provider.py
+import logging
+import statistics
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from config import settings
+from core.clock import SYSTEM_CLOCK
+from connectors.http_client import get_http_client
+
+logger = logging.getLogger(__name__)
+
+
+class FxQuote:
+    """USD/KRW 환율 값과 출처, 조회 시각"""
+
+    def __init__(self, rate: float, source: str, fetched_at: float, source_count: int = 1, clock=None):
+        self.rate = rate
+        self.source = source             # 예: "exchangerate-api" 또는 "median(exchangerate-api,open-er-api)"
+        self.fetched_at = fetched_at     # Unix Time (초)
+        self.source_count = source_count # 중앙값 계산에 사용된 소스 수
+        self.clock = clock or SYSTEM_CLOCK # 경과 시간 계산용 시계
+
+    @property
+    def age_sec(self) -> float:
+        return self.clock.time() - self.fetched_at
+
+    def __repr__(self):
+        return f"FxQuote({self.rate:,.2f} from {self.source}, {self.age_sec:.0f}s ago)"
+
+
+class FxSource:
+    """환율 소스 기본 클래스. fetch()는 USD/KRW 환율(float) 또는 실패 시 None을 반환합니다."""
+
+    name = "unknown"
+
+    def fetch(self):
+        raise NotImplementedError
+
+
+class ExchangeRateApiSource(FxSource):
+    """exchangerate-api.com (API 키 필요, 키가 없으면 이 소스는 건너뜀)"""
+
+    name = "exchangerate-api"
+
+    def __init__(self, api_key: str = None, http=None):
+        self.api_key = api_key if api_key is not None else settings.EXCHANGE_RATE_API_KEY
+        self.http = http or get_http_client()
+
+    def fetch(self):
+        if not self.api_key or "YOUR_EXCHANGE_RATE_API_KEY" in self.api_key:
+            # 예전에는 임시값 1350.0을 썼지만, 다른 소스와 중앙값을 내면 실제 환율을 왜곡하므로 제외
+            logger.warning("환율 API 키 누락. exchangerate-api 소스를 건너뜁니다.")
+            return None
+
+        data = self.http.get_json(f"https://v6.exchangerate-api.com/v6/{self.api_key}/latest/USD", label="환율 API")
+        if data is not None and data.get('result') == 'success' and 'KRW' in data.get('conversion_rates', {}):
+            return float(data['conversion_rates']['KRW'])
+        return None
+
+
+class JsonUrlSource(FxSource):
+    """키 없이 조회 가능한 JSON 환율 API. path는 응답에서 KRW 환율까지의 키 목록입니다."""
+
+    def __init__(self, name: str, url: str, path, http=None):
+        self.name = name
+        self.url = url
+        self.path = list(path)
+        self.http = http or get_http_client()
+
+    def fetch(self):
+        data = self.http.get_json(self.url, label=f"환율 API ({self.name})")
+        try:
+            for key in self.path:
+                data = data[key]
+            return float(data)
+        except (KeyError, IndexError, TypeError, ValueError):
+            return None
+
+
+class ImpliedCrossRateSource(FxSource):
+    """
+    업비트 KRW-<코인> 호가 중간값 / 바이낸스 <코인>USDT 호가 중간값으로 계산한 암시 환율입니다.
+    해당 코인의 김치 프리미엄이 그대로 섞이므로 다른 소스가 모두 실패했을 때의 보조 지표로만 사용합니다.
+    """
+
+    def __init__(self, coin: str = "BTC", http=None,
+                 upbit_base_url: str = "https://api.upbit.com", binance_base_url: str = "https://api.binance.com"):
+        self.coin = coin
+        self.name = f"implied-{coin.lower()}"
+        self.http = http or get_http_client()
+        self.upbit_base_url = upbit_base_url
+        self.binance_base_url = binance_base_url
+
+    def fetch(self):
+        upbit = self.http.get_json(f"{self.upbit_base_url}/v1/orderbook", params={"markets": f"KRW-{self.coin}"},
+                                   label=f"Upbit KRW-{self.coin} 호가 조회")
+        binance = self.http.get_json(f"{self.binance_base_url}/api/v3/ticker/bookTicker",
+                                     params={"symbol": f"{self.coin}USDT"}, label=f"바이낸스 {self.coin}USDT 호가 조회")
+        try:
+            best = upbit[0]['orderbook_units'][0]
+            krw_mid = (float(best['ask_price']) + float(best['bid_price'])) / 2
+            usdt_mid = (float(binance['askPrice']) + float(binance['bidPrice'])) / 2
+            return krw_mid / usdt_mid
+        except (KeyError, IndexError, TypeError, ValueError, ZeroDivisionError):
+            return None
+
+
+class FxRateProvider:
+    """
+    여러 환율 소스를 병렬로 조회해 중앙값을 쓰는 환율 제공자입니다. (stale-while-revalidate)
+
+    - get_quote()는 (최초 1회를 제외하고) 네트워크를 기다리지 않고 캐시된 값을 즉시 반환하며,
+      값이 FX_REFRESH_INTERVAL_SEC보다 오래되었으면 백그라운드 스레드에서 갱신을 시작합니다. (동시에 하나만)
+    - 마지막 성공 값이 FX_MAX_AGE_SEC보다 오래되면 None을 반환하여 전략이 대기(WAIT)하게 합니다.
+    - 모든 소스가 실패하면 FX_RETRY_INTERVAL_SEC 뒤에 다시 시도합니다.
+    """
+
+    def __init__(self, sources, refresh_interval_sec: float = None, max_age_sec: float = None,
+                 retry_interval_sec: float = None, clock=None):
+        self.sources = list(sources)
+        self.clock = clock or SYSTEM_CLOCK
+        self.refresh_interval_sec = refresh_interval_sec or settings.FX_REFRESH_INTERVAL_SEC
+        self.max_age_sec = max_age_sec or settings.FX_MAX_AGE_SEC
+        self.retry_interval_sec = retry_interval_sec or settings.FX_RETRY_INTERVAL_SEC
+
+        self._quote = None
+        self._last_attempt = 0.0
+        self._refreshing = False
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max(1, len(self.sources)), thread_name_prefix="fx")
+
+    @classmethod
+    def from_settings(cls, http=None, clock=None):
+        """settings.FX_SOURCES 설정으로 소스 목록을 구성합니다."""
+        sources = []
+        for source_conf in settings.FX_SOURCES:
+            if source_conf['type'] == "exchangerate-api":
+                sources.append(ExchangeRateApiSource(http=http))
+            elif source_conf['type'] == "json":
+                sources.append(JsonUrlSource(source_conf['name'], source_conf['url'], source_conf['path'], http=http))
+            elif source_conf['type'] == "implied":
+                sources.append(ImpliedCrossRateSource(source_conf.get('coin', "BTC"), http=http))
+            else:
+                logger.warning(f"알 수 없는 환율 소스 유형: {source_conf['type']}")
+        return cls(sources, clock=clock)
+
+    def get_quote(self):
+        """
+        최신 환율을 즉시 반환합니다. (갱신이 필요하면 백그라운드에서 시작)
+
+        :return: FxQuote 또는 값이 없거나 FX_MAX_AGE_SEC를 넘은 경우 None
+        """
+        with self._lock:
+            cold_start = self._quote is None and self._last_attempt == 0.0 and not self._refreshing
+            if cold_start:
+                self._refreshing = True
+                self._last_attempt = self.clock.time()
+        if cold_start:
+            # 처음 한 번만 동기 조회 (이후에는 항상 캐시 값을 즉시 반환)
+            self._refresh_in_background()
+
+        with self._lock:
+            quote = self._quote
+            current_time = self.clock.time()
+            is_stale = quote is None or (current_time - quote.fetched_at) >= self.refresh_interval_sec
+            if is_stale and not self._refreshing and (current_time - self._last_attempt) >= self.retry_interval_sec:
+                self._refreshing = True
+                self._last_attempt = current_time
+                threading.Thread(target=self._refresh_in_background, name="fx-refresh", daemon=True).start()
+
+        if quote is None:
+            return None
+        if quote.age_sec > self.max_age_sec:
+            logger.error(f"환율이 {quote.age_sec:.0f}초 동안 갱신되지 않았습니다 (최대 {self.max_age_sec}초). 환율 사용 중단.")
+            return None
+        return quote
+
+    def refresh(self):
+        """모든 소스를 병렬로 조회하여 중앙값으로 캐시를 갱신합니다. (블로킹)"""
+        fetched_at = self.clock.time()
+        futures = {source.name: self._executor.submit(self._fetch_source, source) for source in self.sources}
+        values = {name: future.result() for name, future in futures.items()}
+        values = {name: rate for name, rate in values.items() if rate is not None and rate > 0}
+
+        if not values:
+            logger.error("모든 환율 소스 조회 실패. 캐시된 값 유지.")
+            return None
+
+        names = sorted(values)
+        source = names[0] if len(names) == 1 else f"median({','.join(names)})"
+        quote = FxQuote(statistics.median(values.values()), source, fetched_at, len(values), self.clock)
+        with self._lock:
+            self._quote = quote
+        logger.info(f"[SUCCESS] 환율 갱신: {quote.rate:,.2f} ({source})")
+        return quote
+
+    @staticmethod
+    def _fetch_source(source):
+        try:
+            return source.fetch()
+        except Exception as e:
+            logger.error(f"환율 소스 {source.name} 조회 중 예외 발생: {e}")
+            return None
+
+    def _refresh_in_background(self):
+        try:
+            self.refresh()
+        finally:
+            with self._lock:
+                self._refreshing = False
@@ -0,0 +1,183 @@
+# 파일명: connectors/http_client.py
+import logging
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from config import settings
+from connectors.rate_limiter import get_rate_limiter
+from monitoring import metrics
+
+logger = logging.getLogger(__name__)
+
+# 재시도 대상 HTTP 상태 코드 (요청 제한 / 서버 일시 오류)
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+# 같은 요청을 다시 보내도 안전한 메서드 (주문 POST는 중복 체결 위험이 있어 제한적으로만 재시도)
+IDEMPOTENT_METHODS = {"GET", "HEAD", "DELETE"}
+
+# 라벨에는 호스트만 사용 (URL 경로에는 API 키 등이 들어갈 수 있음)
+_REQUEST_SECONDS = metrics.histogram("http_request_seconds", "HTTP 요청 1회(시도)의 소요 시간", ("host", "method"))
+_REQUESTS = metrics.counter("http_requests_total", "HTTP 요청 시도 수 (status: 상태 코드 또는 error)", ("host", "method", "status"))
+_RETRIES = metrics.counter("http_retries_total", "HTTP 재시도 수", ("host", "method"))
+_RATE_LIMITED = metrics.counter("http_rate_limit_timeouts_total", "요청 제한 토큰을 받지 못해 보내지 못한 요청 수", ("host",))
+
+
+class HttpClient:
+    """
+    모든 커넥터가 공유하는 HTTP 연결 계층입니다.
+
+    호스트별로 requests.Session을 하나씩 유지하여 TCP/TLS 연결을 재사용(keep-alive)하고,
+    연결 풀 크기, 호스트별 타임아웃, 지수 백오프(지터 포함) 재시도 정책을 한 곳에서 관리합니다.
+    모든 요청(재시도 포함)은 보내기 전에 RateLimiter의 토큰을 받아야 합니다.
+    """
+
+    def __init__(self, pool_maxsize: int = None, max_retries: int = None,
+                 backoff_base_sec: float = None, backoff_max_sec: float = None, rate_limiter=None):
+        self.pool_maxsize = pool_maxsize or settings.HTTP_POOL_MAXSIZE
+        self.max_retries = settings.HTTP_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff_base_sec = settings.HTTP_BACKOFF_BASE_SEC if backoff_base_sec is None else backoff_base_sec
+        self.backoff_max_sec = settings.HTTP_BACKOFF_MAX_SEC if backoff_max_sec is None else backoff_max_sec
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def get_session(self, host: str) -> requests.Session:
+        """호스트 전용 Session을 반환합니다. (없으면 연결 풀과 함께 생성)"""
+        session = self._sessions.get(host)
+        if session is not None:
+            return session
+
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                # 재시도는 request()에서 직접 처리하므로 어댑터 자체 재시도는 끔
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize, max_retries=0)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers.update({"Connection": "keep-alive", "Accept": "application/json"})
+                self._sessions[host] = session
+            return session
+
+    def get_timeout(self, host: str) -> float:
+        """호스트별 타임아웃(초)을 반환합니다."""
+        return settings.HTTP_HOST_TIMEOUTS.get(host, settings.HTTP_DEFAULT_TIMEOUT_SEC)
+
+    def _backoff_delay(self, attempt: int, response=None) -> float:
+        """재시도 대기 시간을 계산합니다. (Retry-After 헤더 우선, 없으면 full-jitter 지수 백오프)"""
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after:
+                try:
+                    return min(float(retry_after), self.backoff_max_sec)
+                except ValueError:
+                    pass
+        ceiling = min(self.backoff_max_sec, self.backoff_base_sec * (2 ** attempt))
+        return random.uniform(0, ceiling)
+
+    def request(self, method: str, url: str, **kwargs):
+        """
+        재시도 정책을 적용하여 HTTP 요청을 보냅니다.
+
+        재시도 대상 상태 코드(429, 5xx)나 통신 오류가 발생하면 백오프 후 다시 요청하며,
+        그 외의 응답(2xx, 4xx)은 그대로 반환합니다. 주문 같은 비멱등 요청은
+        서버에 도달하지 않은 것이 확실한 경우(연결 타임아웃, 429)에만 재시도합니다.
+
+        :return: requests.Response 또는 재시도를 모두 소진한 통신 오류 시 None
+        """
+        method = method.upper()
+        host = urlparse(url).netloc
+        session = self.get_session(host)
+        kwargs.setdefault("timeout", self.get_timeout(host))
+        idempotent = method in IDEMPOTENT_METHODS
+
+        for attempt in range(self.max_retries + 1):
+            is_last = attempt >= self.max_retries
+            if not self.rate_limiter.acquire(method, url, kwargs.get("params")):
+                _RATE_LIMITED.inc(host=host)
+                return None
+            started = time.perf_counter()
+            response = None
+            try:
+                response = session.request(method, url, **kwargs)
+            except requests.exceptions.ConnectTimeout as e:
+                error = e
+            except requests.exceptions.RequestException as e:
+                error = e
+                if not idempotent:
+                    logger.error(f"{method} {host} 통신 오류 (재시도 안 함): {e}")
+                    return None
+            finally:
+                _REQUEST_SECONDS.observe(time.perf_counter() - started, host=host, method=method)
+                _REQUESTS.inc(host=host, method=method, status=response.status_code if response is not None else "error")
+
+            if response is not None:
+                self.rate_limiter.observe(method, url, response, kwargs.get("params"))
+                retryable = response.status_code == 429 or \
+                            (idempotent and response.status_code in RETRY_STATUS_CODES)
+                if not retryable or is_last:
+                    return response
+                error = f"HTTP {response.status_code}"
+
+            if is_last:
+                logger.error(f"{method} {host} 요청 실패 ({attempt + 1}회 시도): {error}")
+                return None
+
+            delay = self._backoff_delay(attempt, response)
+            _RETRIES.inc(host=host, method=method)
+            logger.warning(f"{method} {host} 요청 재시도 {attempt + 1}/{self.max_retries} ({error}). {delay:.2f}초 후 재시도.")
+            time.sleep(delay)
+
+        return None
+
+    def get(self, url: str, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def get_json(self, url: str, params=None, headers=None, label: str = None):
+        """
+        GET 요청 후 JSON 응답을 파싱하여 반환합니다.
+
+        :param label: 오류 로그에 표시할 요청 이름
+        :return: 파싱된 JSON 또는 실패 시 None
+        """
+        label = label or urlparse(url).path
+        response = self.get(url, params=params, headers=headers)
+        if response is None:
+            return None
+
+        if not response.ok:
+            logger.error(f"{label} 응답 오류: HTTP {response.status_code} {response.text[:200]}")
+            return None
+
+        try:
+            return response.json()
+        except ValueError as e:
+            logger.error(f"{label} JSON 파싱 오류: {e}")
+            return None
+
+    def close(self):
+        """모든 세션의 연결을 닫습니다."""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+_shared_client = None
+_shared_client_lock = threading.Lock()
+
+def get_http_client() -> HttpClient:
+    """프로세스 전체에서 공유하는 HttpClient 인스턴스를 반환합니다."""
+    global _shared_client
+    if _shared_client is None:
+        with _shared_client_lock:
+            if _shared_client is None:
+                _shared_client = HttpClient()
+    return _shared_client
@@ -0,0 +1,397 @@
+# 파일명: connectors/market_stream.py
+import json
+import logging
+import random
+import threading
+import time
+import uuid
+from config import settings
+from connectors.orderbook import OrderBookStore, orderbook_from_upbit
+
+logger = logging.getLogger(__name__)
+
+UPBIT_WS_URL = "wss://api.upbit.com/websocket/v1"
+BINANCE_WS_URL = "wss://stream.binance.com:9443/stream"
+
+
+class PriceStore:
+    """
+    스트림이 수신한 최신 가격을 보관하는 스레드 안전 저장소입니다.
+
+    키 형식은 "거래소:심볼" (예: "upbit:KRW-USDT", "binance:ETHUSDT") 이며,
+    값과 함께 거래소 타임스탬프(ms)와 로컬 수신 시각(초)을 저장합니다.
+    recorder(storage/market_recorder.py)가 지정되면 수신한 가격을 모두 기록합니다.
+    """
+
+    def __init__(self, recorder=None):
+        self._prices = {}
+        self._version = 0
+        self._condition = threading.Condition()
+        self.recorder = recorder
+
+    def update(self, key: str, price: float, exchange_ts_ms: int = None):
+        local_ts = time.time()
+        with self._condition:
+            self._prices[key] = (price, exchange_ts_ms, local_ts)
+            self._version += 1
+            self._condition.notify_all()
+        if self.recorder is not None:
+            self.recorder.record(key, price, exchange_ts_ms, int(local_ts * 1000))
+
+    def get(self, key: str):
+        """(가격, 거래소 타임스탬프 ms, 로컬 수신 시각) 튜플 또는 None을 반환합니다."""
+        with self._condition:
+            return self._prices.get(key)
+
+    def get_price(self, key: str, max_age_sec: float = None):
+        """최신 가격을 반환합니다. max_age_sec보다 오래된 값이면 None을 반환합니다."""
+        entry = self.get(key)
+        if entry is None:
+            return None
+        price, _, local_ts = entry
+        if max_age_sec is not None and (time.time() - local_ts) > max_age_sec:
+            return None
+        return price
+
+    def snapshot(self) -> dict:
+        with self._condition:
+            return dict(self._prices)
+
+    @property
+    def version(self) -> int:
+        """가격이 갱신될 때마다 1씩 증가하는 카운터입니다."""
+        return self._version
+
+    def wait_for_update(self, last_version: int, timeout: float = None) -> int:
+        """
+        last_version 이후 가격이 갱신될 때까지 대기합니다.
+
+        :return: 현재 version (timeout이 지나도 갱신이 없으면 last_version 그대로)
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._version != last_version, timeout=timeout)
+            return self._version
+
+
+class WebSocketStream:
+    """
+    자동 재연결, 무응답 감시, 갭 감지를 제공하는 WebSocket 스트림 기본 클래스입니다.
+
+    하위 클래스는 build_subscription()과 handle_message()를 구현합니다.
+    """
+
+    name = "stream"
+    # 키별 메시지 예상 간격 (초). None이면 키별 갭 감지를 하지 않음 (체결이 있을 때만 오는 스트림 등)
+    expected_interval_sec = None
+
+    def __init__(self, url: str, store: PriceStore):
+        self.url = url
+        self.store = store
+
+        self.is_connected = False
+        self.reconnect_count = 0
+        self.gap_count = 0
+        self.last_message_time = 0.0
+
+        self._app = None
+        self._running = False
+        self._disconnected_at = None
+        self._last_exchange_ts = {}
+        self._thread = None
+        self._watchdog = None
+
+    def build_subscription(self):
+        """연결 직후 보낼 구독 메시지 (str/bytes) 또는 None"""
+        return None
+
+    def handle_message(self, message):
+        raise NotImplementedError
+
+    def is_healthy(self) -> bool:
+        """연결되어 있고 최근 STREAM_STALE_TIMEOUT_SEC 안에 메시지를 받았는지 여부"""
+        return self.is_connected and (time.time() - self.last_message_time) < settings.STREAM_STALE_TIMEOUT_SEC
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name=f"{self.name}-ws", daemon=True)
+        self._thread.start()
+        self._watchdog = threading.Thread(target=self._watch, name=f"{self.name}-watchdog", daemon=True)
+        self._watchdog.start()
+        return self
+
+    def stop(self):
+        self._running = False
+        if self._app is not None:
+            self._app.close()
+
+    def _run(self):
+        import websocket # websocket-client (스트림 사용 시에만 필요)
+
+        attempt = 0
+        while self._running:
+            self._app = websocket.WebSocketApp(
+                self.url,
+                on_open=self._on_open,
+                on_message=self._on_message,
+                on_error=self._on_error,
+                on_close=self._on_close,
+            )
+            self._app.run_forever(ping_interval=settings.STREAM_PING_INTERVAL_SEC,
+                                  ping_timeout=settings.STREAM_PING_INTERVAL_SEC / 2)
+            self.is_connected = False
+            if self._disconnected_at is None:
+                self._disconnected_at = time.time()
+
+            if not self._running:
+                break
+
+            # 지터를 포함한 지수 백오프 후 재연결
+            attempt = attempt + 1 if self.last_message_time < self._disconnected_at else 1
+            delay = random.uniform(0, min(settings.STREAM_RECONNECT_BACKOFF_MAX_SEC, 2 ** attempt))
+            logger.warning(f"{self.name} 스트림 연결 끊김. {delay:.1f}초 후 재연결 시도 ({attempt}회째).")
+            time.sleep(delay)
+            self.reconnect_count += 1
+
+    def _watch(self):
+        """일정 시간 메시지가 없으면 연결을 강제로 끊어 재연결을 유도합니다."""
+        while self._running:
+            time.sleep(1.0)
+            if self.is_connected and (time.time() - self.last_message_time) > settings.STREAM_STALE_TIMEOUT_SEC:
+                logger.warning(f"{self.name} 스트림 {settings.STREAM_STALE_TIMEOUT_SEC}초간 무응답. 재연결합니다.")
+                self.is_connected = False
+                if self._app is not None:
+                    self._app.close()
+
+    def _on_open(self, app):
+        self.is_connected = True
+        self.last_message_time = time.time()
+        subscription = self.build_subscription()
+        if subscription is not None:
+            app.send(subscription)
+        logger.info(f"✅ {self.name} 스트림 연결 완료")
+
+    def _on_message(self, app, message):
+        now = time.time()
+        if self._disconnected_at is not None:
+            # 연결이 끊겨 있던 동안의 데이터는 받지 못했음 -> 갭으로 기록
+            self.gap_count += 1
+            logger.warning(f"{self.name} 스트림 데이터 갭 감지: {now - self._disconnected_at:.1f}초간 수신 없음.")
+            self._disconnected_at = None
+        self.last_message_time = now
+
+        try:
+            self.handle_message(message)
+        except (ValueError, KeyError, TypeError) as e:
+            logger.error(f"{self.name} 스트림 메시지 처리 실패: {e}")
+
+    def _on_error(self, app, error):
+        logger.error(f"{self.name} 스트림 오류: {error}")
+
+    def _on_close(self, app, status_code, message):
+        self.is_connected = False
+        if self._disconnected_at is None:
+            self._disconnected_at = time.time()
+
+    def _publish(self, key: str, price: float, exchange_ts_ms: int = None):
+        """가격을 저장소에 기록하고, 키별 타임스탬프 점프(누락 구간)를 감지합니다."""
+        if self.expected_interval_sec is not None and exchange_ts_ms is not None:
+            last_ts = self._last_exchange_ts.get(key)
+            if last_ts is not None and (exchange_ts_ms - last_ts) / 1000.0 > settings.STREAM_GAP_THRESHOLD_SEC:
+                self.gap_count += 1
+                logger.warning(f"{self.name} {key} 데이터 갭 감지: {(exchange_ts_ms - last_ts) / 1000.0:.1f}초 누락.")
+            self._last_exchange_ts[key] = exchange_ts_ms
+
+        self.store.update(key, price, exchange_ts_ms)
+
+
+class UpbitTickerStream(WebSocketStream):
+    """업비트 ticker WebSocket 스트림 (예: KRW-USDT, KRW-ETH)"""
+
+    name = "Upbit"
+
+    def __init__(self, store: PriceStore, codes, url: str = UPBIT_WS_URL):
+        super().__init__(url, store)
+        self.codes = list(codes)
+
+    def build_subscription(self):
+        return json.dumps([
+            {"ticket": str(uuid.uuid4())},
+            {"type": "ticker", "codes": self.codes},
+        ])
+
+    def handle_message(self, message):
+        data = json.loads(message)
+        if data.get("type") != "ticker":
+            return
+        self._publish(f"upbit:{data['code']}", float(data['trade_price']), data.get('trade_timestamp') or data.get('timestamp'))
+
+
+class BinanceTickerStream(WebSocketStream):
+    """
+    바이낸스 miniTicker 결합 스트림 (예: ETHUSDT)
+
+    최근 체결가만 구독합니다. (REST 대체 조회 /ticker/price와 같은 값이어야 스트림/REST 전환 시 가격 기준이 바뀌지 않음)
+    """
+
+    name = "Binance"
+    expected_interval_sec = 1.0 # miniTicker는 1초마다 전송됨
+
+    def __init__(self, store: PriceStore, symbols, base_url: str = BINANCE_WS_URL):
+        streams = [f"{symbol.lower()}@miniTicker" for symbol in symbols]
+        super().__init__(f"{base_url}?streams={'/'.join(streams)}", store)
+        self.symbols = list(symbols)
+
+    def handle_message(self, message):
+        payload = json.loads(message)
+        data = payload.get("data", payload)
+        symbol = data.get("s")
+        if symbol is None:
+            return
+
+        if data.get("e") == "24hrMiniTicker":
+            # 최근 체결가 (REST /ticker/price와 같은 값)
+            self._publish(f"binance:{symbol}", float(data["c"]), data.get("E"))
+
+
+class UpbitOrderbookStream(WebSocketStream):
+    """
+    업비트 orderbook WebSocket 스트림입니다.
+
+    업비트는 변경분이 아닌 상위 호가 전체 스냅샷을 보내므로, 메시지마다 새 OrderBook을 만들어
+    저장소의 참조만 교체합니다. (읽는 쪽은 잠금 없이 일관된 스냅샷을 봄)
+    """
+
+    name = "Upbit-orderbook"
+
+    def __init__(self, books: OrderBookStore, codes, url: str = UPBIT_WS_URL):
+        super().__init__(url, store=None)
+        self.books = books
+        self.codes = list(codes)
+
+    def build_subscription(self):
+        return json.dumps([
+            {"ticket": str(uuid.uuid4())},
+            {"type": "orderbook", "codes": self.codes},
+        ])
+
+    def handle_message(self, message):
+        data = json.loads(message)
+        if data.get("type") != "orderbook":
+            return
+        self.books.update(orderbook_from_upbit(data))
+
+
+class MarketDataFeed:
+    """
+    업비트/바이낸스 스트림을 묶어 관리하고, 최신 가격을 조회하는 창구입니다.
+
+    스트림이 정상이면 저장된 최신 가격을 그대로 쓰고, 스트림이 끊긴 상태에서는
+    STREAM_MAX_AGE_SEC 이내의 값만 반환하여 호출자가 REST로 대체 조회하도록 합니다.
+    """
+
+    def __init__(self, upbit_codes, binance_symbols, store: PriceStore = None,
+                 upbit_url: str = UPBIT_WS_URL, binance_url: str = BINANCE_WS_URL, orderbook_codes=None):
+        self.store = store or PriceStore()
+        self.books = OrderBookStore()
+        self.streams = {}
+        if upbit_codes:
+            self.streams["upbit"] = UpbitTickerStream(self.store, upbit_codes, upbit_url)
+        if binance_symbols:
+            self.streams["binance"] = BinanceTickerStream(self.store, binance_symbols, binance_url)
+        if orderbook_codes:
+            self.streams["upbit_orderbook"] = UpbitOrderbookStream(self.books, orderbook_codes, upbit_url)
+
+    @classmethod
+    def from_settings(cls, store: PriceStore = None):
+        """활성 전략 목록에서 구독할 마켓을 결정하여 피드를 생성합니다."""
+        symbols = {conf['symbol'] for conf in settings.STRATEGY_LIST if conf.get('is_active')}
+        upbit_codes = ["KRW-USDT"] + sorted(f"KRW-{symbol}" for symbol in symbols if symbol != "USDT")
+        binance_symbols = sorted(f"{symbol}USDT" for symbol in symbols if symbol != "USDT")
+        orderbook_codes = upbit_codes if settings.ORDERBOOK_ENABLED else None
+        return cls(upbit_codes, binance_symbols, store, orderbook_codes=orderbook_codes)
+
+    def start(self):
+        for stream in self.streams.values():
+            stream.start()
+        return self
+
+    def stop(self):
+        for stream in self.streams.values():
+            stream.stop()
+
+    def _get(self, exchange: str, key: str):
+        stream = self.streams.get(exchange)
+        if stream is None:
+            return None
+        max_age = None if stream.is_healthy() else settings.STREAM_MAX_AGE_SEC
+        return self.store.get_price(key, max_age_sec=max_age)
+
+    def get_upbit_price(self, code: str):
+        """업비트 최신 체결가 (예: "KRW-USDT") 또는 신뢰할 수 없으면 None"""
+        return self._get("upbit", f"upbit:{code}")
+
+    def get_binance_price(self, symbol: str):
+        """바이낸스 최신 가격 (예: "ETHUSDT") 또는 신뢰할 수 없으면 None"""
+        return self._get("binance", f"binance:{symbol}")
+
+    def get_orderbook(self, code: str):
+        """업비트 최신 호가창 (예: "KRW-USDT") 또는 스트림이 없거나 ORDERBOOK_MAX_AGE_SEC보다 오래되었으면 None"""
+        if "upbit_orderbook" not in self.streams:
+            return None
+        return self.books.get(code, max_age_sec=settings.ORDERBOOK_MAX_AGE_SEC)
+
+
+if __name__ == "__main__":
+    # 테스트 코드: 로컬 가짜 WebSocket 서버로 수신 / 재연결 / 갭 감지를 확인합니다.
+    from connectors.fake_ws_server import FakeWebSocketServer
+
+    settings.STREAM_RECONNECT_BACKOFF_MAX_SEC = 0.2
+    upbit_server = FakeWebSocketServer().start()
+    binance_server = FakeWebSocketServer().start()
+
+    feed = MarketDataFeed(["KRW-USDT"], ["ETHUSDT"], upbit_url=upbit_server.url,
+                          binance_url=f"{binance_server.url}/stream").start()
+
+    def wait_until(condition, timeout=5.0):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if condition():
+                return True
+            time.sleep(0.02)
+        return False
+
+    assert wait_until(lambda: upbit_server.clients and binance_server.clients)
+    assert wait_until(lambda: upbit_server.received)
+    assert "KRW-USDT" in upbit_server.received[0]
+
+    now_ms = int(time.time() * 1000)
+    upbit_server.broadcast(json.dumps({"type": "ticker", "code": "KRW-USDT", "trade_price": 1402.0, "timestamp": now_ms}).encode())
+    binance_server.broadcast(json.dumps({"stream": "ethusdt@miniTicker",
+                                         "data": {"e": "24hrMiniTicker", "E": now_ms, "s": "ETHUSDT", "c": "3500.5"}}))
+    assert wait_until(lambda: feed.get_upbit_price("KRW-USDT") == 1402.0)
+    assert wait_until(lambda: feed.get_binance_price("ETHUSDT") == 3500.5)
+
+    # miniTicker 타임스탬프가 크게 건너뛰면 갭으로 감지
+    binance_server.broadcast(json.dumps({"stream": "ethusdt@miniTicker",
+                                         "data": {"e": "24hrMiniTicker", "E": now_ms + 60_000, "s": "ETHUSDT", "c": "3510.0"}}))
+    assert wait_until(lambda: feed.streams["binance"].gap_count == 1)
+    assert wait_until(lambda: feed.get_binance_price("ETHUSDT") == 3510.0)
+
+    # 호가(bookTicker) 메시지는 체결가를 덮어쓰지 않음
+    binance_server.broadcast(json.dumps({"stream": "ethusdt@bookTicker",
+                                         "data": {"u": 1, "s": "ETHUSDT", "b": "3600.0", "a": "3602.0"}}))
+    time.sleep(0.2)
+    assert feed.get_binance_price("ETHUSDT") == 3510.0
+
+    # 연결을 강제로 끊으면 자동 재연결 후 재구독하고, 첫 메시지에서 갭을 기록
+    upbit_server.drop_clients()
+    assert wait_until(lambda: upbit_server.connection_count == 2 and upbit_server.clients)
+    upbit_server.broadcast(json.dumps({"type": "ticker", "code": "KRW-USDT", "trade_price": 1405.0, "timestamp": now_ms}).encode())
+    assert wait_until(lambda: feed.get_upbit_price("KRW-USDT") == 1405.0)
+    assert feed.streams["upbit"].gap_count == 1
+    assert feed.streams["upbit"].reconnect_count == 1
+
+    feed.stop()
+    upbit_server.stop()
+    binance_server.stop()
+    print("MarketDataFeed 가짜 WebSocket 서버 테스트 통과")
@@ -0,0 +1,212 @@
+# 파일명: connectors/orderbook.py
+import threading
+import time
+from bisect import bisect_left
+
+
+class OrderBook:
+    """
+    한 마켓의 호가창입니다. 매도 호가(asks)는 가격 오름차순, 매수 호가(bids)는 가격 내림차순으로 보관합니다.
+
+    스트림 스냅샷은 replace()로 통째로 교체하고, 가격별 변경분만 오는 피드는 apply_delta()로
+    해당 가격 한 칸만 이분 탐색으로 갱신합니다. VWAP/슬리피지 계산은 최우선 호가부터 필요한
+    깊이까지만 순회합니다.
+    """
+
+    def __init__(self, code: str, asks=(), bids=(), timestamp_ms: int = None):
+        self.code = code
+        self.ask_prices, self.ask_sizes = [], []
+        self.bid_prices, self.bid_sizes = [], []
+        self.timestamp_ms = timestamp_ms
+        self.received_time = 0.0
+        self.replace(asks, bids, timestamp_ms)
+
+    def replace(self, asks, bids, timestamp_ms: int = None):
+        """[(가격, 수량), ...] 스냅샷으로 호가창 전체를 교체합니다."""
+        asks = sorted((float(price), float(size)) for price, size in asks if float(size) > 0)
+        bids = sorted(((float(price), float(size)) for price, size in bids if float(size) > 0), reverse=True)
+        self.ask_prices = [price for price, _ in asks]
+        self.ask_sizes = [size for _, size in asks]
+        self.bid_prices = [price for price, _ in bids]
+        self.bid_sizes = [size for _, size in bids]
+        self.timestamp_ms = timestamp_ms
+        self.received_time = time.time()
+
+    def apply_delta(self, side: str, price: float, size: float, timestamp_ms: int = None):
+        """
+        한 가격의 잔량을 갱신합니다. (size가 0이면 해당 가격 삭제)
+
+        :param side: "ask" 또는 "bid"
+        """
+        if side == "ask":
+            prices, sizes, key = self.ask_prices, self.ask_sizes, price
+            search = prices
+        else:
+            # bids는 내림차순이므로 부호를 뒤집은 값으로 이분 탐색
+            prices, sizes, key = self.bid_prices, self.bid_sizes, -price
+            search = _Negated(prices)
+
+        index = bisect_left(search, key)
+        exists = index < len(prices) and prices[index] == price
+        if size <= 0:
+            if exists:
+                del prices[index]
+                del sizes[index]
+        elif exists:
+            sizes[index] = size
+        else:
+            prices.insert(index, price)
+            sizes.insert(index, size)
+
+        self.timestamp_ms = timestamp_ms
+        self.received_time = time.time()
+
+    @property
+    def best_ask(self):
+        return self.ask_prices[0] if self.ask_prices else None
+
+    @property
+    def best_bid(self):
+        return self.bid_prices[0] if self.bid_prices else None
+
+    @property
+    def mid(self):
+        if not self.ask_prices or not self.bid_prices:
+            return None
+        return (self.ask_prices[0] + self.bid_prices[0]) / 2
+
+    @property
+    def age_sec(self) -> float:
+        return time.time() - self.received_time
+
+    def vwap_buy_krw(self, krw_amount: float):
+        """
+        원화 krw_amount로 시장가 매수할 때의 평균 체결가를 반환합니다.
+
+        :return: VWAP (KRW) 또는 호가 잔량이 부족하면 None
+        """
+        return _vwap_for_funds(self.ask_prices, self.ask_sizes, krw_amount)
+
+    def vwap_sell_volume(self, volume: float):
+        """volume개를 시장가 매도할 때의 평균 체결가 (잔량 부족 시 None)"""
+        return _vwap_for_volume(self.bid_prices, self.bid_sizes, volume)
+
+    def buy_slippage_pct(self, krw_amount: float):
+        """최우선 매도 호가 대비 매수 VWAP이 불리한 정도 (%)"""
+        vwap = self.vwap_buy_krw(krw_amount)
+        if vwap is None:
+            return None
+        return (vwap / self.ask_prices[0] - 1) * 100.0
+
+    def sell_slippage_pct(self, volume: float):
+        """최우선 매수 호가 대비 매도 VWAP이 불리한 정도 (%)"""
+        vwap = self.vwap_sell_volume(volume)
+        if vwap is None:
+            return None
+        return (1 - vwap / self.bid_prices[0]) * 100.0
+
+    def max_buy_krw_within(self, max_slippage_pct: float) -> float:
+        """슬리피지가 max_slippage_pct를 넘지 않는 최대 매수 금액 (KRW)"""
+        if not self.ask_prices:
+            return 0.0
+        limit_price = self.ask_prices[0] * (1 + max_slippage_pct / 100.0)
+        _, funds = _max_fill_within(self.ask_prices, self.ask_sizes, limit_price, buying=True)
+        return funds
+
+    def max_sell_volume_within(self, max_slippage_pct: float) -> float:
+        """슬리피지가 max_slippage_pct를 넘지 않는 최대 매도 수량"""
+        if not self.bid_prices:
+            return 0.0
+        limit_price = self.bid_prices[0] * (1 - max_slippage_pct / 100.0)
+        volume, _ = _max_fill_within(self.bid_prices, self.bid_sizes, limit_price, buying=False)
+        return volume
+
+
+class _Negated:
+    """내림차순 리스트를 부호를 뒤집은 오름차순 시퀀스처럼 보이게 하는 bisect용 래퍼"""
+
+    def __init__(self, values):
+        self.values = values
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, index):
+        return -self.values[index]
+
+
+def _vwap_for_funds(prices, sizes, funds: float):
+    remaining = funds
+    volume = 0.0
+    for price, size in zip(prices, sizes):
+        level_funds = price * size
+        if level_funds >= remaining:
+            volume += remaining / price
+            return funds / volume
+        remaining -= level_funds
+        volume += size
+    return None
+
+
+def _vwap_for_volume(prices, sizes, volume: float):
+    remaining = volume
+    funds = 0.0
+    for price, size in zip(prices, sizes):
+        if size >= remaining:
+            funds += remaining * price
+            return funds / volume
+        remaining -= size
+        funds += size * price
+    return None
+
+
+def _max_fill_within(prices, sizes, limit_price: float, buying: bool):
+    """
+    VWAP이 limit_price를 넘지(매도는 밑돌지) 않는 최대 (수량, 금액)을 구합니다.
+
+    가격 p인 호가에서 x개를 더 체결하면 VWAP = (funds + p*x) / (volume + x) 이므로,
+    p가 한도를 넘는 첫 호가에서 x = (limit * volume - funds) / (p - limit)까지만 체결합니다.
+    """
+    volume = 0.0
+    funds = 0.0
+    for price, size in zip(prices, sizes):
+        within = price <= limit_price if buying else price >= limit_price
+        if within:
+            volume += size
+            funds += price * size
+            continue
+        partial = (limit_price * volume - funds) / (price - limit_price)
+        partial = max(0.0, min(size, partial))
+        return volume + partial, funds + price * partial
+    return volume, funds
+
+
+def orderbook_from_upbit(data: dict) -> OrderBook:
+    """업비트 호가 응답(REST/WebSocket 공통 형식)을 OrderBook으로 변환합니다."""
+    units = data['orderbook_units']
+    return OrderBook(
+        data.get('market') or data.get('code'),
+        asks=[(unit['ask_price'], unit['ask_size']) for unit in units],
+        bids=[(unit['bid_price'], unit['bid_size']) for unit in units],
+        timestamp_ms=data.get('timestamp'),
+    )
+
+
+class OrderBookStore:
+    """스트림/REST로 받은 마켓별 최신 호가창을 보관하는 스레드 안전 저장소입니다."""
+
+    def __init__(self):
+        self._books = {}
+        self._lock = threading.Lock()
+
+    def update(self, book: OrderBook):
+        with self._lock:
+            self._books[book.code] = book
+
+    def get(self, code: str, max_age_sec: float = None):
+        """호가창 또는 없거나 max_age_sec보다 오래되었으면 None"""
+        with self._lock:
+            book = self._books.get(code)
+        if book is None or (max_age_sec is not None and book.age_sec > max_age_sec):
+            return None
+        return book
@@ -0,0 +1,262 @@
+# 파일명: connectors/rate_limiter.py
+import asyncio
+import heapq
+import itertools
+import logging
+import threading
+import time
+from urllib.parse import urlparse
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# 우선순위 (값이 작을수록 먼저 토큰을 받음)
+PRIORITY_ORDER = 0   # 주문 생성/취소
+PRIORITY_ACCOUNT = 1 # 잔고/주문 조회
+PRIORITY_QUOTE = 2   # 시세 조회
+
+UPBIT_HOST = "api.upbit.com"
+BINANCE_HOST = "api.binance.com"
+
+# 거래소 공용 요청 풀 이름 (settings.RATE_LIMIT_POOLS). 같은 풀을 쓰는 요청은 그룹과 관계없이 우선순위 순서로 토큰을 받음
+UPBIT_POOL = "upbit"
+BINANCE_POOL = "binance"
+
+# 업비트 Remaining-Req 헤더의 group 이름 -> 버킷 이름 (목록에 없는 그룹은 시세 조회로 취급)
+UPBIT_HEADER_GROUPS = {
+    "default": "upbit:exchange",
+    "order": "upbit:order",
+    "order-cancel": "upbit:order",
+}
+
+# 바이낸스 엔드포인트별 요청 가중치 (symbol 지정 시, 미지정/목록 조회 시)
+BINANCE_WEIGHTS = {
+    "/api/v3/ticker/price": (2, 4),
+    "/api/v3/ticker/bookTicker": (2, 4),
+    "/api/v3/depth": (5, 5),
+    "/api/v3/klines": (2, 2),
+}
+
+
+class TokenBucket:
+    """
+    스레드 안전한 토큰 버킷입니다.
+
+    capacity개까지 토큰이 쌓이고 초당 refill_per_sec개씩 채워집니다. 토큰을 기다리는 호출자는
+    (우선순위, 도착 순서)로 줄을 서며, 맨 앞의 호출자만 토큰을 가져갈 수 있으므로
+    주문 요청이 이미 대기 중인 시세 요청보다 먼저 처리됩니다.
+    """
+
+    def __init__(self, name: str, capacity: float, refill_per_sec: float):
+        self.name = name
+        self.capacity = float(capacity)
+        self.refill_per_sec = float(refill_per_sec)
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._condition = threading.Condition()
+        self._waiters = []             # (priority, ticket) 힙
+        self._tickets = itertools.count()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.refill_per_sec)
+        self._updated = now
+
+    def acquire(self, cost: float = 1.0, priority: int = PRIORITY_QUOTE, timeout: float = None) -> bool:
+        """
+        토큰 cost개를 얻을 때까지 대기합니다.
+
+        :return: 획득 여부 (timeout 안에 얻지 못하면 False)
+        """
+        cost = min(float(cost), self.capacity)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        waiter = (priority, next(self._tickets))
+
+        with self._condition:
+            heapq.heappush(self._waiters, waiter)
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    if self._waiters[0] == waiter and now >= self._blocked_until and self._tokens >= cost:
+                        self._tokens -= cost
+                        return True
+
+                    if self._waiters[0] != waiter:
+                        wait_sec = None # 앞선 호출자가 토큰을 가져가면 깨움
+                    elif now < self._blocked_until:
+                        wait_sec = self._blocked_until - now
+                    else:
+                        wait_sec = (cost - self._tokens) / self.refill_per_sec
+
+                    if deadline is not None:
+                        remaining = deadline - now
+                        if remaining <= 0:
+                            return False
+                        wait_sec = remaining if wait_sec is None else min(wait_sec, remaining)
+                    self._condition.wait(wait_sec)
+            finally:
+                self._waiters.remove(waiter)
+                heapq.heapify(self._waiters)
+                self._condition.notify_all()
+
+    async def acquire_async(self, cost: float = 1.0, priority: int = PRIORITY_QUOTE, timeout: float = None) -> bool:
+        """asyncio 코드용 acquire (이벤트 루프를 막지 않도록 기본 실행기 스레드에서 대기)"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.acquire, cost, priority, timeout)
+
+    def refund(self, cost: float):
+        """가져간 토큰을 되돌립니다. (다음 단계 버킷에서 시간 초과로 요청을 보내지 않은 경우)"""
+        with self._condition:
+            self._refill(time.monotonic())
+            self._tokens = min(self.capacity, self._tokens + min(float(cost), self.capacity))
+            self._condition.notify_all()
+
+    def calibrate(self, remaining: float):
+        """서버가 알려준 남은 요청 수가 로컬 추정보다 적으면 그 값으로 맞춥니다."""
+        with self._condition:
+            self._refill(time.monotonic())
+            self._tokens = max(0.0, min(self._tokens, float(remaining)))
+
+    def block_for(self, seconds: float):
+        """요청 제한 초과(429/418) 응답을 받았을 때 토큰을 비우고 seconds 동안 발급을 멈춥니다."""
+        with self._condition:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens = 0.0
+            self._blocked_until = max(self._blocked_until, now + seconds)
+            self._condition.notify_all()
+
+    def available(self) -> float:
+        with self._condition:
+            self._refill(time.monotonic())
+            return self._tokens
+
+
+class RateLimiter:
+    """
+    업비트/바이낸스 요청을 제한하는 중앙 요청 제한기입니다.
+
+    요청은 두 단계의 토큰 버킷을 거칩니다.
+    - 그룹 버킷 (settings.RATE_LIMITS): 서버가 엔드포인트 그룹별로 거는 제한 (업비트 시세/거래/주문)
+    - 풀 버킷 (settings.RATE_LIMIT_POOLS): 거래소의 모든 그룹이 함께 쓰는 요청 예산 (바이낸스는 요청 가중치 자체)
+    우선순위는 풀 버킷에서 적용되므로 요청이 몰리면 주문 -> 잔고/주문 조회 -> 시세 순서로 토큰을 받습니다.
+
+    HttpClient가 모든 요청 전에 acquire()를, 응답을 받은 뒤 observe()를 호출합니다.
+    observe()는 업비트 Remaining-Req 헤더와 바이낸스 X-MBX-USED-WEIGHT-1M 헤더로
+    버킷의 남은 토큰을 서버 기준으로 보정하고, 429/418 응답이면 해당 그룹(풀)을 잠시 멈춥니다.
+    """
+
+    def __init__(self, limits: dict = None, max_wait_sec: float = None, pools: dict = None):
+        limits = settings.RATE_LIMITS if limits is None else limits
+        pools = settings.RATE_LIMIT_POOLS if pools is None else pools
+        self.max_wait_sec = settings.RATE_LIMIT_MAX_WAIT_SEC if max_wait_sec is None else max_wait_sec
+        self.buckets = {name: TokenBucket(name, capacity, refill) for name, (capacity, refill) in limits.items()}
+        self.pools = {name: TokenBucket(name, capacity, refill) for name, (capacity, refill) in pools.items()}
+
+    def route(self, method: str, url: str, params=None):
+        """
+        요청을 (그룹 버킷 이름, 풀 이름, 비용, 우선순위)로 분류합니다. 제한 대상이 아니면 None.
+        (그룹 제한이 따로 없는 요청은 그룹 버킷 이름이 None)
+        """
+        parsed = urlparse(url)
+        host, path = parsed.netloc, parsed.path
+
+        if host == UPBIT_HOST:
+            if path.startswith("/v1/order") and method in ("POST", "DELETE"):
+                return "upbit:order", UPBIT_POOL, 1, PRIORITY_ORDER
+            if path.startswith(("/v1/accounts", "/v1/order", "/v1/orders")):
+                return "upbit:exchange", UPBIT_POOL, 1, PRIORITY_ACCOUNT
+            return "upbit:quotation", UPBIT_POOL, 1, PRIORITY_QUOTE
+
+        if host == BINANCE_HOST:
+            single_weight, list_weight = BINANCE_WEIGHTS.get(path, (1, 1))
+            has_symbol = isinstance(params, dict) and "symbol" in params
+            return None, BINANCE_POOL, single_weight if has_symbol else list_weight, PRIORITY_QUOTE
+
+        return None
+
+    def acquire(self, method: str, url: str, params=None) -> bool:
+        """요청을 보내기 전에 호출합니다. 제한 대상이 아니면 즉시 True"""
+        route = self.route(method, url, params)
+        if route is None:
+            return True
+
+        group, pool, cost, priority = route
+        deadline = time.monotonic() + self.max_wait_sec
+        group_bucket = self.buckets.get(group)
+        pool_bucket = self.pools.get(pool)
+
+        # 그룹 제한을 먼저 통과한 요청끼리 풀에서 우선순위대로 경쟁
+        if group_bucket is not None and not group_bucket.acquire(cost, priority, timeout=self.max_wait_sec):
+            name = group
+        elif pool_bucket is not None and not pool_bucket.acquire(cost, priority, timeout=max(0.0, deadline - time.monotonic())):
+            if group_bucket is not None:
+                group_bucket.refund(cost)
+            name = pool
+        else:
+            return True
+        logger.warning(f"{name} 요청 제한 대기 시간 초과 ({self.max_wait_sec}초). {method} {urlparse(url).path} 요청을 보내지 않습니다.")
+        return False
+
+    async def acquire_async(self, method: str, url: str, params=None) -> bool:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.acquire, method, url, params)
+
+    def observe(self, method: str, url: str, response, params=None):
+        """응답 헤더로 남은 요청 수를 보정하고, 요청 제한 초과 응답이면 그룹을 일시 정지합니다."""
+        route = self.route(method, url, params)
+        if route is None:
+            return
+        group, pool = route[0], route[1]
+        name = group or pool
+        bucket = self.buckets.get(group) or self.pools.get(pool)
+        if bucket is None:
+            return
+
+        if pool == UPBIT_POOL:
+            header = response.headers.get("Remaining-Req")
+            if header:
+                header_group, remaining = _parse_remaining_req(header)
+                if remaining is not None:
+                    name = UPBIT_HEADER_GROUPS.get(header_group, "upbit:quotation")
+                    bucket = self.buckets.get(name, bucket)
+                    bucket.calibrate(remaining)
+        else:
+            used_weight = response.headers.get("X-MBX-USED-WEIGHT-1M")
+            if used_weight and used_weight.isdigit():
+                bucket.calibrate(bucket.capacity - int(used_weight))
+
+        if response.status_code in (418, 429):
+            retry_after = response.headers.get("Retry-After")
+            try:
+                pause_sec = float(retry_after) if retry_after else settings.RATE_LIMIT_PENALTY_SEC
+            except ValueError:
+                pause_sec = settings.RATE_LIMIT_PENALTY_SEC
+            logger.warning(f"{name} 요청 제한 초과 응답 (HTTP {response.status_code}). {pause_sec:.1f}초 동안 요청을 멈춥니다.")
+            bucket.block_for(pause_sec)
+
+
+def _parse_remaining_req(header: str):
+    """'group=default; min=1799; sec=29' -> ('default', 29)"""
+    fields = {}
+    for part in header.split(";"):
+        key, _, value = part.strip().partition("=")
+        fields[key] = value
+    try:
+        return fields.get("group"), int(fields["sec"])
+    except (KeyError, ValueError):
+        return fields.get("group"), None
+
+
+_shared_limiter = None
+_shared_limiter_lock = threading.Lock()
+
+def get_rate_limiter() -> RateLimiter:
+    """프로세스 전체에서 공유하는 RateLimiter 인스턴스를 반환합니다."""
+    global _shared_limiter
+    if _shared_limiter is None:
+        with _shared_limiter_lock:
+            if _shared_limiter is None:
+                _shared_limiter = RateLimiter()
+    return _shared_limiter
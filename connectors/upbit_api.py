@@ -1,6 +1,25 @@
 # 파일명: connectors/upbit_api.py
-import pyupbit
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import uuid
+from urllib.parse import urlencode
 from config import settings # settings.py에서 API 키를 가져오기 위함
+from connectors.http_client import get_http_client
+from connectors.orderbook import orderbook_from_upbit
+
+logger = logging.getLogger(__name__)
+
+UPBIT_BASE_URL = "https://api.upbit.com"
+
+# pyupbit와 같은 캔들 주기 이름 -> Upbit 캔들 API 경로
+CANDLE_PATHS = {
+    "minute1": "minutes/1", "minute3": "minutes/3", "minute5": "minutes/5", "minute10": "minutes/10",
+    "minute15": "minutes/15", "minute30": "minutes/30", "minute60": "minutes/60", "minute240": "minutes/240",
+    "day": "days", "week": "weeks", "month": "months",
+}
 
 class UpbitAPI:
     """
@@ -10,11 +29,15 @@ class UpbitAPI:
     
     def __init__(self):
         """
-        API 키를 사용하여 pyupbit 객체를 초기화합니다.
+        API 키를 설정합니다.
         실제 주문 기능 사용 시 settings.py의 키를 사용합니다.
         """
-        self.upbit = pyupbit.Upbit(settings.UPBIT_ACCESS_KEY, settings.UPBIT_SECRET_KEY)
-        print("✅ UpbitAPI 초기화 완료")
+        # JWT 인증 헤더는 직접 만들고 REST 호출은 keep-alive 연결을 재사용하는 공용 HttpClient로 보냅니다.
+        # (pyupbit는 pandas까지 import하여 기동이 느려지므로 get_ohlcv에서만 필요할 때 import)
+        self.access_key = settings.UPBIT_ACCESS_KEY
+        self.secret_key = settings.UPBIT_SECRET_KEY
+        self.http = get_http_client()
+        logger.info("✅ UpbitAPI 초기화 완료")
 
     def get_usdt_krw_price(self):
         """(레거시 지원) 업비트의 KRW-USDT 마켓 현재 가격을 조회합니다."""
@@ -27,31 +50,155 @@ class UpbitAPI:
         :param ticker: 조회할 코인 티커 (예: "KRW-BTC", "KRW-USDT")
         :return: 현재 가격 (float) 또는 실패 시 None
         """
+        data = self.http.get_json(f"{UPBIT_BASE_URL}/v1/ticker", params={"markets": ticker}, label=f"Upbit {ticker} 가격 조회")
+
         try:
-            price = pyupbit.get_current_price(ticker)
-            
-            if price is None:
-                print(f"[ERROR] Upbit {ticker} 가격 조회 실패: None 반환")
-                return None
-            
-            return price
-        
-        except Exception as e:
-            print(f"[ERROR] {ticker} 가격 조회 중 예외 발생: {e}")
+            return float(data[0]['trade_price'])
+        except (IndexError, KeyError, TypeError, ValueError):
+            logger.error(f"Upbit {ticker} 가격 조회 실패: {data}")
+            return None
+
+    def get_orderbooks(self, tickers):
+        """
+        여러 마켓의 호가창을 한 번의 요청으로 조회합니다.
+
+        :param tickers: 조회할 마켓 목록 (예: ["KRW-USDT", "KRW-ETH"])
+        :return: {마켓: OrderBook} (실패 시 빈 dict)
+        """
+        data = self.http.get_json(f"{UPBIT_BASE_URL}/v1/orderbook", params={"markets": ",".join(tickers)},
+                                  label="Upbit 호가 조회")
+        if not isinstance(data, list):
+            return {}
+        books = {}
+        for item in data:
+            try:
+                book = orderbook_from_upbit(item)
+            except (KeyError, TypeError, ValueError):
+                continue
+            books[book.code] = book
+        return books
+
+    def get_candles(self, ticker, interval="minute1", count=200, to=None):
+        """
+        캔들 원본 데이터를 조회합니다. (최신 캔들부터 내림차순, 최대 200개)
+
+        :param interval: "minute1" ~ "minute240", "day", "week", "month"
+        :param to: 이 시각(UTC, "YYYY-MM-DDTHH:MM:SSZ") 이전의 캔들만 조회 (None이면 최신부터)
+        :return: Upbit 캔들 dict 목록 또는 실패 시 None
+        """
+        path = CANDLE_PATHS.get(interval)
+        if path is None:
+            logger.error(f"지원하지 않는 캔들 주기: {interval}")
+            return None
+
+        params = {"market": ticker, "count": min(count, 200)}
+        if to is not None:
+            params["to"] = to
+        return self.http.get_json(f"{UPBIT_BASE_URL}/v1/candles/{path}", params=params, label=f"Upbit {ticker} {interval} 캔들 조회")
+
+    def has_credentials(self) -> bool:
+        """인증이 필요한 API(잔고/주문)를 호출할 API 키가 설정되어 있는지"""
+        return bool(self.access_key) and bool(self.secret_key)
+
+    def _request_headers(self, query: dict = None):
+        """
+        Upbit Exchange API 인증 헤더 (HS256 JWT, 쿼리가 있으면 SHA512 query_hash 포함)
+
+        :return: 헤더 dict 또는 API 키가 설정되지 않았으면 None
+        """
+        if not self.has_credentials():
+            return None
+        payload = {"access_key": self.access_key, "nonce": str(uuid.uuid4())}
+        if query is not None:
+            query_string = urlencode(query, doseq=True).replace("%5B%5D=", "[]=")
+            payload['query_hash'] = hashlib.sha512(query_string.encode()).hexdigest()
+            payload['query_hash_alg'] = "SHA512"
+
+        header = _b64url(json.dumps({"alg": "HS256", "typ": "JWT"}, separators=(",", ":")).encode())
+        body = _b64url(json.dumps(payload, separators=(",", ":")).encode())
+        signing_input = f"{header}.{body}".encode()
+        signature = _b64url(hmac.new(self.secret_key.encode(), signing_input, hashlib.sha256).digest())
+        return {"Authorization": f"Bearer {header}.{body}.{signature}"}
+
+    def _private_request(self, method: str, path: str, query: dict = None):
+        """
+        인증이 필요한 Upbit Exchange API를 호출합니다.
+
+        :return: 파싱된 JSON 응답 또는 실패 시 None
+        """
+        url = f"{UPBIT_BASE_URL}{path}"
+        headers = self._request_headers(query)
+        if headers is None:
+            logger.error(f"Upbit API 키 미설정: {method} {path} 요청을 보내지 않습니다.")
+            return None
+
+        if method == "GET":
+            response = self.http.get(url, params=query, headers=headers)
+        else:
+            headers["Content-Type"] = "application/json"
+            response = self.http.request(method, url, data=json.dumps(query) if query else None, headers=headers)
+
+        if response is None:
+            return None
+
+        try:
+            data = response.json()
+        except ValueError:
+            data = None
+
+        if not response.ok:
+            logger.error(f"Upbit {method} {path} 응답 오류: HTTP {response.status_code} {data}")
             return None
+        return data
+
+    def get_balances(self):
+        """
+        전체 계좌 잔고를 조회합니다.
+
+        :return: [{"currency": "KRW", "balance": "...", "locked": "...", ...}, ...] 또는 실패 시 None
+        """
+        return self._private_request("GET", "/v1/accounts")
+
+    def buy_market_order(self, ticker, price):
+        """시장가 매수 (price: 매수할 원화 금액)"""
+        query = {"market": ticker, "side": "bid", "price": str(price), "ord_type": "price"}
+        return self._private_request("POST", "/v1/orders", query)
+
+    def sell_market_order(self, ticker, volume):
+        """시장가 매도 (volume: 매도할 코인 수량)"""
+        query = {"market": ticker, "side": "ask", "volume": str(volume), "ord_type": "market"}
+        return self._private_request("POST", "/v1/orders", query)
+
+    def get_orders_by_uuids(self, uuids):
+        """
+        여러 주문의 상태를 한 번의 요청으로 조회합니다. (최대 100개)
+
+        :return: Upbit 주문 dict 목록 또는 실패 시 None
+        """
+        return self._private_request("GET", "/v1/orders/uuids", {"uuids[]": list(uuids)})
 
-    def get_ohlcv(self, ticker, interval="day", count=200):
+    def get_order(self, uuid):
+        """개별 주문 상세 조회 (체결 내역 trades 포함)"""
+        return self._private_request("GET", "/v1/order", {"uuid": uuid})
+
+    def get_ohlcv(self, ticker, interval="day", count=200, to=None):
         """
         (확장 기능) 특정 티커의 캔들(OHLCV) 데이터를 조회합니다.
         향후 RSI, 빗각 자동 작도 등에 사용됩니다.
+
+        :param to: 이 시각 이전의 캔들까지 조회 (None이면 최신 캔들까지)
         """
         try:
-            df = pyupbit.get_ohlcv(ticker, interval=interval, count=count)
+            import pyupbit
+            df = pyupbit.get_ohlcv(ticker, interval=interval, count=count, to=to)
             return df
         except Exception as e:
-            print(f"[ERROR] OHLCV 조회 실패: {e}")
+            logger.error(f"OHLCV 조회 실패: {e}")
             return None
 
+def _b64url(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
 if __name__ == "__main__":
     # 테스트 코드
     api = UpbitAPI()
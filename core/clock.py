@@ -0,0 +1,90 @@
+# 파일명: core/clock.py
+"""
+시각 조회/대기를 주입할 수 있는 시계입니다.
+
+전략, ExternalData(환율 경과 시간), 주문 처리, main_loop은 time.time() 대신 주입받은 시계를 사용하므로
+같은 코드를 실거래(SystemClock), 리플레이(VirtualClock), 대량 백테스트(StepClock)에서 그대로 실행합니다.
+"""
+import threading
+import time
+
+
+class Clock:
+    """시계 인터페이스 (time()은 Unix Time 초, sleep()은 이 시계 기준 대기)"""
+
+    def time(self) -> float:
+        raise NotImplementedError
+
+    def sleep(self, seconds: float):
+        raise NotImplementedError
+
+    def time_ms(self) -> int:
+        return int(self.time() * 1000)
+
+
+class SystemClock(Clock):
+    """실제 시간을 사용하는 시계 (실거래 기본값)"""
+
+    def time(self) -> float:
+        return time.time()
+
+    def sleep(self, seconds: float):
+        if seconds > 0:
+            time.sleep(seconds)
+
+
+class VirtualClock(Clock):
+    """
+    리플레이용 가상 시계입니다.
+
+    sleep()은 실제로 기다리지 않고 가상 시각만 앞으로 옮기므로, 메인 루프의 대기 시간만큼
+    시간이 흐른 것처럼 실제 시간보다 빠르게 실행됩니다.
+    """
+
+    def __init__(self, start: float):
+        self._now = float(start)
+        self._lock = threading.Lock()
+
+    def time(self) -> float:
+        with self._lock:
+            return self._now
+
+    def sleep(self, seconds: float):
+        if seconds > 0:
+            self.advance(seconds)
+
+    def advance(self, seconds: float):
+        with self._lock:
+            self._now += seconds
+
+    def advance_to(self, timestamp: float):
+        """timestamp까지 시각을 옮깁니다. (이미 지났으면 그대로)"""
+        with self._lock:
+            self._now = max(self._now, float(timestamp))
+
+
+class StepClock(Clock):
+    """
+    대량 백테스트용 단계 시계입니다.
+
+    시각은 구동하는 쪽(backtest/engine.py)이 행마다 set_time_ms()로 직접 옮기고, sleep()은 아무것도 하지 않습니다.
+    단일 스레드에서만 쓰므로 잠금이 없어 행마다 호출해도 비용이 거의 없습니다.
+    """
+
+    def __init__(self, start_ms: int = 0):
+        self._now_ms = int(start_ms)
+
+    def time(self) -> float:
+        return self._now_ms / 1000
+
+    def time_ms(self) -> int:
+        return self._now_ms
+
+    def sleep(self, seconds: float):
+        pass
+
+    def set_time_ms(self, timestamp_ms: int):
+        self._now_ms = int(timestamp_ms)
+
+
+SYSTEM_CLOCK = SystemClock()
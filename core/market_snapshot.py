@@ -0,0 +1,209 @@
+# 파일명: core/market_snapshot.py
+"""
+틱마다 전략에 전달하는 시장 데이터 스냅샷입니다.
+
+필드 이름("eth_usdt_price" 등)은 프로세스 안에서 고정된 정수 슬롯으로 한 번만 변환하고(field_slot),
+값/수집 시각은 슬롯 번호로 인덱싱하는 리스트에 보관합니다. 전략은 생성 시 슬롯을 구해 두고
+current_data.get(slot)으로 조회하므로 틱마다 문자열을 만들거나 dict를 새로 만들지 않습니다.
+기존 코드와의 호환을 위해 get("이름") / data["이름"] 같은 dict 방식 조회도 그대로 지원합니다.
+"""
+import threading
+
+# 숫자 슬롯이 아닌 속성으로 보관하는 항목 (dict 방식 조회 시 속성 값을 반환)
+ATTRIBUTE_KEYS = ('timestamp_ms', 'orderbooks', 'failed_keys', 'fx_source')
+
+_slots = {}  # 필드 이름 -> 슬롯 번호
+_names = []  # 슬롯 번호 -> 필드 이름
+_lock = threading.Lock()
+
+
+def field_slot(name: str) -> int:
+    """필드 이름의 슬롯 번호 (처음 요청될 때 배정되며 프로세스가 끝날 때까지 바뀌지 않음)"""
+    slot = _slots.get(name)
+    if slot is not None:
+        return slot
+    if name in ATTRIBUTE_KEYS:
+        raise ValueError(f"{name}은(는) 슬롯이 아닌 스냅샷 속성입니다.")
+    with _lock:
+        slot = _slots.get(name)
+        if slot is None:
+            slot = len(_names)
+            _names.append(name)
+            _slots[name] = slot
+    return slot
+
+
+def field_name(slot: int) -> str:
+    return _names[slot]
+
+
+def price_field(symbol: str) -> str:
+    """심볼의 해외(바이낸스) USD 가격 필드 이름 (예: "ETH" -> "eth_usdt_price")"""
+    return f"{symbol.lower()}_usdt_price"
+
+
+# 공통 필드는 import 시 슬롯을 미리 배정 (전략/수집 코드에서 상수로 사용)
+USDT_KRW_PRICE = field_slot('usdt_krw_price') # USD/KRW 환율
+USDT_PRICE = field_slot('usdt_price')         # 업비트 KRW-USDT 가격
+KIMCHI_PREMIUM = field_slot('kimchi_premium')
+KIMCHI_PREMIUM_VWAP_BUY = field_slot('kimchi_premium_vwap_buy')   # KRW-USDT 호가창에서 KIMP_VWAP_ORDER_KRW만큼 매수할 때의 김프
+KIMCHI_PREMIUM_VWAP_SELL = field_slot('kimchi_premium_vwap_sell') # 같은 금액만큼 매도할 때의 김프
+FX_AGE_SEC = field_slot('fx_age_sec')
+
+
+class MarketSnapshot:
+    """
+    슬롯 배열 기반 시장 데이터 스냅샷입니다.
+
+    - 값이 None인 슬롯은 이번 틱에 수집하지 못한(유효하지 않은) 항목이며, 슬롯별 수집 시각(ms)을 함께 보관합니다.
+    - reset()으로 같은 객체를 다음 틱에 다시 채워 쓸 수 있습니다. (main_loop은 스냅샷 하나를 계속 재사용)
+    - 프로세스마다 슬롯 번호가 다를 수 있으므로 pickle은 필드 이름 기준으로 저장합니다. (core/sharded_runner.py)
+    """
+
+    __slots__ = ('timestamp_ms', 'orderbooks', 'failed_keys', 'fx_source', '_values', '_timestamps')
+
+    def __init__(self, timestamp_ms: int = None):
+        size = len(_names)
+        self._values = [None] * size
+        self._timestamps = [None] * size
+        self.timestamp_ms = timestamp_ms # 수집 시각 (추세선 등 시각에 의존하는 전략의 현재 시각)
+        self.orderbooks = {}             # 마켓 -> OrderBook
+        self.failed_keys = []            # 수집에 실패한 필드 이름
+        self.fx_source = None
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        snapshot = cls(data.get('timestamp_ms'))
+        for key, value in data.items():
+            snapshot[key] = value
+        return snapshot
+
+    def reset(self, timestamp_ms: int = None):
+        """모든 값을 무효화하고 다음 틱에 다시 채웁니다. (리스트/dict는 새로 만들지 않음)"""
+        values = self._values
+        timestamps = self._timestamps
+        for slot in range(len(values)):
+            values[slot] = None
+            timestamps[slot] = None
+        self.timestamp_ms = timestamp_ms
+        self.orderbooks.clear()
+        self.failed_keys.clear()
+        self.fx_source = None
+        return self
+
+    def _grow(self):
+        missing = len(_names) - len(self._values)
+        self._values.extend([None] * missing)
+        self._timestamps.extend([None] * missing)
+
+    # ---------------------------------------------------------
+    # 값 기록
+    # ---------------------------------------------------------
+    def set(self, key, value, timestamp_ms: int = None):
+        """
+        :param key: 슬롯 번호 또는 필드 이름
+        :param value: 값 (None 또는 NaN이면 무효)
+        :param timestamp_ms: 값의 기준 시각 (없으면 스냅샷 수집 시각)
+        """
+        if key.__class__ is not int:
+            if key in ATTRIBUTE_KEYS:
+                setattr(self, key, value)
+                return
+            key = field_slot(key)
+        if key >= len(self._values):
+            self._grow()
+        if value is not None and value != value:
+            value = None
+        self._values[key] = value
+        self._timestamps[key] = None if value is None else (self.timestamp_ms if timestamp_ms is None else timestamp_ms)
+
+    __setitem__ = set
+
+    # ---------------------------------------------------------
+    # 조회 (dict 호환)
+    # ---------------------------------------------------------
+    def get(self, key, default=None):
+        """슬롯 번호 또는 필드 이름으로 값을 조회합니다. (무효/없는 항목은 default)"""
+        if key.__class__ is int:
+            slot = key
+        else:
+            slot = _slots.get(key)
+            if slot is None:
+                value = getattr(self, key) if key in ATTRIBUTE_KEYS else None
+                return default if value is None else value
+        value = self._values[slot] if slot < len(self._values) else None
+        return default if value is None else value
+
+    def __getitem__(self, key):
+        return self.get(key)
+
+    def __contains__(self, key) -> bool:
+        return self.get(key) is not None
+
+    def timestamp_of(self, key):
+        """항목 값의 기준 시각 (ms, 무효이면 None)"""
+        slot = key if key.__class__ is int else _slots.get(key)
+        if slot is None or slot >= len(self._timestamps):
+            return None
+        return self._timestamps[slot]
+
+    def items(self):
+        """유효한 숫자 항목과 속성 항목을 (이름, 값)으로 반환합니다."""
+        for slot, value in enumerate(self._values):
+            if value is not None:
+                yield _names[slot], value
+        for key in ATTRIBUTE_KEYS:
+            yield key, getattr(self, key)
+
+    def keys(self):
+        return [key for key, _ in self.items()]
+
+    def to_dict(self) -> dict:
+        return dict(self.items())
+
+    def __getstate__(self):
+        fields = {_names[slot]: (value, self._timestamps[slot])
+                  for slot, value in enumerate(self._values) if value is not None}
+        return self.timestamp_ms, self.orderbooks, self.failed_keys, self.fx_source, fields
+
+    def __setstate__(self, state):
+        timestamp_ms, orderbooks, failed_keys, fx_source, fields = state
+        self.__init__(timestamp_ms)
+        self.orderbooks = orderbooks
+        self.failed_keys = failed_keys
+        self.fx_source = fx_source
+        for name, (value, field_timestamp_ms) in fields.items():
+            self.set(name, value, field_timestamp_ms)
+
+    def __repr__(self):
+        fields = "".join(f", {_names[slot]}={value}" for slot, value in enumerate(self._values) if value is not None)
+        return f"MarketSnapshot(timestamp_ms={self.timestamp_ms}{fields})"
+
+
+class ColumnRowView:
+    """
+    백테스트 컬럼({컬럼명: numpy 배열}, backtest/data_loader.py 형식)의 한 행을 MarketSnapshot으로 보여 주는 뷰입니다.
+    at()은 같은 스냅샷 객체에 해당 행 값을 채워 반환하므로 행마다 dict를 만들지 않습니다. (NaN -> 무효)
+    """
+
+    __slots__ = ('snapshot', '_timestamp_ms', '_columns')
+
+    def __init__(self, columns: dict):
+        self._timestamp_ms = columns['timestamp_ms']
+        self._columns = [(field_slot(name), values) for name, values in columns.items() if name != 'timestamp_ms']
+        self.snapshot = MarketSnapshot()
+
+    def at(self, index: int) -> MarketSnapshot:
+        snapshot = self.snapshot
+        timestamp_ms = int(self._timestamp_ms[index])
+        snapshot.timestamp_ms = timestamp_ms
+        values = snapshot._values
+        timestamps = snapshot._timestamps
+        for slot, column in self._columns:
+            value = column[index]
+            if value != value:
+                values[slot] = timestamps[slot] = None
+            else:
+                values[slot] = value.item()
+                timestamps[slot] = timestamp_ms
+        return snapshot
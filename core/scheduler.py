@@ -0,0 +1,71 @@
+# 파일명: core/scheduler.py
+from config import settings
+
+
+class StrategyScheduler:
+    """
+    가격 변화에 반응하는 이벤트 기반 전략 스케줄러입니다.
+
+    각 전략이 의존하는 입력값(get_trigger_key)이 의미 있게 변했거나(has_significant_change),
+    전략이 알려준 다음 트리거 구간(get_trigger_bounds)을 벗어났거나, 잔고가 바뀌었을 때만
+    전략을 다시 평가합니다. 아무 변화가 없어도 max_staleness_sec마다 한 번은 반드시 평가합니다.
+    """
+
+    def __init__(self, strategies, max_staleness_sec: float = None):
+        self.strategies = list(strategies)
+        self.max_staleness_sec = max_staleness_sec or settings.EVENT_MAX_STALENESS_SEC
+        # 전략 이름 -> 마지막 평가 시점의 상태
+        self._last = {}
+
+    def should_evaluate(self, strategy, current_data: dict, balances: tuple, now: float) -> bool:
+        last = self._last.get(strategy.name)
+        if last is None:
+            return True
+
+        # 1. 최대 지연 시간 초과 (주기적 점검)
+        if now - last['time'] >= self.max_staleness_sec:
+            return True
+
+        # 2. 잔고 변화 (주문 체결 등)
+        if balances != last['balances']:
+            return True
+
+        key = strategy.get_trigger_key()
+        if key is None:
+            return True
+
+        value = current_data.get(key)
+        last_value = last['value']
+        if value is None or last_value is None:
+            # 데이터 결측 상태가 바뀌었을 때만 평가 (계속 결측이면 주기적 점검에 맡김)
+            return value is not last_value
+
+        # 3. 다음 트리거 구간 이탈 (레벨 돌파)
+        bounds = last['bounds']
+        if bounds is not None:
+            lower, upper = bounds
+            if (lower is not None and value <= lower) or (upper is not None and value >= upper):
+                return True
+
+        # 4. 입력값의 유의미한 변화
+        return strategy.has_significant_change(last_value, value)
+
+    def mark_evaluated(self, strategy, current_data: dict, balances: tuple, now: float):
+        key = strategy.get_trigger_key()
+        self._last[strategy.name] = {
+            'time': now,
+            'balances': balances,
+            'value': current_data.get(key) if key is not None else None,
+            'bounds': strategy.get_trigger_bounds(current_data),
+        }
+
+    def next_deadline(self, now: float) -> float:
+        """다음 주기적 점검이 필요한 시각 (평가한 적 없는 전략이 있으면 now)"""
+        deadline = None
+        for strategy in self.strategies:
+            last = self._last.get(strategy.name)
+            if last is None:
+                return now
+            due = last['time'] + self.max_staleness_sec
+            deadline = due if deadline is None else min(deadline, due)
+        return deadline if deadline is not None else now + self.max_staleness_sec
@@ -0,0 +1,536 @@
+# 파일명: core/sharded_runner.py
+import functools
+import logging
+import multiprocessing
+import pickle
+import signal
+import threading
+import time
+import zlib
+from multiprocessing.connection import wait as wait_connections
+from config import settings
+from core.clock import SYSTEM_CLOCK, SystemClock
+from core.market_snapshot import MarketSnapshot
+from core.scheduler import StrategyScheduler
+from strategies.registry import create_strategy
+from monitoring import log, metrics
+
+logger = logging.getLogger(__name__)
+
+# main_loop과 같은 이름의 지표 (레지스트리에서 같은 객체를 돌려받음)
+FETCH_SECONDS = metrics.histogram("fetch_all_data_seconds", "틱당 시장 데이터 수집 소요 시간")
+STRATEGY_SECONDS = metrics.histogram("strategy_evaluate_seconds", "전략 determine_action_and_amount 소요 시간", ("strategy",))
+STRATEGY_SIGNALS = metrics.counter("strategy_signals_total", "전략 판단 결과 수", ("strategy", "action"))
+LOOP_ERRORS = metrics.counter("loop_errors_total", "메인 루프에서 잡힌 예외 수")
+ORDERS_REJECTED = metrics.counter("orders_rejected_total", "코디네이터가 잔고 부족 또는 주문 큐 거절로 되돌린 주문 의도 수", ("strategy",))
+
+# 실제 시간이 아닌 시계(리플레이)에서 워커 응답을 기다리는 최대 실제 시간 (초). 넘기면 응답 없이 시계를 진행
+WORKER_RESPONSE_TIMEOUT_SEC = 30
+
+
+def shard_index(strategy_config: dict, num_shards: int, shard_by: str = None) -> int:
+    """
+    전략 설정이 배정될 워커 번호를 반환합니다.
+    같은 심볼의 전략은 같은 워커에 모이고, 재시작해도 배정이 바뀌지 않도록 crc32를 사용합니다.
+    """
+    key = strategy_config.get(shard_by or settings.SHARD_BY) or strategy_config['name']
+    return zlib.crc32(str(key).encode()) % num_shards
+
+
+# ---------------------------------------------------------
+# 워커 프로세스 (전략 평가만 담당, 거래소에는 직접 요청하지 않음)
+# ---------------------------------------------------------
+def _shard_worker(shard: int, configs, states: dict, conn, log_queue=None):
+    """
+    코디네이터가 보내는 메시지를 처리하는 워커 프로세스 본체입니다.
+
+    - ("tick", tick_id, now, current_data, balances, busy_symbols): 코디네이터 시계 기준 now에 재평가가 필요한 전략을
+      평가하고 ("result", shard, tick_id, intents, states, timings)로 주문 의도와 바뀐 상태, 전략별 평가 시간/판단을 돌려줍니다.
+    - ("fill", seq, name, fill): 체결 결과를 전략에 반영하고 ("states", shard, {name: state}, seq)로 반영을 확인해 줍니다.
+    - ("restore", name, state): 거절된 주문의 판단 이전 상태로 되돌리고 ("states", shard, {name: state}, None)을 돌려줍니다.
+    - ("stop",): 종료
+    """
+    # Ctrl+C는 코디네이터가 받아 워커에 stop을 보내므로 워커는 무시
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # 로그는 코디네이터의 리스너가 콘솔/파일에 기록 (로그 파일은 한 프로세스만 씀)
+    if log_queue is not None:
+        log.setup_worker_logging(log_queue)
+
+    strategies = {}
+    for config in configs:
+        strategy = create_strategy(config)
+        if strategy:
+            if config['name'] in states:
+                strategy.restore_state(states[config['name']])
+            strategies[strategy.name] = strategy
+    scheduler = StrategyScheduler(strategies.values())
+    logger.info(f"✅ 전략 워커 {shard} 초기화 완료 (전략 {len(strategies)}개)")
+
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            break
+
+        kind = message[0]
+        if kind == "stop":
+            break
+        elif kind == "tick":
+            _, tick_id, now, current_data, balances, busy_symbols = message
+            intents, changed_states, timings = _evaluate_shard(strategies.values(), scheduler, current_data, balances,
+                                                               busy_symbols, now)
+            conn.send(("result", shard, tick_id, intents, changed_states, timings))
+        elif kind == "fill":
+            _, seq, name, fill = message
+            strategy = strategies[name]
+            strategy.on_fill(fill)
+            conn.send(("states", shard, {name: strategy.get_state()}, seq))
+        elif kind == "restore":
+            _, name, state = message
+            strategies[name].restore_state(state)
+            conn.send(("states", shard, {name: strategies[name].get_state()}, None))
+
+    conn.close()
+
+
+def _evaluate_shard(strategies, scheduler, current_data, balances: dict, busy_symbols, now: float):
+    """
+    main_loop의 전략 평가 단계와 같지만, 주문은 내지 않고 주문 의도만 모아 반환합니다.
+
+    :param now: 코디네이터 시계 기준 발행 시각 (스케줄러 판단에 사용, 리플레이에서도 같은 결과가 나오도록 워커 시계는 쓰지 않음)
+    """
+    intents = []
+    changed_states = {}
+    timings = {} # 전략 이름 -> (평가 소요 시간, 판단) : 지표는 코디네이터가 기록
+
+    for strategy in strategies:
+        strategy_balances = (balances.get('KRW', 0.0), balances.get(strategy.symbol, 0.0))
+        if strategy.symbol in busy_symbols or \
+           not scheduler.should_evaluate(strategy, current_data, strategy_balances, now):
+            continue
+
+        logger.info(f"[🔍 {strategy.name} ({strategy.symbol})] 분석 시작")
+        state_before = strategy.get_state()
+        started = time.perf_counter()
+        action, amount_type, amount_value = strategy.determine_action_and_amount(
+            current_data, strategy_balances[0], strategy_balances[1]
+        )
+        timings[strategy.name] = (time.perf_counter() - started, action)
+        scheduler.mark_evaluated(strategy, current_data, strategy_balances, now)
+        changed_states[strategy.name] = strategy.get_state()
+
+        if action in ['BUY', 'SELL'] and amount_value > 0:
+            intents.append({
+                "name": strategy.name,
+                "symbol": strategy.symbol,
+                "action": action,
+                "amount": amount_value,
+                "child_amounts": strategy.plan_child_orders(action, amount_value, current_data),
+                "context": strategy.last_order_context,
+                "state_before": state_before,
+            })
+
+    return intents, changed_states, timings
+
+
+# ---------------------------------------------------------
+# 코디네이터 (시세/잔고 수집, 주문 제출, 상태 저장 담당)
+# ---------------------------------------------------------
+class _StrategyHandle:
+    """
+    코디네이터 쪽에서 워커의 전략을 대신하는 객체입니다.
+    StrategyStateStore / OrderTracker가 요구하는 name, symbol, get_state, restore_state, on_fill을 제공합니다.
+    """
+
+    def __init__(self, runner, config: dict, shard: int):
+        self.runner = runner
+        self.config = config
+        self.name = config['name']
+        self.symbol = config['symbol']
+        self.shard = shard
+        self.state = {}
+
+    def get_state(self) -> dict:
+        return self.state
+
+    def restore_state(self, state: dict):
+        self.state = dict(state)
+
+    def on_fill(self, fill):
+        # 실제 전략 객체가 있는 워커에 전달 (바뀐 상태는 "states" 응답으로 돌아와 저장됨)
+        self.runner.send_fill(self.shard, self.name, fill)
+
+
+class _Reservation:
+    """제출했지만 다음 잔고 조회에 아직 반영되지 않은 주문 금액/수량"""
+
+    def __init__(self, currency: str, amount: float):
+        self.currency = currency
+        self.amount = amount
+        self.settled = False
+
+
+class _Shard:
+    def __init__(self, index: int, configs):
+        self.index = index
+        self.configs = configs
+        self.process = None
+        self.conn = None
+        self.pending_tick = None # 응답을 기다리는 틱 번호 (None이면 대기 중)
+        self.unacked_fills = {}  # seq -> (전략 이름, Fill): 워커가 반영을 확인하기 전의 체결 (워커 재시작 시 다시 보냄)
+
+
+class ShardedRunner:
+    """
+    활성 전략을 여러 워커 프로세스에 나누어 평가하는 실행기입니다.
+
+    - 코디네이터(이 프로세스)만 시세/환율/잔고를 조회하고, 매 틱 한 번 직렬화한 시장 데이터를
+      모든 워커에 파이프로 발행합니다. 워커는 거래소에 직접 요청하지 않습니다.
+    - 워커는 주문 의도만 돌려주고, 주문 제출과 체결 추적, 상태 저널 기록은 코디네이터가 전담합니다.
+      같은 지갑(KRW)을 쓰는 여러 워커의 주문은 코디네이터가 잔고에서 예약하며 순서대로 승인하고,
+      잔고가 부족해 거절된 주문은 해당 워커에 판단 이전 상태로 되돌리라고 알립니다.
+    - 이전 틱을 아직 처리 중인 워커에는 새 틱을 보내지 않으므로 느린 워커가 다른 워커를 막지 않습니다.
+    - 워커 프로세스가 죽으면 코디네이터가 가진 최신 상태로 다시 띄우고, 워커가 반영을 확인하지 않은 체결을 다시 보냅니다.
+    - 시각은 주입받은 시계로만 조회하므로 main_loop처럼 가짜 커넥터와 가상 시계로 리플레이할 수 있습니다.
+      (실제 시간이 아닌 시계에서는 워커 응답을 모두 받은 뒤 시계를 진행)
+    """
+
+    def __init__(self, num_workers: int = None, components: dict = None, clock=None):
+        """
+        :param components: main.build_live_components()와 같은 키의 dict (None이면 실거래용으로 생성)
+        :param clock: 시각 조회와 대기에 쓸 시계 (기본: 실제 시간)
+        """
+        self.num_workers = num_workers or settings.SHARD_WORKERS
+        self.components = components
+        self.clock = clock or SYSTEM_CLOCK
+        self._shards = []
+        self._handles = {}
+        self._conn_to_shard = {}
+        self._tick_id = 0
+        self._fill_seq = 0
+        self._snapshot = MarketSnapshot() # 틱마다 다시 채워 사용 (발행 시 바로 직렬화하므로 재사용해도 안전)
+        self._balances = {}
+        self._reservations = []
+        self._reservation_lock = threading.Lock()
+        self._log_queue = None
+
+    def send(self, shard_index_: int, message):
+        shard = self._shards[shard_index_]
+        try:
+            shard.conn.send(message)
+        except (BrokenPipeError, OSError) as e:
+            logger.error(f"전략 워커 {shard.index}에 메시지 전송 실패: {e}")
+
+    def send_fill(self, shard_index_: int, name: str, fill):
+        """체결 결과를 워커에 보내고, 워커가 반영을 확인할 때까지 보관합니다."""
+        self._fill_seq += 1
+        self._shards[shard_index_].unacked_fills[self._fill_seq] = (name, fill)
+        self.send(shard_index_, ("fill", self._fill_seq, name, fill))
+
+    def start(self):
+        if self.components is None:
+            from main import build_live_components
+            self.components = build_live_components(self.clock)
+        components = self.components
+
+        self.upbit_conn = components['upbit_conn']
+        self.external_conn = components['external_conn']
+        self.order_mgr = components['order_mgr']
+        self.order_tracker = components['order_tracker']
+        self.order_queue = components['order_queue']
+        self.market_feed = components.get('market_feed')
+        self.recorder = components.get('recorder')
+        self.strategy_configs = components.get('strategy_configs', settings.STRATEGY_LIST)
+
+        # 워커 로그 수집용 큐 (setup_logging()으로 로깅이 설정된 경우에만)
+        if log.is_configured():
+            self._log_queue = multiprocessing.get_context("spawn").Queue(settings.LOG_QUEUE_MAX_SIZE)
+            log.start_listener(self._log_queue)
+
+        # 상태 저널은 코디네이터 하나만 사용 (워커 수가 바뀌어도 전략 이름 기준으로 복원)
+        self.state_store = components['state_store']
+
+        shard_configs = [[] for _ in range(self.num_workers)]
+        for config in self.strategy_configs:
+            if config.get("is_active"):
+                index = shard_index(config, self.num_workers)
+                shard_configs[index].append(config)
+                handle = _StrategyHandle(self, config, index)
+                self.state_store.restore(handle)
+                self._handles[handle.name] = handle
+
+        for index, configs in enumerate(shard_configs):
+            shard = _Shard(index, configs)
+            self._shards.append(shard)
+            if configs:
+                self._spawn(shard)
+
+        logger.info(f"✅ ShardedRunner 초기화 완료 (워커 {len(self._conn_to_shard)}개, 전략 {len(self._handles)}개)")
+        return self
+
+    def _spawn(self, shard: _Shard):
+        # 코디네이터에는 HTTP/주문 스레드가 떠 있으므로 fork 대신 spawn으로 워커를 시작
+        context = multiprocessing.get_context("spawn")
+        parent_conn, child_conn = context.Pipe()
+        states = {config['name']: self._handles[config['name']].state for config in shard.configs}
+        shard.process = context.Process(
+            target=_shard_worker, args=(shard.index, shard.configs, states, child_conn, self._log_queue),
+            name=f"strategy-shard-{shard.index}", daemon=True,
+        )
+        shard.process.start()
+        child_conn.close()
+
+        if shard.conn is not None:
+            self._conn_to_shard.pop(shard.conn, None)
+            shard.conn.close()
+        shard.conn = parent_conn
+        shard.pending_tick = None
+        self._conn_to_shard[parent_conn] = shard
+
+        # 죽은 워커가 반영하지 못한 체결은 복원한 상태 위에 순서대로 다시 적용
+        for seq, (name, fill) in sorted(shard.unacked_fills.items()):
+            logger.warning(f"전략 워커 {shard.index} 재시작: {name} 미확인 체결 {getattr(fill, 'uuid', seq)} 재전송")
+            self.send(shard.index, ("fill", seq, name, fill))
+
+    def run(self, until: float = None):
+        """
+        :param until: 시계 기준 이 시각이 지나면 워커를 멈추고 끝냄 (None이면 중단 요청까지 계속)
+        """
+        from main import fetch_all_data
+
+        self.start()
+        last_feed_version = -1
+        last_publish_time = 0.0
+
+        while until is None or self.clock.time() < until:
+            start_time = self.clock.time()
+            try:
+                self._respawn_dead_workers()
+
+                # 미체결 주문 상태 조회 (체결 결과는 워커로 전달되어 상태 응답으로 돌아옴)
+                self.order_tracker.poll()
+
+                # 스트림을 쓰는 경우 시세가 바뀌었거나 최대 지연 시간이 지났을 때만 발행
+                feed_version = self.market_feed.store.version if self.market_feed is not None else None
+                if feed_version is None or feed_version != last_feed_version or \
+                   start_time - last_publish_time >= settings.EVENT_MAX_STALENESS_SEC:
+                    with FETCH_SECONDS.time():
+                        current_data = fetch_all_data(self.upbit_conn, self.external_conn, self.market_feed, self.clock,
+                                                      self.strategy_configs, snapshot=self._snapshot)
+                    if self.recorder is not None:
+                        self.recorder.record_snapshot(current_data)
+                    # 잔고를 조회하지 못했으면 발행하지 않음 (잔고 0으로 평가하면 보유 상태가 초기화됨, 다음 루프에서 재시도)
+                    if self._refresh_balances():
+                        self._publish(current_data, start_time)
+                        last_feed_version = feed_version
+                        last_publish_time = start_time
+
+                # 다음 틱까지 워커 응답(주문 의도/상태)을 처리하며 대기
+                interval = settings.EVENT_MIN_INTERVAL_SEC if self.market_feed is not None else settings.MONITORING_INTERVAL_SEC
+                self._pump(start_time + interval)
+
+            except KeyboardInterrupt:
+                logger.info("👋 사용자 요청으로 프로그램 종료.")
+                break
+            except Exception as e:
+                LOOP_ERRORS.inc()
+                logger.exception(f"코디네이터 루프 실행 중 예상치 못한 오류 발생: {e}")
+                self.clock.sleep(settings.MONITORING_INTERVAL_SEC)
+
+        self.stop()
+
+    def _refresh_balances(self) -> bool:
+        """:return: 잔고 스냅샷 갱신 여부 (조회 실패 시 False, 이전 스냅샷과 예약은 그대로 유지)"""
+        balances = self.order_mgr.get_balance_snapshot()
+        if balances is None:
+            logger.warning("잔고 조회 실패: 이번 틱은 시세를 발행하지 않습니다.")
+            return False
+        with self._reservation_lock:
+            # 체결이 끝난 예약은 새 잔고 스냅샷에 반영되었으므로 제거
+            self._reservations = [reservation for reservation in self._reservations if not reservation.settled]
+            self._balances = balances
+        return True
+
+    def _available_balances(self) -> dict:
+        """잔고 스냅샷에서 진행 중인 주문의 예약분을 뺀 값"""
+        with self._reservation_lock:
+            available = dict(self._balances)
+            for reservation in self._reservations:
+                available[reservation.currency] = available.get(reservation.currency, 0.0) - reservation.amount
+        return available
+
+    def _publish(self, current_data, now: float):
+        self._tick_id += 1
+        busy_symbols = {handle.symbol for handle in self._handles.values() if self.order_queue.is_busy(handle.symbol)}
+        # 한 번만 직렬화하여 모든 워커에 같은 바이트를 전송
+        payload = pickle.dumps(("tick", self._tick_id, now, current_data, self._available_balances(), busy_symbols),
+                               protocol=pickle.HIGHEST_PROTOCOL)
+
+        published = 0
+        for shard in self._shards:
+            if shard.conn is None or shard.pending_tick is not None:
+                continue # 이전 틱을 처리 중인 워커는 건너뜀
+            try:
+                shard.conn.send_bytes(payload)
+            except (BrokenPipeError, OSError) as e:
+                logger.error(f"전략 워커 {shard.index}에 시세 발행 실패: {e}")
+                continue
+            shard.pending_tick = self._tick_id
+            published += 1
+
+        if published < len(self._conn_to_shard):
+            logger.warning(f"이전 틱을 처리 중인 워커 {len(self._conn_to_shard) - published}개는 틱 {self._tick_id}을 건너뜁니다.")
+
+    def _pump(self, deadline: float):
+        """
+        deadline(시계 기준)까지 워커 메시지를 처리합니다.
+        실제 시간이 아닌 시계에서는 응답을 기다리는 워커가 없어질 때까지 처리한 뒤 시계를 deadline으로 옮깁니다.
+        """
+        realtime = isinstance(self.clock, SystemClock)
+        while True:
+            remaining = deadline - self.clock.time()
+            if remaining <= 0:
+                return
+            if realtime:
+                timeout = remaining
+            elif self._awaiting_response():
+                timeout = WORKER_RESPONSE_TIMEOUT_SEC
+            else:
+                self.clock.sleep(remaining)
+                return
+
+            ready = wait_connections(list(self._conn_to_shard), timeout=timeout)
+            if not ready and not realtime:
+                logger.error(f"워커 응답을 {WORKER_RESPONSE_TIMEOUT_SEC}초 동안 받지 못했습니다. 응답 없이 진행합니다.")
+                self.clock.sleep(remaining)
+                return
+            for conn in ready:
+                shard = self._conn_to_shard.get(conn)
+                if shard is None:
+                    continue
+                try:
+                    message = conn.recv()
+                except (EOFError, OSError):
+                    logger.error(f"전략 워커 {shard.index}와의 연결이 끊어졌습니다.")
+                    self._conn_to_shard.pop(conn, None)
+                    continue
+                self._handle_message(message)
+
+    def _awaiting_response(self) -> bool:
+        """틱 결과나 체결 반영 확인을 기다리는 살아 있는 워커가 있는지"""
+        return any(shard.conn in self._conn_to_shard and (shard.pending_tick is not None or shard.unacked_fills)
+                   for shard in self._shards)
+
+    def _handle_message(self, message):
+        kind = message[0]
+        if kind == "result":
+            _, shard_index_, tick_id, intents, changed_states, timings = message
+            self._shards[shard_index_].pending_tick = None
+            for name, (elapsed, action) in timings.items():
+                STRATEGY_SECONDS.observe(elapsed, strategy=name)
+                STRATEGY_SIGNALS.inc(strategy=name, action=action)
+
+            order_names = {intent['name'] for intent in intents}
+            for name, state in changed_states.items():
+                handle = self._handles[name]
+                handle.state = state
+                if name not in order_names:
+                    self.state_store.save(handle)
+            for intent in intents:
+                self._submit(intent)
+
+            if changed_states:
+                logger.info(f"워커 {shard_index_} 틱 {tick_id}: 평가 {len(changed_states)}개, 주문 의도 {len(intents)}개")
+
+        elif kind == "states":
+            _, shard_index_, changed_states, fill_seq = message
+            self._shards[shard_index_].unacked_fills.pop(fill_seq, None)
+            for name, state in changed_states.items():
+                handle = self._handles[name]
+                handle.state = state
+                self.state_store.save(handle, durable=True)
+
+        self.state_store.flush()
+
+    def _submit(self, intent: dict):
+        handle = self._handles[intent['name']]
+        action, amount, symbol = intent['action'], intent['amount'], intent['symbol']
+        currency = 'KRW' if action == 'BUY' else symbol
+
+        # 여러 워커가 같은 지갑을 두고 경쟁하지 않도록 코디네이터가 순서대로 예약
+        with self._reservation_lock:
+            available = self._balances.get(currency, 0.0) - sum(
+                reservation.amount for reservation in self._reservations if reservation.currency == currency)
+            if amount > available + 1e-9:
+                reservation = None
+            else:
+                reservation = _Reservation(currency, amount)
+                self._reservations.append(reservation)
+
+        if reservation is None:
+            self._reject(handle, intent, f"가용 {currency} 잔고 부족 ({available:,.4f})")
+            return
+
+        # 주문 전에 판단 이후 상태를 fsync (재시작 시 재주문 방지)
+        self.state_store.save(handle, durable=True)
+        future = self.order_queue.submit(action, amount, symbol, intent['child_amounts'])
+        if future is None:
+            with self._reservation_lock:
+                self._reservations.remove(reservation)
+            self._reject(handle, intent, "주문 큐에 들어가지 않음")
+            return
+        future.add_done_callback(functools.partial(
+            self._on_order_done, reservation=reservation, strategy=handle, action=action, amount=amount,
+            context=intent['context']))
+
+    def _reject(self, handle: _StrategyHandle, intent: dict, reason: str):
+        """주문 의도를 거절하고 워커의 전략을 판단 이전 상태로 되돌립니다."""
+        ORDERS_REJECTED.inc(strategy=handle.name)
+        logger.warning(f"{handle.name} {intent['action']} {intent['amount']:,.4f} 주문 거절: {reason}")
+        handle.state = intent['state_before']
+        self.state_store.save(handle, durable=True)
+        self.send(handle.shard, ("restore", handle.name, intent['state_before']))
+
+    def _on_order_done(self, future, reservation, strategy, action, amount, context):
+        from main import _handle_order_result
+
+        _handle_order_result(future, strategy, action, amount, context, self.order_tracker, self.state_store)
+        result = future.result()
+        results = result if isinstance(result, list) else [result]
+        with self._reservation_lock:
+            if all(child_result is None for child_result in results):
+                self._reservations.remove(reservation) # 주문 실패: 잔고 변동 없음
+            else:
+                reservation.settled = True # 다음 잔고 조회 후 제거
+
+    def _respawn_dead_workers(self):
+        for shard in self._shards:
+            if shard.process is not None and not shard.process.is_alive():
+                logger.error(f"전략 워커 {shard.index} 종료 감지 (exitcode {shard.process.exitcode}). 최신 상태로 재시작합니다.")
+                self._drain(shard)
+                self._spawn(shard)
+
+    def _drain(self, shard: _Shard):
+        """죽은 워커가 종료 전에 보낸 응답을 마저 처리합니다. (이미 반영된 체결을 다시 보내지 않도록)"""
+        if shard.conn not in self._conn_to_shard:
+            return
+        try:
+            while shard.conn.poll():
+                self._handle_message(shard.conn.recv())
+        except (EOFError, OSError):
+            pass
+
+    def stop(self):
+        for shard in self._shards:
+            if shard.conn is not None:
+                self.send(shard.index, ("stop",))
+        for shard in self._shards:
+            if shard.process is not None:
+                shard.process.join(5)
+
+        if self.market_feed is not None:
+            self.market_feed.stop()
+        self.order_queue.stop() # 제출된 주문을 마저 처리한 뒤 상태 저장소를 닫음
+        self.state_store.close()
+        if self.recorder is not None:
+            self.recorder.close()
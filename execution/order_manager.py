@@ -1,37 +1,86 @@
+import logging
+import threading
 from connectors.upbit_api import UpbitAPI
 from config import settings
+from core.clock import SYSTEM_CLOCK
+from monitoring import metrics
+
+logger = logging.getLogger(__name__)
+
+# 시뮬레이션 모드 / API 키 미설정 시 반환하는 가상 주문 uuid (체결 추적 대상에서 제외)
+SIMULATED_ORDER_UUID = "SIMULATED_ORDER_UUID"
+
+_BALANCE_SECONDS = metrics.histogram("balance_fetch_seconds", "잔고 조회(get_balances) 소요 시간")
+_BALANCE_ERRORS = metrics.counter("balance_fetch_errors_total", "잔고 조회 실패 수")
+_ORDER_SECONDS = metrics.histogram("order_seconds", "시장가 주문 요청 소요 시간", ("action",))
+_ORDERS = metrics.counter("orders_total", "시장가 주문 수 (result: sent / simulated / failed)", ("action", "symbol", "result"))
 
 class OrderManager:
     """
     자산 조회, 매수/매도 주문 실행 등 거래소와의 상호작용을 관리합니다.
     """
     
-    def __init__(self, upbit_api: UpbitAPI):
+    def __init__(self, upbit_api: UpbitAPI, clock=None):
         self.upbit_api = upbit_api
-        print("✅ OrderManager 초기화 완료")
+        self.clock = clock or SYSTEM_CLOCK
+
+        # 잔고 스냅샷 캐시 (한 틱 동안 get_balances()를 한 번만 호출하기 위함)
+        self._balance_snapshot = None
+        self._balance_fetched_time = 0.0
+        self._balance_lock = threading.Lock()
+        logger.info("✅ OrderManager 초기화 완료")
+
+    def get_balance_snapshot(self, force_refresh: bool = False):
+        """
+        전체 통화의 잔고를 한 번의 get_balances() 호출로 조회하여 {통화: 총 잔고} 형태로 반환합니다.
+
+        BALANCE_CACHE_TTL_SEC 이내에 다시 호출되면 캐시된 스냅샷을 그대로 반환하며,
+        주문 실행 직후에는 캐시가 무효화되어 다음 호출 시 새로 조회합니다.
+        조회 실패를 '잔고 0'으로 돌려주면 전략이 보유 상태를 초기화하므로 실패 시에는 None을 반환합니다.
+        (API 키를 설정하지 않은 경우에는 기존처럼 잔고가 없는 계좌로 보고 빈 dict를 반환)
+
+        :param force_refresh: True이면 캐시를 무시하고 새로 조회
+        :return: {"KRW": 1000000.0, "USDT": 12.3, "ETH": 0.5, ...} 또는 조회 실패 시 None
+        """
+        with self._balance_lock:
+            current_time = self.clock.time()
+            if not force_refresh and self._balance_snapshot is not None and \
+               (current_time - self._balance_fetched_time) < settings.BALANCE_CACHE_TTL_SEC:
+                return self._balance_snapshot
+            if not self.upbit_api.has_credentials():
+                return {}
+
+            try:
+                with _BALANCE_SECONDS.time():
+                    balances = self.upbit_api.get_balances()
+                if not isinstance(balances, list):
+                    _BALANCE_ERRORS.inc()
+                    logger.error(f"잔고 조회 실패: {balances}")
+                    return None
+
+                snapshot = {}
+                for balance in balances:
+                    # 주문 중인 금액(locked)까지 포함하여 총 잔고 계산
+                    snapshot[balance['currency']] = float(balance['balance']) + float(balance['locked'])
+            except Exception as e:
+                _BALANCE_ERRORS.inc()
+                logger.error(f"잔고 조회 중 예외 발생: {e}")
+                return None
+
+            self._balance_snapshot = snapshot
+            self._balance_fetched_time = current_time
+            return snapshot
+
+    def invalidate_balance_cache(self):
+        """잔고 스냅샷 캐시를 무효화합니다. (주문 실행 후 호출)"""
+        with self._balance_lock:
+            self._balance_snapshot = None
+            self._balance_fetched_time = 0.0
 
     def get_current_balance(self, ticker="USDT"):
-        """USDT 또는 BTC 등 특정 코인과 KRW 잔고를 조회합니다."""
-        try:
-            balances = self.upbit_api.upbit.get_balances() 
-            symbol_balance = 0.0
-            krw_balance = 0.0
-            
-            for balance in balances:
-                currency = balance['currency']
-                # 주문 중인 금액(locked)까지 포함하여 총 잔고 계산
-                total_balance = float(balance['balance']) + float(balance['locked'])
-                
-                if currency == ticker:
-                    symbol_balance = total_balance
-                elif currency == 'KRW':
-                    krw_balance = total_balance
-            
-            return symbol_balance, krw_balance
-        
-        except Exception as e:
-            print(f"[ERROR] 잔고 조회 중 예외 발생: {e}")
-            return 0.0, 0.0
+        """USDT 또는 BTC 등 특정 코인과 KRW 잔고를 조회합니다. (스냅샷 캐시 사용, 조회 실패 시 (0.0, 0.0))"""
+        snapshot = self.get_balance_snapshot() or {}
+        return snapshot.get(ticker, 0.0), snapshot.get('KRW', 0.0)
 
     def execute_market_order(self, action: str, amount: float, symbol: str):
         """
@@ -41,39 +90,55 @@ class OrderManager:
         :param amount: 매수 시에는 '원화 금액(KRW)', 매도 시에는 '매도 수량(Coin Volume)'
         :param symbol: 매매할 코인 (USDT, BTC 등)
         """
+        result = None
+        try:
+            with _ORDER_SECONDS.time(action=action):
+                result = self._send_market_order(action, amount, symbol)
+            return result
+        finally:
+            if result is None:
+                _ORDERS.inc(action=action, symbol=symbol, result="failed")
+            else:
+                _ORDERS.inc(action=action, symbol=symbol,
+                            result="simulated" if result.get('uuid') == SIMULATED_ORDER_UUID else "sent")
+            # 주문 결과와 관계없이 잔고가 바뀌었을 수 있으므로 스냅샷 캐시 무효화
+            self.invalidate_balance_cache()
+
+    def _send_market_order(self, action: str, amount: float, symbol: str):
+        """execute_market_order의 실제 주문 처리부입니다."""
         ticker = f"KRW-{symbol}"
         
         # 1. 시뮬레이션 모드 확인 (최우선)
         # settings.py의 IS_SIMULATION이 True이면 실제 주문을 넣지 않음
         if getattr(settings, 'IS_SIMULATION', False):
             target_unit = "KRW" if action == "BUY" else symbol
-            print(f"  @🚨EXECUTE@ {action} {symbol} 주문 (가상): {amount:,.0f} {target_unit} 상당")
-            return {"uuid": "SIMULATED_ORDER_UUID", "state": "done"}
+            logger.info(f"@🚨EXECUTE@ {action} {symbol} 주문 (가상): {amount:,.0f} {target_unit} 상당")
+            return {"uuid": SIMULATED_ORDER_UUID, "state": "done"}
 
         # 2. API 키 미설정 확인 (이중 안전장치)
-        if settings.UPBIT_ACCESS_KEY == "YOUR_UPBIT_ACCESS_KEY":
+        if settings.UPBIT_ACCESS_KEY == "YOUR_UPBIT_ACCESS_KEY" or not self.upbit_api.has_credentials():
             target_unit = "KRW" if action == "BUY" else symbol
-            print(f"  @⚠️WARNING@ API 키 미설정. {action} {symbol} 주문 시뮬레이션 처리: {amount:,.0f} {target_unit}")
-            return {"uuid": "SIMULATED_ORDER_UUID", "state": "done"}
+            logger.warning(f"@⚠️WARNING@ API 키 미설정. {action} {symbol} 주문 시뮬레이션 처리: {amount:,.0f} {target_unit}")
+            return {"uuid": SIMULATED_ORDER_UUID, "state": "done"}
 
         # 3. 실제 주문 실행
         try:
             if action == 'BUY':
                 # 매수: 금액(KRW) 기준 시장가 매수
-                result = self.upbit_api.upbit.buy_market_order(ticker, amount)
-                print(f"[ORDER] 🚨 {symbol} 실제 매수 주문 실행. 금액: {amount:,.0f} KRW.")
+                result = self.upbit_api.buy_market_order(ticker, amount)
+                logger.info(f"[ORDER] 🚨 {symbol} 실제 매수 주문 실행. 금액: {amount:,.0f} KRW.")
                 return result
             
             elif action == 'SELL':
                 # 매도: 수량(Volume) 기준 시장가 매도
-                result = self.upbit_api.upbit.sell_market_order(ticker, amount)
-                print(f"[ORDER] 🚨 {symbol} 실제 매도 주문 실행. 수량: {amount:,.8f} {symbol}.")
+                result = self.upbit_api.sell_market_order(ticker, amount)
+                logger.info(f"[ORDER] 🚨 {symbol} 실제 매도 주문 실행. 수량: {amount:,.8f} {symbol}.")
                 return result
             
             else:
-                print(f"[ERROR] 알 수 없는 주문 액션: {action}")
+                logger.error(f"알 수 없는 주문 액션: {action}")
                 return None
                 
         except Exception as e:
-            print(f"[ERROR] 주문 실행 중 오류 발생 ({action} {symbol}): {e}")
+            logger.error(f"주문 실행 중 오류 발생 ({action} {symbol}): {e}")
             return None
\ No newline at end of file
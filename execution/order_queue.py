@@ -0,0 +1,130 @@
+# 파일명: execution/order_queue.py
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+from config import settings
+from core.clock import SYSTEM_CLOCK
+
+logger = logging.getLogger(__name__)
+
+_STOP = object() # 워커 종료 신호
+
+
+class _QueuedOrder:
+    def __init__(self, action: str, amount: float, symbol: str, child_amounts=None, queued_time: float = None):
+        self.action = action
+        self.amount = amount
+        self.symbol = symbol
+        self.child_amounts = list(child_amounts) if child_amounts else [amount]
+        self.future = Future()
+        self.queued_time = queued_time
+
+
+class OrderExecutionQueue:
+    """
+    주문을 전략 평가 루프와 분리하여 워커 스레드에서 실행하는 주문 큐입니다.
+
+    - submit()은 주문을 큐에 넣고 즉시 Future를 반환하므로, 느리거나 멈춘 주문 API 호출이
+      다음 전략의 평가를 지연시키지 않습니다. Future의 결과는 execute_market_order의 반환값입니다.
+    - 같은 심볼의 주문이 큐에 있거나 실행 중이거나 큐가 가득 차면 새 주문은 받지 않고 submit()이 None을 반환합니다.
+      (호출부는 주문을 전제로 바꾼 전략 상태를 되돌려야 함)
+    - 자식 주문으로 나뉜 주문은 한 워커가 ORDER_CHILD_INTERVAL_SEC 간격으로 순서대로 실행하며,
+      Future 결과는 자식 주문 결과 목록입니다. (중간에 실패하면 나머지는 보내지 않음)
+    - 업비트 주문 요청 제한은 HttpClient의 RateLimiter(upbit:order 버킷)가 워커 간에 공유하여 지킵니다.
+    - max_workers=0이면 워커 없이 submit()에서 바로 실행합니다. (리플레이에서 주문 순서를 결정적으로 유지)
+    """
+
+    def __init__(self, order_mgr, max_workers: int = None, max_size: int = None, clock=None):
+        self.order_mgr = order_mgr
+        self.max_workers = settings.ORDER_QUEUE_WORKERS if max_workers is None else max_workers
+        self.clock = clock or SYSTEM_CLOCK
+        self._queue = queue.Queue(maxsize=max_size or settings.ORDER_QUEUE_MAX_SIZE)
+
+        self._lock = threading.Lock()
+        self._active_symbols = set() # 큐에 있거나 실행 중인 주문의 심볼
+        self._workers = []
+
+    def start(self):
+        for index in range(self.max_workers):
+            worker = threading.Thread(target=self._worker_loop, name=f"order-worker-{index}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+        if self.max_workers > 0:
+            logger.info(f"✅ OrderExecutionQueue 초기화 완료 (워커 {self.max_workers}개)")
+        else:
+            logger.info("✅ OrderExecutionQueue 초기화 완료 (동기 실행)")
+        return self
+
+    def is_busy(self, symbol: str) -> bool:
+        """해당 심볼의 주문이 큐에 있거나 실행 중인지 여부"""
+        with self._lock:
+            return symbol in self._active_symbols
+
+    def submit(self, action: str, amount: float, symbol: str, child_amounts=None) -> Future:
+        """
+        주문을 큐에 넣습니다. (블로킹하지 않음)
+
+        :param child_amounts: 자식 주문 크기 목록 (None이거나 하나면 나누지 않음)
+        :return: 주문 결과(dict 또는 실패 시 None, 자식 주문이면 결과 목록)로 완료되는 Future.
+                 주문을 받지 않았으면 None (같은 심볼 주문 처리 중 / 큐 가득 참)
+        """
+        order = _QueuedOrder(action, amount, symbol, child_amounts, self.clock.time())
+
+        with self._lock:
+            if symbol in self._active_symbols:
+                logger.warning(f"{symbol} 주문이 이미 처리 중입니다. 중복 주문({action} {amount})을 무시합니다.")
+                return None
+            self._active_symbols.add(symbol)
+
+        if self.max_workers == 0:
+            self._execute(order)
+            return order.future
+
+        try:
+            self._queue.put_nowait(order)
+        except queue.Full:
+            logger.error(f"주문 큐가 가득 찼습니다. {action} {symbol} 주문을 실행하지 않습니다.")
+            self._release(symbol)
+            return None
+        return order.future
+
+    def _release(self, symbol: str):
+        with self._lock:
+            self._active_symbols.discard(symbol)
+
+    def _worker_loop(self):
+        while True:
+            order = self._queue.get()
+            if order is _STOP:
+                break
+            self._execute(order)
+
+    def _execute(self, order: _QueuedOrder):
+        results = []
+        try:
+            for index, child_amount in enumerate(order.child_amounts):
+                if index > 0:
+                    self.clock.sleep(settings.ORDER_CHILD_INTERVAL_SEC)
+                child_result = self.order_mgr.execute_market_order(order.action, child_amount, symbol=order.symbol)
+                results.append(child_result)
+                if child_result is None:
+                    break
+        except Exception as e:
+            logger.error(f"주문 워커 실행 중 오류 ({order.action} {order.symbol}): {e}")
+        finally:
+            if len(order.child_amounts) > 1:
+                result = results
+            else:
+                result = results[0] if results else None
+            # 콜백(체결 추적/상태 저장)이 실행되기 전에 심볼을 해제하지 않도록 결과 설정 후 해제
+            order.future.set_result(result)
+            self._release(order.symbol)
+
+    def stop(self, timeout: float = None):
+        """큐에 남은 주문을 모두 처리한 뒤 워커를 종료합니다."""
+        for _ in self._workers:
+            self._queue.put(_STOP)
+        for worker in self._workers:
+            worker.join(timeout)
+        self._workers = []
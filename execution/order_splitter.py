@@ -0,0 +1,41 @@
+# 파일명: execution/order_splitter.py
+import logging
+import math
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def split_market_order(book, action: str, amount: float, max_slippage_pct: float,
+                       min_amount: float, max_children: int = None) -> list:
+    """
+    현재 호가창 기준 예상 슬리피지가 한도를 넘는 시장가 주문을 같은 크기의 자식 주문으로 나눕니다.
+
+    :param book: 대상 마켓의 OrderBook (None이면 나누지 않음)
+    :param amount: 매수는 원화 금액(KRW), 매도는 수량
+    :param min_amount: 자식 주문 하나의 최소 크기 (최소 주문 금액/수량)
+    :return: 자식 주문 크기 목록 (나누지 않으면 [amount])
+    """
+    if book is None or amount <= 0:
+        return [amount]
+    max_children = max_children or settings.ORDER_MAX_CHILD_ORDERS
+
+    if action == 'BUY':
+        slippage = book.buy_slippage_pct(amount)
+        chunk = book.max_buy_krw_within(max_slippage_pct)
+    else:
+        slippage = book.sell_slippage_pct(amount)
+        chunk = book.max_sell_volume_within(max_slippage_pct)
+
+    # 호가창 깊이 안에서 한도 이내면 그대로 (slippage None은 보이는 호가보다 주문이 큰 경우)
+    if slippage is not None and slippage <= max_slippage_pct:
+        return [amount]
+
+    chunk = max(chunk, min_amount)
+    count = min(max_children, math.ceil(amount / chunk), int(amount // min_amount) or 1)
+    if count <= 1:
+        return [amount]
+
+    logger.info(f"[주문 분할] {action} {amount:,.4f} 예상 슬리피지 "
+          f"{'호가 잔량 초과' if slippage is None else f'{slippage:.3f}%'} > 한도 {max_slippage_pct}% -> {count}개로 분할")
+    return [amount / count] * count
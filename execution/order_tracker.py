@@ -0,0 +1,185 @@
+# 파일명: execution/order_tracker.py
+import logging
+import threading
+from config import settings
+from core.clock import SYSTEM_CLOCK
+from monitoring import metrics
+from execution.order_manager import SIMULATED_ORDER_UUID
+
+logger = logging.getLogger(__name__)
+
+# 더 이상 상태가 바뀌지 않는 주문 상태 (시장가 매수는 잔여 원화가 남으면 cancel로 끝남)
+TERMINAL_STATES = ("done", "cancel")
+# /v1/orders/uuids 1회 요청당 최대 주문 수
+UUIDS_BATCH_SIZE = 100
+
+_FILLS = metrics.counter("order_fills_total", "체결 확인된 주문 수 (state: done / cancel / partial / timeout)", ("state",))
+_PENDING = metrics.gauge("orders_pending", "체결 확인을 기다리는 주문 수")
+
+
+class Fill:
+    """완료된 주문의 실제 체결 결과 (수량, 평균 체결가, 수수료)"""
+
+    def __init__(self, uuid: str, action: str, symbol: str, requested_amount: float, state: str,
+                 executed_volume: float, executed_funds: float, paid_fee: float, context: dict):
+        self.uuid = uuid
+        self.action = action
+        self.symbol = symbol
+        self.requested_amount = requested_amount # 매수: 주문 원화 금액 / 매도: 주문 수량
+        self.state = state
+        self.executed_volume = executed_volume
+        self.executed_funds = executed_funds     # 체결 금액 합계 (KRW, 수수료 제외)
+        self.paid_fee = paid_fee                 # 지불 수수료 (KRW)
+        self.context = context                   # 주문 판단 시점에 전략이 남긴 정보
+
+    @property
+    def avg_price(self) -> float:
+        """평균 체결가 (KRW)"""
+        return self.executed_funds / self.executed_volume if self.executed_volume > 0 else 0.0
+
+    def __repr__(self):
+        return (f"Fill({self.action} {self.symbol} {self.executed_volume:.8f} @ {self.avg_price:,.2f} KRW, "
+                f"fee {self.paid_fee:,.2f}, {self.state})")
+
+
+class _TrackedOrder:
+    """추적 중인 주문 하나 (자식 주문으로 나뉜 경우 uuid 여러 개를 하나의 Fill로 합산)"""
+
+    def __init__(self, uuids, strategy, action: str, symbol: str, amount: float, context: dict, created_time: float):
+        self.uuids = list(uuids)
+        self.uuid = self.uuids[0]
+        self.strategy = strategy
+        self.action = action
+        self.symbol = symbol
+        self.amount = amount
+        self.context = context
+        self.created_time = created_time
+
+
+class OrderTracker:
+    """
+    주문 uuid를 등록해 두고 매 틱 한 번의 /v1/orders/uuids 요청으로 미체결 주문 전체의 상태를 조회합니다.
+
+    주문이 완료(done/cancel)되면 실제 체결 수량, 평균 체결가, 수수료를 Fill로 만들어
+    주문을 낸 전략의 on_fill()로 전달하므로, 평단가와 손절 판단이 추정치가 아닌 실제 체결가를 따릅니다.
+    """
+
+    def __init__(self, upbit_api, clock=None):
+        self.upbit_api = upbit_api
+        self.clock = clock or SYSTEM_CLOCK
+        self._orders = {} # uuid -> _TrackedOrder
+        self._lock = threading.Lock()
+        logger.info("✅ OrderTracker 초기화 완료")
+
+    def track(self, order_result, strategy, action: str, amount: float, context: dict = None) -> bool:
+        """
+        execute_market_order의 결과를 추적 대상으로 등록합니다.
+
+        :param order_result: 주문 결과 dict 또는 자식 주문 결과 목록 (실패한 자식 주문은 None)
+        :param amount: 요청한 전체 주문 크기 (매수: KRW / 매도: 수량)
+        :return: 등록 여부 (주문 실패 / 가상 주문은 추적하지 않음)
+        """
+        results = order_result if isinstance(order_result, list) else [order_result]
+        uuids = [result.get('uuid') for result in results if isinstance(result, dict)]
+        uuids = [uuid for uuid in uuids if uuid is not None and uuid != SIMULATED_ORDER_UUID]
+        if not uuids:
+            return False
+
+        with self._lock:
+            self._orders[uuids[0]] = _TrackedOrder(uuids, strategy, action, strategy.symbol, amount, context or {},
+                                                 self.clock.time())
+        return True
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._orders)
+
+    def poll(self) -> list:
+        """
+        추적 중인 모든 주문의 상태를 일괄 조회하고, 완료된 주문을 전략에 반영합니다.
+
+        :return: 이번 호출에서 완료된 [(strategy, Fill), ...]
+        """
+        with self._lock:
+            tracked = list(self._orders.values())
+        if not tracked:
+            return []
+
+        all_uuids = [uuid for order in tracked for uuid in order.uuids]
+        orders = {}
+        for start in range(0, len(all_uuids), UUIDS_BATCH_SIZE):
+            batch = all_uuids[start:start + UUIDS_BATCH_SIZE]
+            result = self.upbit_api.get_orders_by_uuids(batch)
+            if not isinstance(result, list):
+                logger.error(f"주문 상태 일괄 조회 실패 ({len(batch)}건): {result}")
+                continue
+            for order in result:
+                orders[order.get('uuid')] = order
+
+        completed = []
+        current_time = self.clock.time()
+        for tracked_order in tracked:
+            child_orders = [orders.get(uuid) for uuid in tracked_order.uuids]
+
+            if any(order is None or order.get('state') not in TERMINAL_STATES for order in child_orders):
+                if current_time - tracked_order.created_time > settings.ORDER_TRACK_TIMEOUT_SEC:
+                    logger.warning(f"주문 {tracked_order.uuid} 체결 확인 시간 초과. 추적을 중단합니다.")
+                    _FILLS.inc(state="timeout")
+                    self._forget(tracked_order.uuid)
+                continue
+
+            fill = self._build_fill(tracked_order, child_orders)
+            if fill is None:
+                continue # 체결 금액을 확인하지 못했으면 다음 틱에 다시 조회
+            self._forget(tracked_order.uuid)
+            _FILLS.inc(state=fill.state)
+
+            logger.info(f"[SUCCESS] {tracked_order.strategy.name} 주문 체결 확인: {fill}")
+            try:
+                tracked_order.strategy.on_fill(fill)
+            except Exception as e:
+                logger.error(f"{tracked_order.strategy.name} 체결 반영 중 오류: {e}")
+            completed.append((tracked_order.strategy, fill))
+
+        _PENDING.set(self.pending_count())
+        return completed
+
+    def _forget(self, uuid: str):
+        with self._lock:
+            self._orders.pop(uuid, None)
+
+    def _build_fill(self, tracked_order: _TrackedOrder, child_orders):
+        executed_funds = 0.0
+        for order in child_orders:
+            funds = self._executed_funds(order)
+            if funds is None:
+                return None
+            executed_funds += funds
+
+        states = {order['state'] for order in child_orders}
+        return Fill(
+            uuid=tracked_order.uuid,
+            action=tracked_order.action,
+            symbol=tracked_order.symbol,
+            requested_amount=tracked_order.amount,
+            state=states.pop() if len(states) == 1 else "partial",
+            executed_volume=sum(float(order.get('executed_volume') or 0.0) for order in child_orders),
+            executed_funds=executed_funds,
+            paid_fee=sum(float(order.get('paid_fee') or 0.0) for order in child_orders),
+            context=tracked_order.context,
+        )
+
+    def _executed_funds(self, order: dict):
+        """체결 금액 합계. 일괄 조회 응답에 없으면 개별 조회의 체결 내역(trades)으로 계산합니다."""
+        if order.get('executed_funds') is not None:
+            return float(order['executed_funds'])
+        if float(order.get('executed_volume') or 0.0) == 0:
+            return 0.0
+
+        trades = order.get('trades')
+        if trades is None:
+            detail = self.upbit_api.get_order(order['uuid'])
+            if not isinstance(detail, dict):
+                return None
+            trades = detail.get('trades') or []
+        return sum(float(trade['funds']) for trade in trades)
@@ -1,118 +1,377 @@
 # 파일명: main.py
-import time
-import datetime
+import logging
+import functools
+from concurrent.futures import ThreadPoolExecutor, wait
 from config import settings
-from connectors.upbit_api import UpbitAPI
-from connectors.external_data import ExternalData
-from execution.order_manager import OrderManager
-# 💡 모든 전략 import
-from strategies.USDT_kimchipremium import KimchiPremiumStrategy
-from strategies.TrendlineStrategy import TrendlineStrategy
-
-def get_strategy_class(strategy_type):
-    if strategy_type == "KIMP_GRID":
-        return KimchiPremiumStrategy
-    elif strategy_type == "TRENDLINE":
-        return TrendlineStrategy
-    return None
-
-def fetch_all_data(upbit_conn, external_conn) -> dict:
-    data = {}
-    
-    # 1. 공통 데이터 (USDT, 환율, 김프)
-    data['usdt_price'] = upbit_conn.get_usdt_krw_price()
-    data['usdt_krw_price'] = external_conn.get_usd_krw_exchange_rate() 
-    data['kimchi_premium'] = external_conn.calculate_kimchi_premium(data['usdt_price'])
-
-    # 2. 전략별 필요 데이터 자동 수집 (동적 할당)
+from core.clock import SYSTEM_CLOCK
+from core.market_snapshot import (MarketSnapshot, USDT_KRW_PRICE, USDT_PRICE, KIMCHI_PREMIUM, KIMCHI_PREMIUM_VWAP_BUY,
+                                  KIMCHI_PREMIUM_VWAP_SELL, FX_AGE_SEC, field_slot, price_field)
+from core.scheduler import StrategyScheduler
+from strategies.registry import create_strategy
+from monitoring import metrics
+
+# 커넥터/주문/상태 저장 모듈과 전략 모듈은 build_live_components / main_loop에서 필요한 것만 import (기동 시간/메모리 절약)
+
+logger = logging.getLogger(__name__)
+
+FETCH_SECONDS = metrics.histogram("fetch_all_data_seconds", "틱당 시장 데이터 수집 소요 시간")
+MISSING_DATA = metrics.counter("market_data_missing_total", "수집하지 못한(None) 시장 데이터 항목 수", ("key",))
+STRATEGY_SECONDS = metrics.histogram("strategy_evaluate_seconds", "전략 determine_action_and_amount 소요 시간", ("strategy",))
+STRATEGY_SIGNALS = metrics.counter("strategy_signals_total", "전략 판단 결과 수", ("strategy", "action"))
+LOOP_ERRORS = metrics.counter("loop_errors_total", "메인 루프에서 잡힌 예외 수")
+
+# 데이터 수집용 스레드 풀 (틱마다 새로 만들지 않고 재사용)
+_fetch_executor = ThreadPoolExecutor(max_workers=settings.FETCH_MAX_WORKERS, thread_name_prefix="fetch")
+
+def get_target_symbols(strategy_configs=None) -> set:
+    """활성 전략 중 외부 데이터(바이낸스)가 필요한 심볼 목록을 반환합니다."""
     # settings에 정의된 활성 전략들에서 symbol을 추출 (중복 제거를 위해 set 사용)
     target_symbols = set()
-    for strategy_conf in settings.STRATEGY_LIST:
+    for strategy_conf in (settings.STRATEGY_LIST if strategy_configs is None else strategy_configs):
         # 활성화된 전략이고, 외부 데이터(바이낸스)가 필요한 전략(Trendline 등)인 경우
         if strategy_conf.get('is_active') and strategy_conf.get('symbol') != "USDT":
             target_symbols.add(strategy_conf['symbol'])
-    
-    # 추출된 종목들의 바이낸스 가격 조회
-    for symbol in target_symbols:
-        # 바이낸스 심볼 형식: BTC -> BTCUSDT
-        binance_symbol = f"{symbol.upper()}USDT"
-        price = external_conn.get_binance_price(binance_symbol)
-        
-        # 전략 파일이 기대하는 키 형식: BTC -> btc_usdt_price
-        key_name = f"{symbol.lower()}_usdt_price"
-        data[key_name] = price
+    return target_symbols
+
+def _collect_result(future, label: str):
+    """Future 결과를 꺼냅니다. 마감 시간 안에 끝나지 않았거나 예외가 발생하면 None을 반환합니다."""
+    if not future.done():
+        logger.error(f"{label} 수집 시간 초과 ({settings.FETCH_DEADLINE_SEC}초)")
+        return None
+    try:
+        return future.result()
+    except Exception as e:
+        logger.error(f"{label} 수집 중 예외 발생: {e}")
+        return None
+
+@functools.lru_cache(maxsize=32)
+def _binance_fields(target_symbols: frozenset) -> tuple:
+    """심볼 집합 -> ((바이낸스 심볼, 필드 이름, 슬롯), ...) (BTC -> BTCUSDT / btc_usdt_price, 틱마다 문자열을 만들지 않음)"""
+    fields = []
+    for symbol in sorted(target_symbols):
+        name = price_field(symbol)
+        fields.append((f"{symbol.upper()}USDT", name, field_slot(name)))
+    return tuple(fields)
+
+def fetch_all_data(upbit_conn, external_conn, market_feed=None, clock=None, strategy_configs=None,
+                   snapshot: MarketSnapshot = None) -> MarketSnapshot:
+    """
+    전략 실행에 필요한 모든 시장 데이터를 수집합니다.
+
+    market_feed(WebSocket 스트림)가 주어지면 스트림의 최신 가격을 먼저 사용하고,
+    스트림에 없는 항목만 REST로 조회합니다. 환율은 FxRateProvider의 캐시 값을 기다림 없이 사용하고
+    ('fx_source', 'fx_age_sec'에 출처와 경과 시간 기록), 서로 독립적인 REST 요청(업비트 USDT 가격,
+    바이낸스 일괄 가격)은 스레드 풀에서 동시에 실행하고, FETCH_DEADLINE_SEC 안에 끝나지 않았거나
+    실패한 항목은 무효(None)로 둔 채 'failed_keys' 목록에 기록하여 부분 데이터를 반환합니다.
+    KRW-USDT 호가창이 있으면 KIMP_VWAP_ORDER_KRW만큼 매수/매도할 때의 VWAP 기준 김프
+    ('kimchi_premium_vwap_buy' / 'kimchi_premium_vwap_sell')도 함께 넣습니다.
+
+    :param clock: 'timestamp_ms'(수집 시각)와 마감 시간 계산에 쓸 시계 (리플레이에서는 가상 시계)
+    :param strategy_configs: 데이터를 수집할 전략 설정 목록 (None이면 settings.STRATEGY_LIST)
+    :param snapshot: 다시 채워 쓸 MarketSnapshot (None이면 새로 생성)
+    """
+    clock = clock or SYSTEM_CLOCK
+    now = clock.time()
+    data = snapshot.reset(int(now * 1000)) if snapshot is not None else MarketSnapshot(int(now * 1000))
+    failed_keys = data.failed_keys
+    deadline = now + settings.FETCH_DEADLINE_SEC
+
+    # 바이낸스 심볼 형식: BTC -> BTCUSDT / 전략 파일이 기대하는 키 형식: BTC -> btc_usdt_price
+    target_symbols = get_target_symbols(strategy_configs)
+    binance_fields = _binance_fields(frozenset(target_symbols))
+
+    # 주문 분할 / VWAP 김프 계산용 업비트 호가창 (KRW-USDT + 활성 전략 마켓)
+    orderbook_codes = []
+    if settings.ORDERBOOK_ENABLED:
+        orderbook_codes = ["KRW-USDT"] + sorted(f"KRW-{symbol}" for symbol in target_symbols)
+
+    # 1. 스트림 가격 우선 사용
+    usdt_price = None
+    binance_prices = {}
+    orderbooks = data.orderbooks
+    if market_feed is not None:
+        usdt_price = market_feed.get_upbit_price("KRW-USDT")
+        for binance_symbol, _, _ in binance_fields:
+            price = market_feed.get_binance_price(binance_symbol)
+            if price is not None:
+                binance_prices[binance_symbol] = price
+        for code in orderbook_codes:
+            book = market_feed.get_orderbook(code)
+            if book is not None:
+                orderbooks[code] = book
+
+    # 2. 환율은 백그라운드에서 갱신되는 캐시 값을 즉시 사용 (출처와 경과 시간을 함께 기록)
+    fx_quote = external_conn.get_fx_quote()
+    if fx_quote is not None:
+        data.set(USDT_KRW_PRICE, fx_quote.rate, int(fx_quote.fetched_at * 1000))
+        data.set(FX_AGE_SEC, fx_quote.age_sec)
+        data.fx_source = fx_quote.source
+
+    # 3. 나머지 항목은 REST로 병렬 요청
+    usdt_future = None
+    if usdt_price is None:
+        usdt_future = _fetch_executor.submit(upbit_conn.get_usdt_krw_price)
+
+    # 전략별 필요 데이터 자동 수집 (동적 할당, 바이낸스는 한 번의 요청으로 일괄 조회)
+    rest_symbols = [binance_symbol for binance_symbol, _, _ in binance_fields if binance_symbol not in binance_prices]
+    binance_future = None
+    if rest_symbols:
+        binance_future = _fetch_executor.submit(external_conn.get_binance_prices, rest_symbols)
+
+    # 스트림에 없는 호가창은 한 번의 요청으로 일괄 조회
+    rest_orderbook_codes = [code for code in orderbook_codes if code not in orderbooks]
+    orderbook_future = None
+    if rest_orderbook_codes:
+        orderbook_future = _fetch_executor.submit(upbit_conn.get_orderbooks, rest_orderbook_codes)
+
+    # 4. 마감 시간까지 대기 후 결과 수집 (시간 초과 요청은 기다리지 않음)
+    pending = [future for future in (usdt_future, binance_future, orderbook_future) if future is not None]
+    wait(pending, timeout=max(0, deadline - clock.time()))
+
+    usdt_price = usdt_price if usdt_future is None else _collect_result(usdt_future, 'usdt_price')
+    data.set(USDT_PRICE, usdt_price)
+    if binance_future is not None:
+        binance_prices.update(_collect_result(binance_future, '바이낸스 가격') or {})
+
+    for binance_symbol, _, slot in binance_fields:
+        data.set(slot, binance_prices.get(binance_symbol))
+
+    # 호가창은 없어도 전략 판단은 가능하므로 failed_keys에 넣지 않음 (주문 분할만 생략)
+    if orderbook_future is not None:
+        orderbooks.update(_collect_result(orderbook_future, '업비트 호가창') or {})
 
+    if fx_quote is None:
+        failed_keys.append('usdt_krw_price')
+    if usdt_price is None:
+        failed_keys.append('usdt_price')
+    for _, key_name, slot in binance_fields:
+        if data.get(slot) is None:
+            failed_keys.append(key_name)
+
+    # 5. 김프 계산 (USDT 가격과 환율 결과에 의존하므로 마지막에 계산)
+    if usdt_price is not None and fx_quote is not None:
+        data.set(KIMCHI_PREMIUM, external_conn.calculate_kimchi_premium(usdt_price, fx_quote))
+    else:
+        failed_keys.append('kimchi_premium')
+
+    # 호가창 기준 VWAP 김프 (기준 주문 금액만큼 체결했을 때의 평균가 기준, 호가창이 없으면 무효로 두고 failed_keys에는 넣지 않음)
+    usdt_book = orderbooks.get("KRW-USDT")
+    if usdt_book is not None and fx_quote is not None:
+        order_krw = settings.KIMP_VWAP_ORDER_KRW
+        vwap_buy = usdt_book.vwap_buy_krw(order_krw)
+        vwap_sell = usdt_book.vwap_sell_volume(order_krw / usdt_book.best_bid) if usdt_book.best_bid else None
+        if vwap_buy is not None:
+            data.set(KIMCHI_PREMIUM_VWAP_BUY, external_conn.calculate_kimchi_premium(vwap_buy, fx_quote), usdt_book.timestamp_ms)
+        if vwap_sell is not None:
+            data.set(KIMCHI_PREMIUM_VWAP_SELL, external_conn.calculate_kimchi_premium(vwap_sell, fx_quote), usdt_book.timestamp_ms)
+
+    for key_name in failed_keys:
+        MISSING_DATA.inc(key=key_name)
+
+    # 추세선 등 시각에 의존하는 전략은 data.timestamp_ms(수집 시각)를 현재 시각으로 사용
     return data
 
-def main_loop():
-    """자동매매 프로그램의 메인 실행 루프입니다."""
-    print("-" * 50)
-    print("🤖 자동매매 프로그램 시작")
-    print("-" * 50)
+def _handle_order_result(future, strategy, action, amount, context, order_tracker, state_store):
+    """주문 워커에서 주문이 끝나면 호출됩니다. 체결 추적에 등록하고 전략 상태를 즉시 fsync합니다."""
+    order_tracker.track(future.result(), strategy, action, amount, context)
+    state_store.save(strategy, durable=True)
+
+def build_live_components(clock=None) -> dict:
+    """실거래용 커넥터, 주문 처리, 상태 저장소를 생성합니다. (main_loop의 components 기본값)"""
+    from connectors.upbit_api import UpbitAPI
+    from connectors.external_data import ExternalData
+    from execution.order_manager import OrderManager
+    from execution.order_tracker import OrderTracker
+    from execution.order_queue import OrderExecutionQueue
+    from storage.state_journal import StrategyStateStore
+
+    upbit_conn = UpbitAPI()
+    order_mgr = OrderManager(upbit_conn, clock=clock)
+
+    # 실시간 시세 스트림 (끊겨 있는 동안은 fetch_all_data가 REST로 대체 조회)
+    market_feed = None
+    if settings.USE_WEBSOCKET_FEED:
+        from connectors.market_stream import MarketDataFeed
+        market_feed = MarketDataFeed.from_settings().start()
+
+    # 시세 기록 (김프 백테스트/리플레이용 데이터 수집, 압축/쓰기는 백그라운드 스레드에서 처리)
+    recorder = None
+    if settings.RECORDER_ENABLED:
+        from storage.market_recorder import MarketRecorder
+        recorder = MarketRecorder().start()
+        if market_feed is not None:
+            market_feed.store.recorder = recorder
+
+    return {
+        'upbit_conn': upbit_conn,
+        'external_conn': ExternalData(clock=clock),
+        'order_mgr': order_mgr,
+        'order_tracker': OrderTracker(upbit_conn, clock=clock),
+        # 주문은 워커 스레드에서 실행 (느린 주문 응답이 다른 전략의 평가를 막지 않음)
+        'order_queue': OrderExecutionQueue(order_mgr, clock=clock).start(),
+        'market_feed': market_feed,
+        # 재시작 전 전략 상태 복원 (스냅샷 + 저널)
+        'state_store': StrategyStateStore().open(),
+        'strategy_configs': settings.STRATEGY_LIST,
+        'recorder': recorder,
+    }
+
+def main_loop(components: dict = None, clock=None, until: float = None):
+    """
+    자동매매 프로그램의 메인 실행 루프입니다.
+
+    :param components: build_live_components()와 같은 키의 dict (리플레이에서는 가짜 거래소 객체를 주입)
+    :param clock: 시각 조회와 대기에 쓸 시계 (기본: 실제 시간, 리플레이에서는 가상 시계)
+    :param until: clock 기준 이 시각이 지나면 루프를 끝냄 (None이면 중단 요청까지 계속)
+    """
+    logger.info("🤖 자동매매 프로그램 시작")
+    clock = clock or SYSTEM_CLOCK
 
     # 1. 모듈 초기화
     try:
-        upbit_conn = UpbitAPI()
-        external_conn = ExternalData()
-        order_mgr = OrderManager(upbit_conn)
-        
+        if components is None:
+            components = build_live_components(clock)
+        upbit_conn = components['upbit_conn']
+        external_conn = components['external_conn']
+        order_mgr = components['order_mgr']
+        order_tracker = components['order_tracker']
+        order_queue = components['order_queue']
+        market_feed = components.get('market_feed')
+        state_store = components['state_store']
+        strategy_configs = components.get('strategy_configs', settings.STRATEGY_LIST)
+        recorder = components.get('recorder')
+
         active_strategies = []
-        for config in settings.STRATEGY_LIST:
+        for config in strategy_configs:
             if config.get("is_active"):
-                StrategyClass = get_strategy_class(config["strategy_type"])
-                if StrategyClass:
-                    active_strategies.append(StrategyClass(config))
+                strategy = create_strategy(config, clock)
+                if strategy:
+                    state_store.restore(strategy)
+                    active_strategies.append(strategy)
                 
     except Exception as e:
-        print(f"[FATAL] 초기화 중 심각한 오류 발생: {e}")
+        logger.exception(f"초기화 중 심각한 오류 발생: {e}")
         return
 
-    while True:
-        start_time = time.time()
+    # 이벤트 기반 스케줄러: 입력값이 변했거나 레벨을 돌파한 전략만 재평가
+    scheduler = StrategyScheduler(active_strategies)
+    last_feed_version = market_feed.store.version if market_feed is not None else 0
+    snapshot = MarketSnapshot() # 틱마다 새로 만들지 않고 같은 스냅샷을 다시 채워 사용
+
+    while until is None or clock.time() < until:
+        start_time = clock.time()
         
         try:
-            # 1. 시간 출력 및 모니터링 시작
-            now = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            print(f"\n[{now}] === 모니터링 시작 (활성 전략: {len(active_strategies)}개) === ")
-
-            # 2. 모든 데이터 수집
-            current_data = fetch_all_data(upbit_conn, external_conn)
+            # 1. 모든 데이터 수집
+            with FETCH_SECONDS.time():
+                current_data = fetch_all_data(upbit_conn, external_conn, market_feed, clock, strategy_configs, snapshot)
+            if recorder is not None:
+                recorder.record_snapshot(current_data)
             
-            # 3. 잔고 조회 
-            usdt_balance, krw_balance = order_mgr.get_current_balance("USDT")
-            btc_balance, _ = order_mgr.get_current_balance("BTC")
+            # 미체결 주문 상태를 한 번에 조회하여 실제 체결 결과를 전략 상태에 반영
+            for filled_strategy, _ in order_tracker.poll():
+                state_store.save(filled_strategy, durable=True)
+
+            # 2. 잔고 조회 (전체 통화를 한 번에 조회한 스냅샷 사용)
+            balances = order_mgr.get_balance_snapshot()
+            if balances is None:
+                # 잔고 0으로 평가하면 보유 상태가 초기화되어 저널에 남으므로 이번 틱은 평가하지 않음
+                logger.warning("잔고 조회 실패: 이번 틱은 전략 평가를 건너뜁니다.")
+
+            # 3. 재평가가 필요한 전략 선별 (주문 처리 중인 심볼은 잔고가 확정될 때까지 보류)
+            due_strategies = [] if balances is None else [
+                strategy for strategy in active_strategies
+                if not order_queue.is_busy(strategy.symbol) and
+                scheduler.should_evaluate(strategy, current_data,
+                                          (balances.get('KRW', 0.0), balances.get(strategy.symbol, 0.0)), start_time)
+            ]
+
+            if due_strategies:
+                # 시간 출력 및 모니터링 시작
+                logger.info(f"=== 모니터링 시작 (평가 전략: {len(due_strategies)}/{len(active_strategies)}개) === ")
             
             # 4. 각 전략 실행 및 주문 판단
-            for strategy in active_strategies:
-                print(f"\n[🔍 {strategy.name} ({strategy.symbol})] 분석 시작")
+            for strategy in due_strategies:
+                # 같은 틱에서 앞선 전략이 같은 심볼로 주문을 냈으면 잔고가 확정될 때까지 보류
+                if order_queue.is_busy(strategy.symbol):
+                    continue
+                logger.info(f"[🔍 {strategy.name} ({strategy.symbol})] 분석 시작")
                 
-                # 심볼에 따라 사용할 잔고 결정
-                symbol_balance = usdt_balance if strategy.symbol == "USDT" else btc_balance
+                # 심볼에 따라 사용할 잔고 결정 (직전 전략의 주문으로 캐시가 무효화되었으면 재조회)
+                balances = order_mgr.get_balance_snapshot()
+                if balances is None:
+                    logger.warning("잔고 조회 실패: 남은 전략은 다음 틱에 평가합니다.")
+                    break
+                krw_balance = balances.get('KRW', 0.0)
+                symbol_balance = balances.get(strategy.symbol, 0.0)
                 
-                # 전략 실행 및 매매 신호 수신
-                action, amount_type, amount_value = strategy.determine_action_and_amount(
-                    current_data, krw_balance, symbol_balance
-                )
+                # 전략 실행 및 매매 신호 수신 (주문이 거절되면 판단 이전 상태로 되돌림)
+                state_before = strategy.get_state()
+                with STRATEGY_SECONDS.time(strategy=strategy.name):
+                    action, amount_type, amount_value = strategy.determine_action_and_amount(
+                        current_data, krw_balance, symbol_balance
+                    )
+                STRATEGY_SIGNALS.inc(strategy=strategy.name, action=action)
+                scheduler.mark_evaluated(strategy, current_data, (krw_balance, symbol_balance), start_time)
                 
-                # 5. 주문 실행
-                if action in ['BUY', 'SELL'] and amount_value > 0:
-                    # OrderManager 호출 (USDT, BTC 모두 처리 가능)
-                    order_mgr.execute_market_order(action, amount_value, symbol=strategy.symbol) 
-
-            # 6. 다음 루프 대기 시간 계산 (정상 실행 시 대기)
-            end_time = time.time()
-            elapsed_time = end_time - start_time
-            sleep_time = max(0, settings.MONITORING_INTERVAL_SEC - elapsed_time)
-            
-            print(f".................")
-            time.sleep(sleep_time)
+                # 5. 바뀐 상태만 저널에 기록 (주문을 내는 경우 재매수 방지를 위해 주문 전에 즉시 fsync)
+                order_sent = action in ['BUY', 'SELL'] and amount_value > 0
+                state_store.save(strategy, durable=order_sent)
+
+                # 6. 주문 큐에 제출 (USDT, BTC 모두 처리 가능, 결과는 워커에서 콜백으로 처리)
+                if order_sent:
+                    # 호가창 기준 예상 슬리피지가 한도를 넘으면 자식 주문으로 나누어 실행
+                    child_amounts = strategy.plan_child_orders(action, amount_value, current_data)
+                    future = order_queue.submit(action, amount_value, strategy.symbol, child_amounts)
+                    if future is None:
+                        logger.warning(f"{strategy.name} {action} 주문이 큐에 들어가지 않아 판단 이전 상태로 되돌립니다.")
+                        strategy.restore_state(state_before)
+                        state_store.save(strategy, durable=True)
+                        continue
+                    future.add_done_callback(functools.partial(
+                        _handle_order_result, strategy=strategy, action=action, amount=amount_value,
+                        context=strategy.last_order_context, order_tracker=order_tracker, state_store=state_store))
+
+            # 묶음 fsync 주기 안에 기록된 나머지 상태도 대기 전에 디스크에 반영
+            state_store.flush()
+
+            # 7. 다음 평가 시점까지 대기
+            if market_feed is not None:
+                # 스트림 가격이 갱신되거나 주기적 점검 시각이 될 때까지 대기 (최소 간격으로 연속 이벤트를 묶음)
+                clock.sleep(max(0, settings.EVENT_MIN_INTERVAL_SEC - (clock.time() - start_time)))
+                timeout = max(0, scheduler.next_deadline(clock.time()) - clock.time())
+                last_feed_version = market_feed.store.wait_for_update(last_feed_version, timeout=timeout)
+            else:
+                # 스트림을 쓰지 않으면 기존처럼 고정 주기로 폴링
+                elapsed_time = clock.time() - start_time
+                sleep_time = max(0, settings.MONITORING_INTERVAL_SEC - elapsed_time)
+                clock.sleep(sleep_time)
 
         except KeyboardInterrupt:
-            print("\n👋 사용자 요청으로 프로그램 종료.")
+            logger.info("👋 사용자 요청으로 프로그램 종료.")
             break
         except Exception as e:
-            print(f"[FATAL] 루프 실행 중 예상치 못한 오류 발생: {e}")
-            time.sleep(settings.MONITORING_INTERVAL_SEC)
+            LOOP_ERRORS.inc()
+            logger.exception(f"루프 실행 중 예상치 못한 오류 발생: {e}")
+            clock.sleep(settings.MONITORING_INTERVAL_SEC)
+
+    if market_feed is not None:
+        market_feed.stop()
+    order_queue.stop() # 제출된 주문을 마저 처리한 뒤 상태 저장소를 닫음
+    state_store.close()
+    if recorder is not None:
+        recorder.close()
             
 if __name__ == "__main__":
-    main_loop()
\ No newline at end of file
+    # 로그 출력/파일 기록은 백그라운드 스레드에서 처리 (monitoring/log.py)
+    from monitoring import log
+    log.setup_logging()
+    # 지표 엔드포인트 (http://127.0.0.1:9108/metrics)
+    metrics.start_http_server()
+
+    if settings.SHARD_WORKERS > 0:
+        # 전략이 많으면 워커 프로세스에 나누어 평가 (시세/잔고/주문은 코디네이터가 전담)
+        from core.sharded_runner import ShardedRunner
+        ShardedRunner().run()
+    else:
+        main_loop()
\ No newline at end of file
@@ -0,0 +1,207 @@
+# 파일명: monitoring/log.py
+import atexit
+import contextlib
+import datetime
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+from collections import OrderedDict
+from config import settings
+
+# LogRecord 기본 속성 (이 외의 속성은 extra로 넘긴 구조화 필드로 보고 JSON에 포함)
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_listeners = []
+_output_handlers = [] # 모든 리스너가 공유하는 콘솔/파일 핸들러 (같은 파일을 두 핸들러가 회전시키지 않도록)
+_setup_lock = threading.Lock()
+
+
+class JsonFormatter(logging.Formatter):
+    """로그 레코드를 한 줄짜리 JSON으로 변환합니다. (extra로 넘긴 필드 포함)"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "process": record.processName,
+            "thread": record.threadName,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """콘솔용 사람이 읽기 쉬운 형식 (전략 로그는 전략 이름을 앞에 붙임)"""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-7s %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
+
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        line = super().formatMessage(record)
+        strategy = getattr(record, "strategy", None)
+        if strategy:
+            head, _, message = line.partition(f"{record.levelname:<7} ")
+            line = f"{head}{record.levelname:<7} [{strategy}] {message}"
+        return line
+
+
+class RepeatFilter(logging.Filter):
+    """
+    같은 호출 위치의 로그가 interval_sec 안에 반복되면 버립니다. (예: 매 틱의 "현재가/목표가" 안내)
+    구간이 지난 뒤 다시 나오면 그동안 생략한 횟수를 붙여 한 번 출력합니다.
+
+    호출부 대부분이 f-string으로 값을 메시지에 넣으므로 메시지 내용이 아니라 (로거, 레벨, 전략, 파일, 줄 번호)를
+    키로 씁니다. 경고 이상은 내용이 다른 메시지를 숨기지 않도록 메시지 내용도 키에 포함합니다.
+    최근 max_keys개만 기억합니다.
+    """
+
+    def __init__(self, interval_sec: float = None, max_keys: int = 2048):
+        super().__init__()
+        self.interval_sec = settings.LOG_REPEAT_INTERVAL_SEC if interval_sec is None else interval_sec
+        self.max_keys = max_keys
+        self._seen = OrderedDict() # key -> [마지막 출력 시각, 생략 횟수]
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.interval_sec <= 0:
+            return True
+        key = (record.name, record.levelno, getattr(record, "strategy", None), record.pathname, record.lineno)
+        if record.levelno >= logging.WARNING:
+            key += (record.getMessage(),)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._seen.get(key)
+            if entry is not None and now - entry[0] < self.interval_sec:
+                entry[1] += 1
+                return False
+            suppressed = entry[1] if entry is not None else 0
+            self._seen[key] = [now, 0]
+            self._seen.move_to_end(key)
+            if len(self._seen) > self.max_keys:
+                self._seen.popitem(last=False)
+        if suppressed:
+            record.repeated = suppressed
+            record.msg = f"{record.msg} (최근 {self.interval_sec:.0f}초간 {suppressed}회 반복 생략)"
+        return True
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """큐가 가득 차면 기다리지 않고 레코드를 버리는 QueueHandler (버린 개수는 다음 레코드에 표시)"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        if self.dropped:
+            record.dropped = self.dropped
+        try:
+            self.queue.put_nowait(record)
+            self.dropped = 0
+        except queue.Full:
+            self.dropped += 1
+
+
+def _build_output_handlers(file_path: str = None) -> list:
+    """실제 I/O를 하는 핸들러 목록 (QueueListener 스레드에서 실행)"""
+    console = logging.StreamHandler(sys.stdout)
+    console.setFormatter(JsonFormatter() if settings.LOG_CONSOLE_FORMAT == "json" else TextFormatter())
+    handlers = [console]
+
+    if file_path:
+        directory = os.path.dirname(file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        file_handler = logging.handlers.RotatingFileHandler(
+            file_path, maxBytes=settings.LOG_FILE_MAX_BYTES, backupCount=settings.LOG_FILE_BACKUP_COUNT, encoding="utf-8",
+        )
+        file_handler.setFormatter(JsonFormatter())
+        handlers.append(file_handler)
+    return handlers
+
+
+def _install_queue_handler(log_queue, level):
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    queue_handler = NonBlockingQueueHandler(log_queue)
+    # 반복 메시지는 큐에 넣기 전에 거름 (버릴 레코드 때문에 큐와 I/O 스레드가 바빠지지 않도록)
+    queue_handler.addFilter(RepeatFilter())
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+
+def setup_logging(level: str = None, to_file: bool = True):
+    """
+    프로세스 로깅을 설정합니다.
+
+    로거 호출은 레코드를 큐에 넣기만 하고, 콘솔/파일 쓰기와 파일 회전은 QueueListener의
+    백그라운드 스레드가 처리하므로 메인 루프가 stdout 파이프나 디스크 I/O에서 멈추지 않습니다.
+
+    :param to_file: False이면 LOG_FILE_PATH에 쓰지 않고 콘솔에만 출력 (CLI 도구용)
+    """
+    with _setup_lock:
+        if _listeners:
+            return
+        _output_handlers.extend(_build_output_handlers(settings.LOG_FILE_PATH if to_file else None))
+        log_queue = queue.Queue(maxsize=settings.LOG_QUEUE_MAX_SIZE)
+        _install_queue_handler(log_queue, level or settings.LOG_LEVEL)
+        _start_listener_locked(log_queue)
+        atexit.register(shutdown_logging)
+
+
+def is_configured() -> bool:
+    """setup_logging()이 호출되어 리스너가 동작 중인지 여부"""
+    return bool(_listeners)
+
+
+def start_listener(log_queue):
+    """
+    log_queue의 레코드를 setup_logging()에서 만든 콘솔/파일 핸들러로 쓰는 QueueListener를 추가로 시작합니다.
+    (멀티 프로세스 실행 시 워커들이 보내는 multiprocessing.Queue용)
+    """
+    with _setup_lock:
+        return _start_listener_locked(log_queue)
+
+
+def _start_listener_locked(log_queue):
+    listener = logging.handlers.QueueListener(log_queue, *_output_handlers, respect_handler_level=True)
+    listener.start()
+    _listeners.append(listener)
+    return listener
+
+
+def setup_worker_logging(log_queue, level: str = None):
+    """자식 프로세스의 레코드를 부모가 듣는 multiprocessing.Queue로 보냅니다. (파일은 부모만 씀)"""
+    _install_queue_handler(log_queue, level or settings.LOG_LEVEL)
+
+
+def shutdown_logging():
+    """큐에 남은 레코드를 모두 쓰고 리스너를 종료합니다."""
+    with _setup_lock:
+        while _listeners:
+            _listeners.pop().stop()
+        while _output_handlers:
+            _output_handlers.pop().close()
+
+
+@contextlib.contextmanager
+def silenced():
+    """블록 안의 로그를 모두 버립니다. (백테스트에서 전략 로그 비용 제거용)"""
+    previous = logging.root.manager.disable
+    logging.disable(logging.CRITICAL)
+    try:
+        yield
+    finally:
+        logging.disable(previous)
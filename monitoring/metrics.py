@@ -0,0 +1,283 @@
+# 파일명: monitoring/metrics.py
+import logging
+import threading
+import time
+from bisect import bisect_left
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# 지연 시간 히스토그램 기본 구간 (초)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _Metric:
+    type_name = "untyped"
+
+    def __init__(self, name: str, help_text: str = "", label_names=()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._values = {} # 라벨 값 튜플 -> 값
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        if not labels:
+            return ()
+        get = labels.get
+        return tuple([str(get(label_name, "")) for label_name in self.label_names])
+
+    def _format_labels(self, key: tuple, extra: str = None) -> str:
+        parts = [f'{label_name}="{_escape(value)}"' for label_name, value in zip(self.label_names, key)]
+        if extra:
+            parts.append(extra)
+        return "{" + ",".join(parts) + "}" if parts else ""
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.type_name}"]
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{self._format_labels(key)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    """누적 횟수 (요청 수, 오류 수, 주문 수 등)"""
+
+    type_name = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    """현재 값 (미체결 주문 수 등)"""
+
+    type_name = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """
+    구간별 관측 횟수와 합계를 누적합니다. (지연 시간 등)
+    관측 시에는 해당 구간 하나만 증가시키고, 누적 구간 값은 출력할 때 계산합니다.
+    """
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, help_text: str = "", label_names=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, label_names)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                # [구간별 횟수 (마지막은 +Inf), 합계, 전체 횟수]
+                series = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def time(self, **labels):
+        """with 블록의 실행 시간을 관측하는 타이머"""
+        return _Timer(self, labels)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.type_name}"]
+        with self._lock:
+            items = [(key, (list(series[0]), series[1], series[2])) for key, series in self._values.items()]
+        for key, (bucket_counts, total, count) in items:
+            cumulative = 0
+            for upper, bucket_count in zip(self.buckets + (float("inf"),), bucket_counts):
+                cumulative += bucket_count
+                le = "+Inf" if upper == float("inf") else _format_value(upper)
+                bucket_labels = self._format_labels(key, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{self._format_labels(key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{self._format_labels(key)} {count}")
+        return lines
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "started")
+
+    def __init__(self, histogram: Histogram, labels: dict):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.observe(time.perf_counter() - self.started, **self.labels)
+        return False
+
+
+class _NullMetric:
+    """METRICS_ENABLED=False일 때 모든 지표 대신 사용하는 아무 일도 하지 않는 객체"""
+
+    __slots__ = ()
+
+    def inc(self, amount: float = 1.0, **labels):
+        pass
+
+    def set(self, value: float, **labels):
+        pass
+
+    def observe(self, value: float, **labels):
+        pass
+
+    def time(self, **labels):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_METRIC = _NullMetric()
+
+
+class MetricsRegistry:
+    """이름별 지표를 보관하고 Prometheus 텍스트 형식으로 출력합니다."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, metric_class, name: str, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = metric_class(name, *args, **kwargs)
+            elif not isinstance(metric, metric_class):
+                raise ValueError(f"지표 {name}이 이미 다른 유형({metric.type_name})으로 등록되어 있습니다.")
+            return metric
+
+    def counter(self, name: str, help_text: str = "", labels=()) -> Counter:
+        return self._get_or_create(Counter, name, help_text, labels)
+
+    def gauge(self, name: str, help_text: str = "", labels=()) -> Gauge:
+        return self._get_or_create(Gauge, name, help_text, labels)
+
+    def histogram(self, name: str, help_text: str = "", labels=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, help_text, labels, buckets)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+_registry = MetricsRegistry()
+
+
+def get_registry() -> MetricsRegistry:
+    return _registry
+
+
+def counter(name: str, help_text: str = "", labels=()):
+    """
+    카운터를 반환합니다. 각 모듈은 import 시점에 한 번 만들어 두고 사용합니다.
+    METRICS_ENABLED=False이면 호출 비용만 드는 빈 객체를 반환합니다.
+    """
+    if not settings.METRICS_ENABLED:
+        return _NULL_METRIC
+    return _registry.counter(settings.METRICS_NAMESPACE + name, help_text, labels)
+
+
+def gauge(name: str, help_text: str = "", labels=()):
+    if not settings.METRICS_ENABLED:
+        return _NULL_METRIC
+    return _registry.gauge(settings.METRICS_NAMESPACE + name, help_text, labels)
+
+
+def histogram(name: str, help_text: str = "", labels=(), buckets=DEFAULT_BUCKETS):
+    if not settings.METRICS_ENABLED:
+        return _NULL_METRIC
+    return _registry.histogram(settings.METRICS_NAMESPACE + name, help_text, labels, buckets)
+
+
+def render() -> str:
+    return _registry.render()
+
+
+class _MetricsServer:
+    """/metrics 요청에 현재 지표를 응답하는 로컬 HTTP 서버 (데몬 스레드)"""
+
+    def __init__(self, host: str, port: int):
+        # 지표를 켜도 서버를 띄우지 않는 프로세스(워커 등)는 http.server를 import하지 않음
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass # 요청마다 stderr에 출력하지 않음
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, name="metrics-http", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def start_http_server(port: int = None, host: str = None):
+    """
+    지표 HTTP 엔드포인트(http://host:port/metrics)를 시작합니다.
+
+    :return: 서버 객체 또는 지표가 꺼져 있거나 포트를 열 수 없으면 None
+    """
+    port = settings.METRICS_HTTP_PORT if port is None else port
+    host = host or settings.METRICS_HTTP_HOST
+    if not settings.METRICS_ENABLED or not port:
+        return None
+
+    try:
+        server = _MetricsServer(host, port).start()
+    except OSError as e:
+        logger.warning(f"지표 HTTP 서버 시작 실패 ({host}:{port}): {e}")
+        return None
+    logger.info(f"✅ 지표 HTTP 서버 초기화 완료 (http://{host}:{port}/metrics)")
+    return server
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
@@ -0,0 +1,331 @@
+# 파일명: storage/candle_store.py
+import datetime
+import logging
+import os
+import threading
+import time
+import numpy as np
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# 컬럼명 -> 저장 dtype (컬럼마다 별도의 고정폭 바이너리 파일로 저장)
+CANDLE_COLUMNS = {
+    "timestamp_ms": np.dtype("<i8"),  # 캔들 시작 시각 (UTC, ms)
+    "open": np.dtype("<f8"),
+    "high": np.dtype("<f8"),
+    "low": np.dtype("<f8"),
+    "close": np.dtype("<f8"),
+    "volume": np.dtype("<f8"),
+    "value": np.dtype("<f8"),         # 누적 거래대금
+}
+
+CANDLE_PAGE_SIZE = 200 # 업비트 캔들 API 요청당 최대 개수
+
+INTERVAL_MS = {
+    "minute1": 60_000, "minute3": 180_000, "minute5": 300_000, "minute10": 600_000,
+    "minute15": 900_000, "minute30": 1_800_000, "minute60": 3_600_000, "minute240": 14_400_000,
+    "day": 86_400_000, "week": 604_800_000, "month": 2_678_400_000, # month는 최대 31일로 근사
+}
+
+# 업비트 일/주/월 캔들은 KST 09:00(UTC 00:00)에 시작 (주봉은 월요일, 월봉은 1일)
+KST = datetime.timezone(datetime.timedelta(hours=9))
+CANDLE_DAY_START_HOUR_KST = 9
+
+
+class CandleStore:
+    """
+    (거래소, 티커, 주기)별 OHLCV 캔들을 디스크에 저장하는 컬럼형 저장소입니다.
+
+    각 컬럼은 <root>/<exchange>/<ticker>/<interval>/<컬럼명>.bin 파일에 고정폭 바이너리로
+    시간순으로 이어 쓰며, 읽을 때는 np.memmap으로 매핑하여 필요한 구간만 디스크에서 읽습니다.
+
+    읽기는 파일을 수정하지 않고 가장 짧은 컬럼 길이까지만 보므로 쓰는 도중에 읽어도 안전합니다.
+    중단된 쓰기(컬럼 길이 불일치)의 복구는 쓰기 잠금을 잡은 쓰기 쪽(append/prepend)에서만 수행합니다.
+    """
+
+    def __init__(self, root_dir: str = None):
+        self.root_dir = root_dir or settings.CANDLE_STORE_DIR
+        self._write_lock = threading.Lock()
+
+    def _series_dir(self, exchange: str, ticker: str, interval: str) -> str:
+        return os.path.join(self.root_dir, exchange.lower(), ticker, interval)
+
+    def _column_path(self, series_dir: str, column: str) -> str:
+        return os.path.join(series_dir, f"{column}.bin")
+
+    def _column_counts(self, series_dir: str) -> dict:
+        counts = {}
+        for column, dtype in CANDLE_COLUMNS.items():
+            path = self._column_path(series_dir, column)
+            counts[column] = os.path.getsize(path) // dtype.itemsize if os.path.exists(path) else 0
+        return counts
+
+    def _row_count(self, series_dir: str) -> int:
+        """모든 컬럼이 완성된 행 수 (가장 짧은 컬럼 길이, 파일은 수정하지 않음)"""
+        return min(self._column_counts(series_dir).values())
+
+    def _repair_torn_write(self, series_dir: str) -> int:
+        """
+        쓰는 도중 중단되어 컬럼 길이가 서로 다르면 가장 짧은 길이에 맞춰 나머지 컬럼을 잘라 냅니다.
+        (_write_lock을 잡은 상태에서만 호출)
+
+        :return: 복구 후 행 수
+        """
+        counts = self._column_counts(series_dir)
+        row_count = min(counts.values())
+        for column, count in counts.items():
+            path = self._column_path(series_dir, column)
+            if os.path.exists(path) and os.path.getsize(path) != row_count * CANDLE_COLUMNS[column].itemsize:
+                logger.warning(f"[CANDLE] 중단된 쓰기 복구: {path} {count}행 -> {row_count}행")
+                with open(path, 'r+b') as f:
+                    f.truncate(row_count * CANDLE_COLUMNS[column].itemsize)
+        return row_count
+
+    def read(self, exchange: str, ticker: str, interval: str, start_ms: int = None, end_ms: int = None) -> dict:
+        """
+        저장된 캔들을 메모리 매핑된 배열로 반환합니다. (복사 없이 디스크에서 필요한 부분만 읽음)
+
+        :param start_ms: 이 시각 이상인 캔들부터 (None이면 처음부터)
+        :param end_ms: 이 시각 미만인 캔들까지 (None이면 끝까지)
+        :return: {컬럼명: np.memmap 배열} (저장된 데이터가 없으면 길이 0 배열)
+        """
+        series_dir = self._series_dir(exchange, ticker, interval)
+        row_count = self._row_count(series_dir) if os.path.isdir(series_dir) else 0
+        if row_count == 0:
+            return {column: np.empty(0, dtype=dtype) for column, dtype in CANDLE_COLUMNS.items()}
+
+        columns = {
+            column: np.memmap(self._column_path(series_dir, column), dtype=dtype, mode='r', shape=(row_count,))
+            for column, dtype in CANDLE_COLUMNS.items()
+        }
+
+        timestamps = columns["timestamp_ms"]
+        start = 0 if start_ms is None else int(np.searchsorted(timestamps, start_ms, side='left'))
+        end = row_count if end_ms is None else int(np.searchsorted(timestamps, end_ms, side='left'))
+        return {column: values[start:end] for column, values in columns.items()}
+
+    def get_range(self, exchange: str, ticker: str, interval: str):
+        """저장된 첫/마지막 캔들 시각 (ms). 데이터가 없으면 (None, None)"""
+        timestamps = self.read(exchange, ticker, interval)["timestamp_ms"]
+        if len(timestamps) == 0:
+            return None, None
+        return int(timestamps[0]), int(timestamps[-1])
+
+    def append(self, exchange: str, ticker: str, interval: str, rows: dict) -> int:
+        """
+        마지막 저장 시각 이후의 캔들만 파일 끝에 이어 씁니다.
+
+        :param rows: {컬럼명: 배열} (시각 오름차순)
+        :return: 실제로 추가된 행 수
+        """
+        series_dir = self._series_dir(exchange, ticker, interval)
+        os.makedirs(series_dir, exist_ok=True)
+        with self._write_lock:
+            self._repair_torn_write(series_dir)
+            _, last_ms = self.get_range(exchange, ticker, interval)
+
+            timestamps = np.asarray(rows["timestamp_ms"], dtype=np.int64)
+            mask = timestamps > last_ms if last_ms is not None else np.ones(len(timestamps), dtype=bool)
+            if not mask.any():
+                return 0
+
+            for column, dtype in CANDLE_COLUMNS.items():
+                with open(self._column_path(series_dir, column), 'ab') as f:
+                    f.write(np.asarray(rows[column], dtype=dtype)[mask].tobytes())
+            return int(mask.sum())
+
+    def prepend(self, exchange: str, ticker: str, interval: str, rows: dict) -> int:
+        """
+        첫 저장 시각 이전의 과거 캔들을 앞에 붙입니다. (임시 파일에 다시 쓴 뒤 교체)
+
+        :return: 실제로 추가된 행 수
+        """
+        series_dir = self._series_dir(exchange, ticker, interval)
+        os.makedirs(series_dir, exist_ok=True)
+        with self._write_lock:
+            self._repair_torn_write(series_dir)
+            return self._prepend_locked(exchange, ticker, interval, series_dir, rows)
+
+    def _prepend_locked(self, exchange: str, ticker: str, interval: str, series_dir: str, rows: dict) -> int:
+        existing = self.read(exchange, ticker, interval)
+        first_ms = int(existing["timestamp_ms"][0]) if len(existing["timestamp_ms"]) else None
+
+        timestamps = np.asarray(rows["timestamp_ms"], dtype=np.int64)
+        mask = timestamps < first_ms if first_ms is not None else np.ones(len(timestamps), dtype=bool)
+        if not mask.any():
+            return 0
+
+        # 모든 컬럼의 임시 파일을 먼저 완성한 뒤 교체하여, 중단되어도 기존 데이터는 보존
+        temp_paths = {}
+        for column, dtype in CANDLE_COLUMNS.items():
+            temp_path = self._column_path(series_dir, column) + ".tmp"
+            with open(temp_path, 'wb') as f:
+                f.write(np.asarray(rows[column], dtype=dtype)[mask].tobytes())
+                f.write(np.asarray(existing[column], dtype=dtype).tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            temp_paths[column] = temp_path
+        del existing # memmap 해제 후 교체
+
+        for column, temp_path in temp_paths.items():
+            os.replace(temp_path, self._column_path(series_dir, column))
+        return int(mask.sum())
+
+
+def upbit_candles_to_rows(candles) -> dict:
+    """Upbit 캔들 API 응답(내림차순)을 시각 오름차순 컬럼 dict로 변환합니다."""
+    candles = sorted(candles, key=lambda c: c["candle_date_time_utc"])
+    return {
+        "timestamp_ms": np.array([_utc_text_to_ms(c["candle_date_time_utc"]) for c in candles], dtype=np.int64),
+        "open": np.array([c["opening_price"] for c in candles], dtype=np.float64),
+        "high": np.array([c["high_price"] for c in candles], dtype=np.float64),
+        "low": np.array([c["low_price"] for c in candles], dtype=np.float64),
+        "close": np.array([c["trade_price"] for c in candles], dtype=np.float64),
+        "volume": np.array([c["candle_acc_trade_volume"] for c in candles], dtype=np.float64),
+        "value": np.array([c["candle_acc_trade_price"] for c in candles], dtype=np.float64),
+    }
+
+
+def _complete_rows(candles, current_open_ms: int) -> dict:
+    """진행 중인 캔들을 빼고 페이지 경계에서 중복된 캔들을 제거한 시각 오름차순 컬럼 dict"""
+    rows = upbit_candles_to_rows(candles)
+    complete = rows["timestamp_ms"] < current_open_ms
+    rows = {column: values[complete] for column, values in rows.items()}
+    _, unique_index = np.unique(rows["timestamp_ms"], return_index=True)
+    return {column: values[unique_index] for column, values in rows.items()}
+
+
+def candle_open_ms(interval: str, timestamp_ms: int) -> int:
+    """
+    timestamp_ms가 속한 캔들의 시작 시각 (ms)
+    주/월 캔들은 고정 길이가 아니고 epoch(목요일)과 경계도 맞지 않으므로 KST 달력 기준으로 계산합니다.
+    """
+    if interval not in ("week", "month"):
+        return timestamp_ms // INTERVAL_MS[interval] * INTERVAL_MS[interval]
+
+    # 일 캔들 시작 시각(KST 09:00)을 자정으로 옮겨 '캔들 기준 날짜'를 구함
+    moment = datetime.datetime.fromtimestamp(timestamp_ms / 1000, tz=KST) - datetime.timedelta(hours=CANDLE_DAY_START_HOUR_KST)
+    day = moment.date()
+    if interval == "week":
+        day -= datetime.timedelta(days=day.weekday())
+    else:
+        day = day.replace(day=1)
+    start = datetime.datetime(day.year, day.month, day.day, CANDLE_DAY_START_HOUR_KST, tzinfo=KST)
+    return int(start.timestamp() * 1000)
+
+
+def _utc_text_to_ms(text: str) -> int:
+    dt_object = datetime.datetime.strptime(text[:19], "%Y-%m-%dT%H:%M:%S").replace(tzinfo=datetime.timezone.utc)
+    return int(dt_object.timestamp() * 1000)
+
+
+def _ms_to_utc_text(timestamp_ms: int) -> str:
+    return datetime.datetime.fromtimestamp(timestamp_ms / 1000, tz=datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class UpbitCandleSync:
+    """업비트 캔들 API로 CandleStore를 증분 동기화 / 과거 데이터 백필합니다."""
+
+    EXCHANGE = "upbit"
+
+    def __init__(self, upbit_api, store: CandleStore = None):
+        self.upbit_api = upbit_api
+        self.store = store or CandleStore()
+
+    def sync(self, ticker: str, interval: str = "minute1", max_pages: int = None) -> int:
+        """
+        마지막 저장 시각 이후의 '완성된' 캔들을 내려받아 추가합니다.
+
+        저장된 데이터가 있으면 마지막 저장 시각부터 앞으로(현재 방향으로) 페이지 단위로 받아 바로 이어 쓰므로,
+        max_pages에서 멈춰도 중간이 비지 않고 다음 sync가 이어서 받습니다.
+        저장소가 비어 있으면 최신 캔들부터 max_pages만큼만 받습니다. (그 이전은 backfill로 채움)
+
+        :return: 추가된 캔들 수
+        """
+        max_pages = max_pages or settings.CANDLE_SYNC_MAX_PAGES
+        _, last_ms = self.store.get_range(self.EXCHANGE, ticker, interval)
+        # 아직 진행 중인 캔들은 값이 바뀌므로 저장하지 않음
+        current_open_ms = candle_open_ms(interval, int(time.time() * 1000))
+
+        if last_ms is None:
+            added = self._sync_latest(ticker, interval, max_pages, current_open_ms)
+        else:
+            added = self._sync_forward(ticker, interval, max_pages, last_ms, current_open_ms)
+        logger.info(f"[SUCCESS] {ticker} {interval} 캔들 {added}개 동기화")
+        return added
+
+    def _sync_forward(self, ticker: str, interval: str, max_pages: int, last_ms: int, current_open_ms: int) -> int:
+        """last_ms 다음 캔들부터 CANDLE_PAGE_SIZE개 구간씩 오래된 순서로 받아 이어 씁니다."""
+        interval_ms = INTERVAL_MS[interval]
+        added = 0
+        covered_ms = last_ms # 이 시각의 캔들까지는 저장되었거나 거래가 없어 빈 구간임이 확인됨
+        for _ in range(max_pages):
+            if covered_ms + interval_ms >= current_open_ms:
+                return added # 완성된 캔들을 모두 받음
+
+            # to 이전(미포함) 캔들 최대 CANDLE_PAGE_SIZE개 -> [covered_ms + 1주기, to) 구간
+            to_ms = min(covered_ms + interval_ms * (CANDLE_PAGE_SIZE + 1), current_open_ms)
+            candles = self.upbit_api.get_candles(ticker, interval, count=CANDLE_PAGE_SIZE, to=_ms_to_utc_text(to_ms))
+            if candles is None:
+                logger.error(f"[CANDLE] {ticker} {interval} 캔들 조회 실패. {_ms_to_utc_text(covered_ms)} 이후는 다음 동기화에서 재시도")
+                return added
+
+            if candles:
+                oldest_ms = min(_utc_text_to_ms(c["candle_date_time_utc"]) for c in candles)
+                if len(candles) >= CANDLE_PAGE_SIZE and oldest_ms > covered_ms + interval_ms:
+                    # 한 페이지에 다 담기지 않는 구간 (월봉 근사 등) -> 이어 쓰면 중간이 비므로 중단
+                    logger.error(f"[CANDLE] {ticker} {interval} {_ms_to_utc_text(covered_ms)} ~ {_ms_to_utc_text(oldest_ms)} "
+                                 f"구간을 한 페이지로 받지 못해 추가하지 않습니다.")
+                    return added
+                added += self.store.append(self.EXCHANGE, ticker, interval, _complete_rows(candles, current_open_ms))
+            covered_ms = to_ms - interval_ms
+        return added
+
+    def _sync_latest(self, ticker: str, interval: str, max_pages: int, current_open_ms: int) -> int:
+        """빈 저장소: 최신 캔들부터 거꾸로 max_pages만큼 받아 한 번에 씁니다."""
+        collected = []
+        to = None
+        for _ in range(max_pages):
+            candles = self.upbit_api.get_candles(ticker, interval, count=CANDLE_PAGE_SIZE, to=to)
+            if not candles:
+                break
+            collected.extend(candles)
+            to = _ms_to_utc_text(min(_utc_text_to_ms(c["candle_date_time_utc"]) for c in candles))
+
+        if not collected:
+            return 0
+        return self.store.append(self.EXCHANGE, ticker, interval, _complete_rows(collected, current_open_ms))
+
+    def backfill(self, ticker: str, interval: str = "minute1", max_bars: int = 200_000) -> int:
+        """
+        저장된 첫 캔들 이전의 과거 데이터를 최대 max_bars개까지 페이지 단위로 거슬러 올라가며 채웁니다.
+
+        :return: 추가된 캔들 수
+        """
+        first_ms, _ = self.store.get_range(self.EXCHANGE, ticker, interval)
+        if first_ms is None:
+            self.sync(ticker, interval, max_pages=1)
+            first_ms, _ = self.store.get_range(self.EXCHANGE, ticker, interval)
+            if first_ms is None:
+                return 0
+
+        collected = []
+        to = _ms_to_utc_text(first_ms)
+        while len(collected) < max_bars:
+            candles = self.upbit_api.get_candles(ticker, interval, count=CANDLE_PAGE_SIZE, to=to)
+            if not candles:
+                break # 상장 시점까지 도달
+            collected.extend(candles)
+            to = _ms_to_utc_text(min(_utc_text_to_ms(c["candle_date_time_utc"]) for c in candles))
+
+        if not collected:
+            return 0
+
+        rows = upbit_candles_to_rows(collected)
+        _, unique_index = np.unique(rows["timestamp_ms"], return_index=True)
+        rows = {column: values[unique_index] for column, values in rows.items()}
+
+        added = self.store.prepend(self.EXCHANGE, ticker, interval, rows)
+        logger.info(f"[SUCCESS] {ticker} {interval} 과거 캔들 {added}개 백필")
+        return added
@@ -0,0 +1,412 @@
+# 파일명: storage/market_recorder.py
+import datetime
+import json
+import logging
+import os
+import struct
+import threading
+import time
+import zlib
+import numpy as np
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# 청크 헤더: 매직(4바이트) + 레코드 수(uint32) + 압축 전 길이(uint32) + 압축 후 길이(uint32) + 압축 본문 CRC32(uint32)
+CHUNK_MAGIC = b"MRC1"
+CHUNK_HEADER = struct.Struct("<4sIIII")
+# 압축 본문 앞부분: 키 테이블(JSON) 길이(uint32)
+KEY_TABLE_HEADER = struct.Struct("<I")
+FILE_SUFFIX = ".mrec"
+NO_TIMESTAMP = -1 # 거래소 타임스탬프가 없는 값 (REST 조회 결과 등)
+MS_PER_DAY = 86_400_000
+
+# fetch_all_data 결과 중 숫자 시세가 아닌 항목
+_SNAPSHOT_SKIP_KEYS = ('timestamp_ms', 'fx_age_sec', 'fx_source', 'failed_keys', 'orderbooks')
+_ORDERBOOK_FIELDS = ('ask_price', 'ask_size', 'bid_price', 'bid_size')
+
+
+def orderbook_key(code: str, field: str, level: int) -> str:
+    return f"orderbook:{code}:{field}:{level}"
+
+
+class MarketRecorder:
+    """
+    시세 값을 (로컬 시각 ms, 거래소 시각 ms, 키, 값) 레코드로 모아 압축 청크 단위로 파일 끝에 추가합니다.
+
+    - record()는 메모리 버퍼에 추가만 하고, 백그라운드 스레드가 RECORDER_FLUSH_INTERVAL_SEC마다
+      (또는 RECORDER_CHUNK_RECORDS개가 쌓이면) 청크 하나로 압축하여 씁니다. (매매 루프는 디스크를 기다리지 않음)
+    - 파일은 로컬 시각(UTC) 기준 하루에 하나 (YYYYMMDD.mrec)이며, 청크는 날짜가 바뀌는 지점에서 나뉩니다.
+    - 청크 본문은 [키 테이블 JSON][로컬 시각 int64[n]][거래소 시각 int64[n]][키 번호 uint16[n]][값 float64[n]]을
+      zlib으로 압축한 것이고, 읽을 때는 numpy 배열로 바로 변환합니다.
+    - 키 형식: fetch_all_data 항목은 그대로 (예: "usdt_price"), 스트림 가격은 "거래소:심볼",
+      호가창은 "orderbook:마켓:필드:단계"
+    - 비정상 종료로 쓰다 만 마지막 청크는 다음에 같은 파일을 열 때 잘라냅니다.
+    """
+
+    def __init__(self, root_dir: str = None, chunk_records: int = None, flush_interval_sec: float = None,
+                 compress_level: int = None):
+        self.root_dir = root_dir or settings.RECORDER_DIR
+        self.chunk_records = chunk_records or settings.RECORDER_CHUNK_RECORDS
+        self.flush_interval_sec = settings.RECORDER_FLUSH_INTERVAL_SEC if flush_interval_sec is None else flush_interval_sec
+        self.compress_level = settings.RECORDER_COMPRESS_LEVEL if compress_level is None else compress_level
+
+        self._buffer = [] # (로컬 시각 ms, 거래소 시각 ms, 키, 값)
+        self._buffer_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._file = None
+        self._file_day = None
+        self._wakeup = threading.Event()
+        self._running = False
+        self._thread = None
+        self.records_written = 0
+
+    def start(self):
+        os.makedirs(self.root_dir, exist_ok=True)
+        self._running = True
+        self._thread = threading.Thread(target=self._flush_loop, name="market-recorder", daemon=True)
+        self._thread.start()
+        logger.info(f"✅ MarketRecorder 초기화 완료 ({self.root_dir})")
+        return self
+
+    # ---------------------------------------------------------
+    # 기록
+    # ---------------------------------------------------------
+    def record(self, key: str, value: float, exchange_ts_ms: int = None, local_ts_ms: int = None):
+        if local_ts_ms is None:
+            local_ts_ms = int(time.time() * 1000)
+        self._extend([(local_ts_ms, NO_TIMESTAMP if exchange_ts_ms is None else int(exchange_ts_ms), key, float(value))])
+
+    def record_snapshot(self, data: dict):
+        """
+        fetch_all_data 결과의 숫자 항목과 호가창(상위 RECORDER_ORDERBOOK_LEVELS단계)을 기록합니다.
+        환율은 조회 후 경과 시간으로 환산한 조회 시각을 거래소 시각으로 남깁니다.
+        """
+        local_ts_ms = data.get('timestamp_ms')
+        if local_ts_ms is None:
+            local_ts_ms = int(time.time() * 1000)
+        fx_age_sec = data.get('fx_age_sec')
+
+        entries = []
+        for key, value in data.items():
+            if key in _SNAPSHOT_SKIP_KEYS or value is None or isinstance(value, (str, bool)):
+                continue
+            exchange_ts_ms = NO_TIMESTAMP
+            if key == 'usdt_krw_price' and fx_age_sec is not None:
+                exchange_ts_ms = local_ts_ms - int(fx_age_sec * 1000)
+            entries.append((local_ts_ms, exchange_ts_ms, key, float(value)))
+
+        levels = settings.RECORDER_ORDERBOOK_LEVELS
+        if levels > 0:
+            for code, book in (data.get('orderbooks') or {}).items():
+                entries.extend(_orderbook_entries(code, book, levels, local_ts_ms))
+        self._extend(entries)
+
+    def record_orderbook(self, book, local_ts_ms: int = None, levels: int = None):
+        if local_ts_ms is None:
+            local_ts_ms = int(time.time() * 1000)
+        self._extend(_orderbook_entries(book.code, book, levels or settings.RECORDER_ORDERBOOK_LEVELS, local_ts_ms))
+
+    def _extend(self, entries: list):
+        with self._buffer_lock:
+            self._buffer.extend(entries)
+            full = len(self._buffer) >= self.chunk_records
+        if full:
+            self._wakeup.set() # 청크 크기만큼 쌓였으면 주기를 기다리지 않고 쓰기
+
+    # ---------------------------------------------------------
+    # 쓰기
+    # ---------------------------------------------------------
+    def _flush_loop(self):
+        while self._running:
+            self._wakeup.wait(self.flush_interval_sec)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"시세 기록 중 오류: {e}")
+
+    def flush(self):
+        """버퍼의 레코드를 날짜별 청크로 압축하여 씁니다."""
+        with self._buffer_lock:
+            entries, self._buffer = self._buffer, []
+        if not entries:
+            return
+
+        with self._write_lock:
+            start = 0
+            while start < len(entries):
+                day_index = entries[start][0] // MS_PER_DAY
+                end = start + 1
+                while end < len(entries) and entries[end][0] // MS_PER_DAY == day_index:
+                    end += 1
+                day = _utc_day(entries[start][0])
+                for chunk_start in range(start, end, self.chunk_records):
+                    self._write_chunk(day, entries[chunk_start:min(end, chunk_start + self.chunk_records)])
+                start = end
+            self._file.flush()
+
+    def _write_chunk(self, day: str, entries: list):
+        if self._file_day != day:
+            self._open_day(day)
+
+        key_index = {}
+        indexes = np.empty(len(entries), dtype=np.uint16)
+        for position, entry in enumerate(entries):
+            index = key_index.get(entry[2])
+            if index is None:
+                index = key_index[entry[2]] = len(key_index)
+            indexes[position] = index
+
+        key_table = json.dumps(list(key_index), separators=(',', ':')).encode('utf-8')
+        payload = b"".join((
+            KEY_TABLE_HEADER.pack(len(key_table)), key_table,
+            np.fromiter((entry[0] for entry in entries), dtype=np.int64, count=len(entries)).tobytes(),
+            np.fromiter((entry[1] for entry in entries), dtype=np.int64, count=len(entries)).tobytes(),
+            indexes.tobytes(),
+            np.fromiter((entry[3] for entry in entries), dtype=np.float64, count=len(entries)).tobytes(),
+        ))
+        body = zlib.compress(payload, self.compress_level)
+        self._file.write(CHUNK_HEADER.pack(CHUNK_MAGIC, len(entries), len(payload), len(body), zlib.crc32(body)) + body)
+        self.records_written += len(entries)
+
+    def _open_day(self, day: str):
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+        path = os.path.join(self.root_dir, day + FILE_SUFFIX)
+        _truncate_torn_tail(path)
+        self._file = open(path, 'ab')
+        self._file_day = day
+
+    def close(self):
+        """남은 버퍼를 쓰고 파일을 닫습니다."""
+        self._running = False
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+        with self._write_lock:
+            if self._file is not None:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self._file.close()
+                self._file = None
+                self._file_day = None
+
+
+class MarketRecordReader:
+    """MarketRecorder가 쓴 파일을 날짜 순서대로 읽습니다."""
+
+    def __init__(self, root_dir: str = None):
+        self.root_dir = root_dir or settings.RECORDER_DIR
+
+    def files(self, start_ms: int = None, end_ms: int = None) -> list:
+        """구간과 겹치는 날짜 파일 경로 (날짜 순)"""
+        if not os.path.isdir(self.root_dir):
+            return []
+        first_day = _utc_day(start_ms) if start_ms is not None else None
+        last_day = _utc_day(end_ms) if end_ms is not None else None
+        paths = []
+        for name in sorted(os.listdir(self.root_dir)):
+            if not name.endswith(FILE_SUFFIX):
+                continue
+            day = name[:-len(FILE_SUFFIX)]
+            if (first_day is None or day >= first_day) and (last_day is None or day <= last_day):
+                paths.append(os.path.join(self.root_dir, name))
+        return paths
+
+    def iter_chunks(self, start_ms: int = None, end_ms: int = None):
+        """
+        청크 단위로 배열을 반환합니다. (구간 밖의 레코드는 제외)
+
+        :return: (키 테이블 list, 로컬 시각 int64[n], 거래소 시각 int64[n], 키 번호 uint16[n], 값 float64[n]) 제너레이터
+        """
+        for path in self.files(start_ms, end_ms):
+            for keys, local_ts, exchange_ts, key_indexes, values in _read_chunks(path):
+                if start_ms is not None or end_ms is not None:
+                    mask = np.ones(len(local_ts), dtype=bool)
+                    if start_ms is not None:
+                        mask &= local_ts >= start_ms
+                    if end_ms is not None:
+                        mask &= local_ts <= end_ms
+                    if not mask.all():
+                        local_ts, exchange_ts, key_indexes, values = \
+                            local_ts[mask], exchange_ts[mask], key_indexes[mask], values[mask]
+                if len(local_ts):
+                    yield keys, local_ts, exchange_ts, key_indexes, values
+
+    def records(self, keys=None, start_ms: int = None, end_ms: int = None):
+        """
+        (로컬 시각 ms, 거래소 시각 ms 또는 None, 키, 값) 레코드를 기록 순서대로 하나씩 반환합니다.
+
+        :param keys: 읽을 키 목록 (None이면 전체)
+        """
+        wanted = set(keys) if keys is not None else None
+        for chunk_keys, local_ts, exchange_ts, key_indexes, values in self.iter_chunks(start_ms, end_ms):
+            selected = None if wanted is None else {index for index, key in enumerate(chunk_keys) if key in wanted}
+            for local, exchange, index, value in zip(local_ts.tolist(), exchange_ts.tolist(),
+                                                     key_indexes.tolist(), values.tolist()):
+                if selected is None or index in selected:
+                    yield local, (None if exchange == NO_TIMESTAMP else exchange), chunk_keys[index], value
+
+    def load_arrays(self, keys=None, start_ms: int = None, end_ms: int = None) -> dict:
+        """
+        키별 numpy 배열로 읽습니다.
+
+        :return: {키: {'local_ts_ms': int64[n], 'exchange_ts_ms': int64[n] (없으면 -1), 'value': float64[n]}}
+        """
+        wanted = set(keys) if keys is not None else None
+        parts = {}
+        for chunk_keys, local_ts, exchange_ts, key_indexes, values in self.iter_chunks(start_ms, end_ms):
+            order = np.argsort(key_indexes, kind='stable')
+            sorted_indexes = key_indexes[order]
+            bounds = np.searchsorted(sorted_indexes, np.arange(len(chunk_keys) + 1))
+            for index, key in enumerate(chunk_keys):
+                if wanted is not None and key not in wanted:
+                    continue
+                rows = order[bounds[index]:bounds[index + 1]]
+                if len(rows):
+                    parts.setdefault(key, []).append((local_ts[rows], exchange_ts[rows], values[rows]))
+
+        arrays = {}
+        for key, chunks in parts.items():
+            arrays[key] = {
+                'local_ts_ms': np.concatenate([chunk[0] for chunk in chunks]),
+                'exchange_ts_ms': np.concatenate([chunk[1] for chunk in chunks]),
+                'value': np.concatenate([chunk[2] for chunk in chunks]),
+            }
+        return arrays
+
+    def to_columns(self, start_ms: int = None, end_ms: int = None) -> dict:
+        """
+        fetch_all_data 스냅샷 항목을 수집 시각별 행으로 펼친 백테스트/리플레이 컬럼 dict로 읽습니다.
+        (스트림/호가창 키는 제외, 해당 시각에 없는 값은 NaN)
+        """
+        arrays = {key: array for key, array in self.load_arrays(start_ms=start_ms, end_ms=end_ms).items()
+                  if ":" not in key}
+        if not arrays:
+            return {'timestamp_ms': np.empty(0, dtype=np.int64)}
+
+        timestamps = np.unique(np.concatenate([array['local_ts_ms'] for array in arrays.values()]))
+        columns = {'timestamp_ms': timestamps}
+        for key, array in arrays.items():
+            column = np.full(len(timestamps), np.nan)
+            column[np.searchsorted(timestamps, array['local_ts_ms'])] = array['value']
+            columns[key] = column
+        return columns
+
+    def load_orderbooks(self, code: str, start_ms: int = None, end_ms: int = None):
+        """
+        기록된 호가창을 MarketTimeline(backtest/replay.py)의 orderbooks 형식으로 읽습니다.
+
+        :return: (로컬 시각 int64[n], [OrderBook, ...])
+        """
+        from connectors.orderbook import OrderBook
+
+        prefix = f"orderbook:{code}:"
+        arrays = {key[len(prefix):]: array for key, array in self.load_arrays(start_ms=start_ms, end_ms=end_ms).items()
+                  if key.startswith(prefix)}
+        if not arrays:
+            return np.empty(0, dtype=np.int64), []
+
+        timestamps = np.unique(np.concatenate([array['local_ts_ms'] for array in arrays.values()]))
+        levels = {} # (field, level) -> 시각별 값
+        exchange_ts = np.full(len(timestamps), NO_TIMESTAMP, dtype=np.int64)
+        for name, array in arrays.items():
+            field, _, level = name.rpartition(":")
+            rows = np.searchsorted(timestamps, array['local_ts_ms'])
+            column = np.full(len(timestamps), np.nan)
+            column[rows] = array['value']
+            levels[(field, int(level))] = column
+            exchange_ts[rows] = array['exchange_ts_ms']
+
+        level_count = max(level for _, level in levels) + 1
+        empty = np.full(len(timestamps), np.nan)
+        books = []
+        for row in range(len(timestamps)):
+            asks, bids = [], []
+            for level in range(level_count):
+                ask_price = levels.get(('ask_price', level), empty)[row]
+                ask_size = levels.get(('ask_size', level), empty)[row]
+                bid_price = levels.get(('bid_price', level), empty)[row]
+                bid_size = levels.get(('bid_size', level), empty)[row]
+                if ask_price == ask_price and ask_size == ask_size:
+                    asks.append((ask_price, ask_size))
+                if bid_price == bid_price and bid_size == bid_size:
+                    bids.append((bid_price, bid_size))
+            timestamp_ms = int(exchange_ts[row]) if exchange_ts[row] != NO_TIMESTAMP else int(timestamps[row])
+            books.append(OrderBook(code, asks=asks, bids=bids, timestamp_ms=timestamp_ms))
+        return timestamps, books
+
+    def orderbook_codes(self, start_ms: int = None, end_ms: int = None) -> list:
+        """기록된 호가창의 마켓 목록"""
+        codes = set()
+        for chunk_keys, *_ in self.iter_chunks(start_ms, end_ms):
+            codes.update(key.split(":")[1] for key in chunk_keys if key.startswith("orderbook:"))
+        return sorted(codes)
+
+
+def _orderbook_entries(code: str, book, levels: int, local_ts_ms: int) -> list:
+    exchange_ts_ms = NO_TIMESTAMP if book.timestamp_ms is None else int(book.timestamp_ms)
+    entries = []
+    for field, values in zip(_ORDERBOOK_FIELDS, (book.ask_prices, book.ask_sizes, book.bid_prices, book.bid_sizes)):
+        for level, value in enumerate(values[:levels]):
+            entries.append((local_ts_ms, exchange_ts_ms, orderbook_key(code, field, level), float(value)))
+    return entries
+
+
+def _read_chunks(path: str):
+    """파일의 유효한 청크를 차례로 배열로 변환합니다. (손상된 청크를 만나면 중단)"""
+    with open(path, 'rb') as f:
+        buffer = f.read()
+
+    offset = 0
+    while offset + CHUNK_HEADER.size <= len(buffer):
+        magic, count, raw_length, length, crc = CHUNK_HEADER.unpack_from(buffer, offset)
+        body = buffer[offset + CHUNK_HEADER.size:offset + CHUNK_HEADER.size + length]
+        if magic != CHUNK_MAGIC or len(body) < length or zlib.crc32(body) != crc:
+            logger.warning(f"{path}: {offset}바이트 위치 이후의 손상된 청크를 건너뜁니다.")
+            return
+        offset += CHUNK_HEADER.size + length
+
+        payload = zlib.decompress(body)
+        (table_length,) = KEY_TABLE_HEADER.unpack_from(payload, 0)
+        position = KEY_TABLE_HEADER.size
+        keys = json.loads(payload[position:position + table_length].decode('utf-8'))
+        position += table_length
+        local_ts = np.frombuffer(payload, dtype=np.int64, count=count, offset=position)
+        position += count * 8
+        exchange_ts = np.frombuffer(payload, dtype=np.int64, count=count, offset=position)
+        position += count * 8
+        key_indexes = np.frombuffer(payload, dtype=np.uint16, count=count, offset=position)
+        position += count * 2
+        values = np.frombuffer(payload, dtype=np.float64, count=count, offset=position)
+        yield keys, local_ts, exchange_ts, key_indexes, values
+
+
+def _truncate_torn_tail(path: str):
+    """비정상 종료로 쓰다 만 마지막 청크를 잘라냅니다. (뒤에 이어 쓴 청크를 읽을 수 있도록)"""
+    if not os.path.exists(path):
+        return
+    with open(path, 'rb') as f:
+        buffer = f.read()
+
+    offset = 0
+    while offset + CHUNK_HEADER.size <= len(buffer):
+        magic, _, _, length, crc = CHUNK_HEADER.unpack_from(buffer, offset)
+        body = buffer[offset + CHUNK_HEADER.size:offset + CHUNK_HEADER.size + length]
+        if magic != CHUNK_MAGIC or len(body) < length or zlib.crc32(body) != crc:
+            break
+        offset += CHUNK_HEADER.size + length
+
+    if offset < len(buffer):
+        logger.warning(f"{path} 끝의 손상된 청크 {len(buffer) - offset}바이트를 버립니다.")
+        with open(path, 'r+b') as f:
+            f.truncate(offset)
+
+
+def _utc_day(timestamp_ms: int) -> str:
+    return datetime.datetime.fromtimestamp(timestamp_ms / 1000, tz=datetime.timezone.utc).strftime("%Y%m%d")
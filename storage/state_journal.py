@@ -0,0 +1,243 @@
+# 파일명: storage/state_journal.py
+import json
+import logging
+import os
+import struct
+import threading
+import time
+import zlib
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# 저널 레코드 헤더: 본문 길이(uint32) + 본문 CRC32(uint32), 리틀 엔디언
+RECORD_HEADER = struct.Struct("<II")
+SNAPSHOT_FILE = "snapshot.json"
+JOURNAL_FILE = "journal.log"
+
+
+class StateJournal:
+    """
+    전략 상태를 추가 전용(append-only) 저널과 주기적 스냅샷으로 디스크에 보관합니다.
+
+    - 상태가 바뀔 때마다 {seq, name, state} 레코드를 [길이][CRC32][JSON] 형식으로 저널 끝에 씁니다.
+    - fsync는 STATE_FSYNC_INTERVAL_SEC 단위로 묶어서 하고, 주문 직후처럼 유실되면 안 되는
+      상태는 durable=True로 즉시 fsync합니다.
+    - 레코드가 STATE_COMPACT_EVERY_RECORDS개 쌓이면 최신 상태만 스냅샷으로 원자적으로 교체하고
+      저널을 비웁니다.
+    - 시작 시 스냅샷 + (스냅샷 이후 seq의) 저널 레코드를 재생해 복원하며, kill -9 등으로 쓰다 만
+      마지막 레코드(길이 부족/CRC 불일치)는 버리고 그 위치에서 저널을 잘라냅니다.
+    """
+
+    def __init__(self, root_dir: str = None, fsync_interval_sec: float = None, compact_every: int = None):
+        self.root_dir = root_dir or settings.STATE_DIR
+        self.fsync_interval_sec = settings.STATE_FSYNC_INTERVAL_SEC if fsync_interval_sec is None else fsync_interval_sec
+        self.compact_every = compact_every or settings.STATE_COMPACT_EVERY_RECORDS
+        self.snapshot_path = os.path.join(self.root_dir, SNAPSHOT_FILE)
+        self.journal_path = os.path.join(self.root_dir, JOURNAL_FILE)
+
+        self._lock = threading.Lock()
+        self._states = {}          # 전략 이름 -> 마지막으로 기록된 상태
+        self._seq = 0              # 마지막으로 기록된 레코드 번호
+        self._journal_records = 0  # 현재 저널 파일의 레코드 수
+        self._journal = None
+        self._dirty = False        # 쓰기 후 아직 fsync하지 않은 레코드가 있는지
+        self._last_fsync = 0.0
+
+    # ---------------------------------------------------------
+    # 열기 / 복구
+    # ---------------------------------------------------------
+    def open(self):
+        """스냅샷과 저널을 읽어 상태를 복원하고 저널을 추가 모드로 엽니다."""
+        os.makedirs(self.root_dir, exist_ok=True)
+        started = time.time()
+
+        snapshot_seq = self._load_snapshot()
+        replayed = self._replay_journal(snapshot_seq)
+
+        self._journal = open(self.journal_path, 'ab')
+        self._last_fsync = time.time()
+        elapsed_ms = (time.time() - started) * 1000
+        logger.info(f"✅ 전략 상태 저장소 초기화 완료 (전략 {len(self._states)}개, 저널 재생 {replayed}건, {elapsed_ms:.1f}ms)")
+        return self
+
+    def _load_snapshot(self) -> int:
+        if not os.path.exists(self.snapshot_path):
+            return 0
+        try:
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError) as e:
+            # 스냅샷은 항상 임시 파일 + os.replace로 교체되므로 정상적으로는 발생하지 않음
+            logger.error(f"상태 스냅샷을 읽을 수 없습니다 ({self.snapshot_path}): {e}")
+            return 0
+
+        self._states = snapshot.get('states', {})
+        self._seq = snapshot.get('seq', 0)
+        return self._seq
+
+    def _replay_journal(self, snapshot_seq: int) -> int:
+        if not os.path.exists(self.journal_path):
+            return 0
+
+        with open(self.journal_path, 'rb') as f:
+            buffer = f.read()
+
+        offset = 0
+        replayed = 0
+        while offset + RECORD_HEADER.size <= len(buffer):
+            length, crc = RECORD_HEADER.unpack_from(buffer, offset)
+            body = buffer[offset + RECORD_HEADER.size:offset + RECORD_HEADER.size + length]
+            if len(body) < length or zlib.crc32(body) != crc:
+                break
+            try:
+                record = json.loads(body.decode('utf-8'))
+            except ValueError:
+                break
+
+            offset += RECORD_HEADER.size + length
+            self._journal_records += 1
+            # 스냅샷에 이미 반영된 레코드는 건너뜀 (스냅샷 교체 직후 저널 비우기 전에 중단된 경우)
+            if record['seq'] > snapshot_seq:
+                self._states[record['name']] = record['state']
+                self._seq = record['seq']
+                replayed += 1
+
+        if offset < len(buffer):
+            logger.warning(f"상태 저널 끝의 손상된 레코드 {len(buffer) - offset}바이트를 버립니다.")
+            with open(self.journal_path, 'r+b') as f:
+                f.truncate(offset)
+                f.flush()
+                os.fsync(f.fileno())
+        return replayed
+
+    # ---------------------------------------------------------
+    # 조회 / 기록
+    # ---------------------------------------------------------
+    def get(self, name: str):
+        """전략 이름으로 마지막 저장 상태를 반환합니다. (없으면 None)"""
+        with self._lock:
+            state = self._states.get(name)
+            return dict(state) if state is not None else None
+
+    def record(self, name: str, state: dict, durable: bool = False) -> bool:
+        """
+        상태가 마지막 기록과 다를 때만 저널에 추가합니다.
+
+        :param durable: True이면 이번 레코드까지 즉시 fsync (주문 직후 등)
+        :return: 새 레코드를 썼는지 여부
+        """
+        with self._lock:
+            if self._states.get(name) == state:
+                if durable:
+                    self._fsync_locked()
+                return False
+
+            self._seq += 1
+            body = json.dumps({'seq': self._seq, 'name': name, 'state': state, 'ts': time.time()},
+                              ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            self._journal.write(RECORD_HEADER.pack(len(body), zlib.crc32(body)) + body)
+            self._states[name] = dict(state)
+            self._journal_records += 1
+            self._dirty = True
+
+            if durable or time.time() - self._last_fsync >= self.fsync_interval_sec:
+                self._fsync_locked()
+            if self._journal_records >= self.compact_every:
+                self._compact_locked()
+            return True
+
+    def flush(self):
+        """아직 fsync하지 않은 레코드를 디스크에 반영합니다."""
+        with self._lock:
+            self._fsync_locked()
+
+    def _fsync_locked(self):
+        if not self._dirty:
+            return
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+        self._dirty = False
+        self._last_fsync = time.time()
+
+    # ---------------------------------------------------------
+    # 스냅샷 압축
+    # ---------------------------------------------------------
+    def compact(self):
+        """현재 상태 전체를 스냅샷으로 저장하고 저널을 비웁니다."""
+        with self._lock:
+            self._compact_locked()
+
+    def _compact_locked(self):
+        self._fsync_locked()
+
+        # 1. 스냅샷을 임시 파일에 완성한 뒤 원자적으로 교체
+        temp_path = self.snapshot_path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'seq': self._seq, 'states': self._states, 'ts': time.time()}, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.snapshot_path)
+        self._fsync_dir()
+
+        # 2. 저널 비우기 (여기서 중단되어도 seq가 스냅샷 이하인 레코드는 재생 시 무시됨)
+        self._journal.close()
+        self._journal = open(self.journal_path, 'wb')
+        os.fsync(self._journal.fileno())
+        self._journal_records = 0
+
+    def _fsync_dir(self):
+        """파일 교체(rename) 자체를 디스크에 반영합니다. (디렉터리 fsync를 지원하지 않는 OS는 무시)"""
+        try:
+            dir_fd = os.open(self.root_dir, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(dir_fd)
+        except OSError:
+            pass
+        finally:
+            os.close(dir_fd)
+
+    def close(self):
+        """남은 레코드를 fsync하고 스냅샷으로 압축한 뒤 닫습니다."""
+        with self._lock:
+            if self._journal is None:
+                return
+            self._compact_locked()
+            self._journal.close()
+            self._journal = None
+
+
+class StrategyStateStore:
+    """StateJournal 위에서 전략 객체의 get_state()/restore_state()를 이름 기준으로 저장/복원합니다."""
+
+    def __init__(self, journal: StateJournal = None):
+        self.journal = journal or StateJournal()
+
+    def open(self):
+        self.journal.open()
+        return self
+
+    def restore(self, strategy) -> bool:
+        """저장된 상태가 있으면 전략에 복원합니다."""
+        state = self.journal.get(strategy.name)
+        if state is None:
+            return False
+        strategy.restore_state(state)
+        logger.info(f"[SUCCESS] {strategy.name} 상태 복원: {state}")
+        return True
+
+    def save(self, strategy, durable: bool = False) -> bool:
+        """전략의 현재 상태가 바뀌었으면 저널에 기록합니다."""
+        try:
+            return self.journal.record(strategy.name, strategy.get_state(), durable=durable)
+        except (OSError, TypeError, ValueError) as e:
+            logger.error(f"{strategy.name} 상태 저장 실패: {e}")
+            return False
+
+    def flush(self):
+        self.journal.flush()
+
+    def close(self):
+        self.journal.close()
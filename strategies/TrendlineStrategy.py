@@ -1,7 +1,7 @@
 # 파일명: strategies/TrendlineStrategy.py
-import time
-from math import floor
+from core.market_snapshot import USDT_KRW_PRICE, field_slot, price_field
 from strategies.base_strategy import BaseStrategy
+from strategies.level_ladder import LevelLadder, TRIGGER_BELOW, TRIGGER_ABOVE
 from config import settings
 
 class TrendlineStrategy(BaseStrategy):
@@ -9,10 +9,16 @@ class TrendlineStrategy(BaseStrategy):
     수동 지정한 빗각(추세선)을 이용해 분할 매수 및 매도 신호를 생성하는 범용 전략입니다.
     매수 트렌드 라인과 매도 트렌드 라인을 각각 독립적으로 운영합니다.
     """
+
+    STATE_FIELDS = ('current_krw_spent', 'max_holdings', 'last_sell_step_index', 'avg_buy_price', 'is_buying_disabled')
     
-    def __init__(self, strategy_config: dict):
-        super().__init__(strategy_config)
-        print(f"✅ {self.name} 전략 초기화 완료 (심볼: {self.symbol})")
+    def __init__(self, strategy_config: dict, clock=None):
+        super().__init__(strategy_config, clock)
+        self.logger.info(f"✅ {self.name} 전략 초기화 완료 (심볼: {self.symbol})")
+
+        # 시장 데이터 필드는 생성 시 한 번만 슬롯 번호로 변환 (틱마다 키 문자열을 만들지 않음)
+        self.price_key = price_field(self.symbol)
+        self.price_slot = field_slot(self.price_key)
         
         # =========================================================
         # 1. 매수(Buy) 트렌드 라인 설정
@@ -28,7 +34,8 @@ class TrendlineStrategy(BaseStrategy):
         else:
             self.buy_slope = 0
             
-        self.buy_levels = self.params['BUY_LEVELS']
+        # 편차 이하로 내려가면 발동하는 매수 사다리 (초기화 시 한 번만 정렬/검증)
+        self.buy_ladder = LevelLadder(self.params['BUY_LEVELS'], TRIGGER_BELOW, name=f"{self.name} BUY_LEVELS")
         self.total_seed_krw = self.params['TOTAL_TRADE_SEED_KRW']
         
         # =========================================================
@@ -47,8 +54,8 @@ class TrendlineStrategy(BaseStrategy):
         else:
             self.sell_slope = 0
 
-        raw_sell_plan = self.params.get('SELL_PLAN', [])
-        self.sell_plan = sorted(raw_sell_plan, key=lambda x: x[0])
+        # 편차 이상으로 올라가면 발동하는 분할 매도 사다리
+        self.sell_ladder = LevelLadder(self.params.get('SELL_PLAN', []), TRIGGER_ABOVE, name=f"{self.name} SELL_PLAN")
         self.sell_stop_loss_ratio = self.params.get('SELL_STOP_LOSS_RATIO', -100.0)
 
         # =========================================================
@@ -60,6 +67,43 @@ class TrendlineStrategy(BaseStrategy):
         self.avg_buy_price = 0.0        # [추가] 평단가 추적 (USD 기준)
         self.is_buying_disabled = False
 
+    def get_trigger_key(self):
+        return self.price_key
+
+    def get_trigger_bounds(self, current_data: dict):
+        """현재가 바로 아래/위의 매수 레벨, 매도 플랜, 이탈선, 손절 가격을 트리거 구간으로 반환합니다."""
+        current_price_usd = current_data.get(self.price_slot)
+        if current_price_usd is None:
+            return None
+
+        current_time_ms = self.now_ms(current_data)
+        buy_trend_price = self._calculate_trendline_price(current_time_ms, self.buy_slope, self.buy_t1, self.buy_p1)
+        sell_trend_price = self._calculate_trendline_price(current_time_ms, self.sell_slope, self.sell_t1, self.sell_p1)
+
+        # 각 사다리에서 현재 편차 바로 아래/위 레벨만 가격으로 환산
+        buy_deviation = (current_price_usd - buy_trend_price) / buy_trend_price * 100.0
+        sell_deviation = (current_price_usd - sell_trend_price) / sell_trend_price * 100.0
+        trigger_prices = [sell_trend_price]
+        for level in self.buy_ladder.bounds(buy_deviation):
+            if level is not None:
+                trigger_prices.append(buy_trend_price * (1 + level / 100.0))
+        for level in self.sell_ladder.bounds(sell_deviation):
+            if level is not None:
+                trigger_prices.append(sell_trend_price * (1 + level / 100.0))
+        if self.avg_buy_price > 0:
+            trigger_prices.append(self.avg_buy_price * (1 + self.sell_stop_loss_ratio / 100.0))
+
+        return self._nearest_bounds(current_price_usd, trigger_prices)
+
+    def batch_keys(self, columns: dict):
+        from strategies.batch_bands import trendline_band_keys
+        return trendline_band_keys(self, columns)
+
+    def next_batch_candidate(self, columns: dict, start: int, stop: int, krw_balance: float, symbol_balance: float) -> int:
+        # 밴드 키 구간 안에서는 손절 도달만 판단을 바꿈
+        from strategies.batch_bands import first_stop_loss_row
+        return first_stop_loss_row(self, columns, start, stop)
+
     def _is_valid_time(self, current_time_ms: int, valid_end_ms: int) -> bool:
         if current_time_ms >= valid_end_ms:
             return False
@@ -76,31 +120,32 @@ class TrendlineStrategy(BaseStrategy):
         
         deviation_percent = (current_price_usd - price_trend) / price_trend * 100.0
         
-        # [수정] 오름차순 정렬 (낮은 편차부터 체크)
-        sorted_levels = sorted(self.buy_levels, key=lambda x: x[0], reverse=False)
-
-        for deviation_level, target_ratio in sorted_levels:
-            if deviation_percent <= deviation_level:
-                target_krw_amount = self.total_seed_krw * (target_ratio / 100.0)
-                needed_krw = target_krw_amount - self.current_krw_spent
-
-                if needed_krw > settings.MIN_TRADE_KRW_AMOUNT:
-                    
-                    if getattr(settings, 'IS_SIMULATION', False):
-                        final_krw_amount = needed_krw
-                    else:
-                        final_krw_amount = min(needed_krw, krw_balance)
-
-                    if final_krw_amount > settings.MIN_TRADE_KRW_AMOUNT:
-                        print(f"  @매수 신호@ 편차 {deviation_level}% 이하 ({deviation_percent:.2f}%). 목표 {target_ratio}%. 주문액: {final_krw_amount:,.0f} KRW")
-                        return final_krw_amount
-                    else:
-                        # 잔고 부족 등으로 실제 주문 가능 금액이 적을 때
-                        print(f"  [SKIP] 매수 조건 만족했으나 KRW 잔고 부족. (주문가능액: {final_krw_amount:,.0f} < 최소주문액)")
-                else:
-                    # 이미 목표 비중만큼 매수했을 때
-                    print(f"  [SKIP] 이미 목표 비중({target_ratio}%) 달성 완료. (추가 매수 불필요)")
-                    pass        
+        # 발동한 레벨 중 목표 비중이 가장 큰(가장 깊은) 레벨만 확인하면 충분함
+        # (더 얕은 레벨은 목표 비중이 작아 추가 매수액이 더 적으므로 결과가 바뀌지 않음)
+        level_index = self.buy_ladder.deepest_triggered(deviation_percent)
+        if level_index is None:
+            return 0
+
+        deviation_level, target_ratio = self.buy_ladder[level_index]
+        target_krw_amount = self.total_seed_krw * (target_ratio / 100.0)
+        needed_krw = target_krw_amount - self.current_krw_spent
+
+        if needed_krw > settings.MIN_TRADE_KRW_AMOUNT:
+            
+            if getattr(settings, 'IS_SIMULATION', False):
+                final_krw_amount = needed_krw
+            else:
+                final_krw_amount = min(needed_krw, krw_balance)
+
+            if final_krw_amount > settings.MIN_TRADE_KRW_AMOUNT:
+                self.logger.info(f"@매수 신호@ 편차 {deviation_level}% 이하 ({deviation_percent:.2f}%). 목표 {target_ratio}%. 주문액: {final_krw_amount:,.0f} KRW")
+                return final_krw_amount
+            else:
+                # 잔고 부족 등으로 실제 주문 가능 금액이 적을 때
+                self.logger.info(f"[SKIP] 매수 조건 만족했으나 KRW 잔고 부족. (주문가능액: {final_krw_amount:,.0f} < 최소주문액)")
+        else:
+            # 이미 목표 비중만큼 매수했을 때
+            self.logger.info(f"[SKIP] 이미 목표 비중({target_ratio}%) 달성 완료. (추가 매수 불필요)")
         return 0
 
     def _determine_sell_amount(self, current_price_usd: float, symbol_balance: float, sell_trend_price: float, current_time_ms: int):
@@ -115,7 +160,7 @@ class TrendlineStrategy(BaseStrategy):
             current_profit_pct = (current_price_usd - self.avg_buy_price) / self.avg_buy_price * 100.0
             
             if current_profit_pct <= self.sell_stop_loss_ratio:
-                print(f"[손절매] 수익률 {current_profit_pct:.2f}% 도달 (기준: {self.sell_stop_loss_ratio}%). 전량 매도.")
+                self.logger.info(f"[손절매] 수익률 {current_profit_pct:.2f}% 도달 (기준: {self.sell_stop_loss_ratio}%). 전량 매도.")
                 return symbol_balance
 
         # 2. 매도 유효기간 체크
@@ -129,42 +174,58 @@ class TrendlineStrategy(BaseStrategy):
         # 분할 매도를 쓴다면, 이탈했다고 바로 팔지 않고 아래의 '분할 매도 플랜'을 따릅니다.
         if not self.sell_partial_enabled:
             if current_price_usd < sell_trend_price:
-                 print(f"📉 [이탈 매도] 매도 추세선 하향 이탈 ({sell_trend_price:.2f} > {current_price_usd:.2f}). 전량 매도.")
+                 self.logger.info(f"📉 [이탈 매도] 매도 추세선 하향 이탈 ({sell_trend_price:.2f} > {current_price_usd:.2f}). 전량 매도.")
                  return symbol_balance
 
         # 4. 분할 매도 (Partial Sell) 로직
         if self.sell_partial_enabled:
             deviation_percent = (current_price_usd - sell_trend_price) / sell_trend_price * 100.0
             
-            for i, (target_deviation, target_ratio_percent) in enumerate(self.sell_plan):
+            # 이미 실행한 단계 이후의 단계 중 현재 편차에서 발동한 단계만 확인
+            for i in self.sell_ladder.triggered_range(deviation_percent):
                 if i <= self.last_sell_step_index:
                     continue
                 
-                if deviation_percent >= target_deviation:
-                    prev_ratio = self.sell_plan[i-1][1] if i > 0 else 0
-                    current_ratio_step = target_ratio_percent - prev_ratio
-                    
-                    sell_amount = self.max_holdings * (current_ratio_step / 100.0)
-                    sell_amount = min(sell_amount, symbol_balance)
-                    
-                    if sell_amount >= settings.MIN_USDT_TO_TRADE:
-                        print(f"💸 [익절 신호] 매도선 편차 {target_deviation}% 돌파 ({deviation_percent:.2f}%). 비중 {current_ratio_step}% 매도.")
-                        self.last_sell_step_index = i 
-                        return sell_amount
+                target_deviation, target_ratio_percent = self.sell_ladder[i]
+                prev_ratio = self.sell_ladder.ratios[i-1] if i > 0 else 0
+                current_ratio_step = target_ratio_percent - prev_ratio
+                
+                sell_amount = self.max_holdings * (current_ratio_step / 100.0)
+                sell_amount = min(sell_amount, symbol_balance)
+                
+                if sell_amount >= settings.MIN_USDT_TO_TRADE:
+                    self.logger.info(f"💸 [익절 신호] 매도선 편차 {target_deviation}% 돌파 ({deviation_percent:.2f}%). 비중 {current_ratio_step}% 매도.")
+                    self.last_sell_step_index = i 
+                    return sell_amount
 
         return 0
 
+    def on_fill(self, fill):
+        """매수 체결 시 추정 평단가/투입 금액을 실제 체결 금액(수수료 포함)으로 교정합니다."""
+        context = fill.context
+        if fill.action != 'BUY' or fill.executed_volume <= 0 or not context.get('krw_per_usd'):
+            return
+
+        cost_krw = fill.executed_funds + fill.paid_fee
+        self.current_krw_spent += cost_krw - fill.requested_amount
+
+        balance_before = context['balance_before']
+        total_qty = balance_before + fill.executed_volume
+        old_value_usd = balance_before * context['avg_before']
+        self.avg_buy_price = (old_value_usd + cost_krw / context['krw_per_usd']) / total_qty
+        self.logger.info(f"[체결 반영] 평균 체결가 {fill.avg_price:,.0f} KRW | 평단가(USD) ${self.avg_buy_price:,.2f}")
+
     def determine_action_and_amount(self, current_data: dict, krw_balance: float, symbol_balance: float):
         """메인 실행 함수"""
         
-        price_key = f"{self.symbol.lower()}_usdt_price"
-        current_symbol_price_usd = current_data.get(price_key)
-        usdt_krw_price = current_data.get('usdt_krw_price')
+        self.last_order_context = {}
+        current_symbol_price_usd = current_data.get(self.price_slot)
+        usdt_krw_price = current_data.get(USDT_KRW_PRICE)
 
         if current_symbol_price_usd is None or usdt_krw_price is None:
             return 'WAIT', None, 0
             
-        current_time_ms = floor(time.time() * 1000)
+        current_time_ms = self.now_ms(current_data)
         
         # 포지션 최대 보유량 및 초기화 로직
         if symbol_balance > self.max_holdings:
@@ -185,7 +246,7 @@ class TrendlineStrategy(BaseStrategy):
         # 💡 [모니터링] 매도 라인 상태 출력 (포지션이 있을 때만)
         if symbol_balance >= settings.MIN_USDT_TO_TRADE:
             sell_dev_percent = (current_symbol_price_usd - sell_trend_price) / sell_trend_price * 100.0
-            print(f"  [매도 감시] 기준가: ${sell_trend_price:,.2f} | 현재가: ${current_symbol_price_usd:,.2f} | 편차: {sell_dev_percent:+.2f}%")
+            self.logger.info(f"[매도 감시] 기준가: ${sell_trend_price:,.2f} | 현재가: ${current_symbol_price_usd:,.2f} | 편차: {sell_dev_percent:+.2f}%")
 
         sell_amount = self._determine_sell_amount(current_symbol_price_usd, symbol_balance, sell_trend_price, current_time_ms)
         
@@ -206,7 +267,7 @@ class TrendlineStrategy(BaseStrategy):
 
         # [모니터링] 매수 라인 - 💡 여기 하나만 출력됩니다 (중복 방지)
         buy_dev_percent = (current_symbol_price_usd - buy_trend_price) / buy_trend_price * 100.0
-        print(f"  @매수 감시@ 기준가: ${buy_trend_price:,.2f} | 현재가: ${current_symbol_price_usd:,.2f} | 편차: {buy_dev_percent:+.2f}%")
+        self.logger.info(f"@매수 감시@ 기준가: ${buy_trend_price:,.2f} | 현재가: ${current_symbol_price_usd:,.2f} | 편차: {buy_dev_percent:+.2f}%")
 
         krw_to_buy = self._determine_buy_amount(current_symbol_price_usd, krw_balance, buy_trend_price)
 
@@ -217,6 +278,13 @@ class TrendlineStrategy(BaseStrategy):
             buy_usd_value = krw_to_buy / usdt_krw_price
             approx_buy_qty = buy_usd_value / current_symbol_price_usd
             
+            # 체결 확인 후 on_fill에서 실제 체결가로 다시 계산하기 위해 주문 전 상태를 남김
+            self.last_order_context = {
+                'balance_before': symbol_balance,
+                'avg_before': self.avg_buy_price,
+                'krw_per_usd': usdt_krw_price,
+            }
+
             total_qty = symbol_balance + approx_buy_qty
             if total_qty > 0:
                 # 가중 평균: (기존총액USD + 신규매수액USD) / 총수량
@@ -1,14 +1,28 @@
 # 파일명: strategies/USDT_kimchipremium.py
+from core.market_snapshot import (KIMCHI_PREMIUM, KIMCHI_PREMIUM_VWAP_BUY, KIMCHI_PREMIUM_VWAP_SELL, USDT_PRICE,
+                                  USDT_KRW_PRICE, field_name)
 from strategies.base_strategy import BaseStrategy
+from strategies.level_ladder import LevelLadder, TRIGGER_BELOW, TRIGGER_ABOVE
 from config import settings
 
+# 매매 판단에 쓸 김프 (params PREMIUM_INPUT)
+PREMIUM_INPUT_LAST = "LAST" # 업비트 체결가 기준 김프 (기본값)
+PREMIUM_INPUT_VWAP = "VWAP" # 호가창을 실제 주문 금액/수량만큼 소진했을 때의 평균 체결가 기준 김프
+
 class KimchiPremiumStrategy(BaseStrategy):
     """
     단계별 분할 매수/매도 (그리드) 전략 엔진입니다.
+
+    PREMIUM_INPUT이 "VWAP"이면 호가창 기준 김프로 판단합니다.
+    - 재평가 트리거와 매도 기준 설정에는 시장 데이터의 기준 금액 VWAP 김프(kimchi_premium_vwap_buy/sell)를 사용
+    - 주문량은 체결가 기준 김프로 정한 주문량만큼 호가를 소진한 김프로 다시 계산 (김프가 불리해지면 발동 레벨이 줄어듦)
+    호가창이 없는 틱은 체결가 기준 김프를 그대로 사용합니다.
     """
 
-    def __init__(self, strategy_config: dict):
-        super().__init__(strategy_config)
+    STATE_FIELDS = ('total_usdt_base_for_sell', 'total_usdt_sold', 'is_sell_base_set')
+
+    def __init__(self, strategy_config: dict, clock=None):
+        super().__init__(strategy_config, clock)
         
         # --- 상태 관리 변수 초기화 ---
         self.total_usdt_base_for_sell = 0.0 
@@ -16,13 +30,55 @@ class KimchiPremiumStrategy(BaseStrategy):
         self.is_sell_base_set = False 
 
         # --- 파라미터 로드 ---
-        self.buy_levels = self.params['BUY_LEVELS']
-        self.sell_levels = self.params['SELL_LEVELS']
+        # 설정 순서와 관계없이 초기화 시 한 번만 정렬/검증된 레벨 사다리
+        self.buy_ladder = LevelLadder(self.params['BUY_LEVELS'], TRIGGER_BELOW, name=f"{self.name} BUY_LEVELS")
+        self.sell_ladder = LevelLadder(self.params['SELL_LEVELS'], TRIGGER_ABOVE, name=f"{self.name} SELL_LEVELS")
         self.total_seed_krw = self.params['TOTAL_TRADE_SEED_KRW']
         self.reset_threshold = self.params['SELL_BASE_RESET_THRESHOLD']
+        self.premium_input = self.params.get('PREMIUM_INPUT', PREMIUM_INPUT_LAST).upper()
+        if self.premium_input not in (PREMIUM_INPUT_LAST, PREMIUM_INPUT_VWAP):
+            raise ValueError(f"{self.name}: 알 수 없는 PREMIUM_INPUT {self.premium_input}")
         
-        print(f"✅ {self.name} 전략 초기화 완료 (심볼: {self.symbol})")
-
+        self.logger.info(f"✅ {self.name} 전략 초기화 완료 (심볼: {self.symbol})")
+
+
+    def get_trigger_key(self):
+        return field_name(self._premium_slot())
+
+    def _premium_slot(self) -> int:
+        """다음 판단이 의존하는 김프 필드 (VWAP 모드에서는 매도 기준 설정 전: 매수 쪽, 후: 매도 쪽)"""
+        if self.premium_input == PREMIUM_INPUT_LAST:
+            return KIMCHI_PREMIUM
+        return KIMCHI_PREMIUM_VWAP_SELL if self.is_sell_base_set else KIMCHI_PREMIUM_VWAP_BUY
+
+    def _input_premium(self, current_data, slot: int):
+        """slot의 김프 (VWAP 김프가 없으면 체결가 기준 김프)"""
+        premium = current_data.get(slot)
+        return premium if premium is not None else current_data.get(KIMCHI_PREMIUM)
+
+    def has_significant_change(self, old_value: float, new_value: float) -> bool:
+        # 김프는 이미 % 단위이므로 절대 변화량(%p)으로 비교
+        return abs(new_value - old_value) > settings.EVENT_KIMP_CHANGE_THRESHOLD
+
+    def get_trigger_bounds(self, current_data: dict):
+        kimchi_premium = current_data.get(self._premium_slot())
+        if kimchi_premium is None:
+            return None
+        trigger_values = [self.reset_threshold]
+        trigger_values += [level for level in self.buy_ladder.bounds(kimchi_premium) if level is not None]
+        trigger_values += [level for level in self.sell_ladder.bounds(kimchi_premium) if level is not None]
+        return self._nearest_bounds(kimchi_premium, trigger_values)
+
+    def batch_keys(self, columns: dict):
+        if self.premium_input != PREMIUM_INPUT_LAST:
+            return None # VWAP 김프는 주문량에 따라 달라지므로 모든 행 평가
+        from strategies.batch_bands import kimchi_band_keys
+        return kimchi_band_keys(self, columns)
+
+    def next_batch_candidate(self, columns: dict, start: int, stop: int, krw_balance: float, symbol_balance: float) -> int:
+        # 같은 밴드 안에서도 USDT 가격이 내려가 보유 가치가 목표 비중에 못 미치면 매수
+        from strategies.batch_bands import first_kimchi_buy_row
+        return first_kimchi_buy_row(self, columns, start, stop, krw_balance, symbol_balance)
 
     def _manage_sell_base(self, kimchi_premium: float, current_usdt_balance: float):
         """매도 시 기준이 되는 총 잔고(self.total_usdt_base_for_sell)를 관리합니다."""
@@ -39,7 +95,7 @@ class KimchiPremiumStrategy(BaseStrategy):
             self.total_usdt_base_for_sell = current_usdt_balance
             self.total_usdt_sold = 0.0 
             self.is_sell_base_set = True
-            print(f"  [기준 설정] 매도 기준 김프({self.reset_threshold}%) 돌파. 총 잔고 기준: {self.total_usdt_base_for_sell:.4f} USDT로 설정.")
+            self.logger.info(f"[기준 설정] 매도 기준 김프({self.reset_threshold}%) 돌파. 총 잔고 기준: {self.total_usdt_base_for_sell:.4f} USDT로 설정.")
 
 
     def _determine_buy_amount(self, kimchi_premium: float, current_usdt_balance: float, usdt_price: float):
@@ -47,19 +103,19 @@ class KimchiPremiumStrategy(BaseStrategy):
         
         krw_to_buy = 0 
         
-        # 1. 현재 김프 레벨 찾기 (김프가 낮아질수록 비중이 커짐)
-        for kimp_level, target_ratio in self.buy_levels:
-            if kimchi_premium <= kimp_level:
-                target_krw_amount = self.total_seed_krw * (target_ratio / 100.0)
-                current_usdt_krw_value = current_usdt_balance * usdt_price
+        # 1. 현재 김프에서 발동한 레벨 중 목표 비중이 작은 것부터 확인 (김프가 낮아질수록 비중이 커짐)
+        for level_index in self.buy_ladder.triggered_by_ratio(kimchi_premium):
+            kimp_level, target_ratio = self.buy_ladder[level_index]
+            target_krw_amount = self.total_seed_krw * (target_ratio / 100.0)
+            current_usdt_krw_value = current_usdt_balance * usdt_price
+            
+            if current_usdt_krw_value < target_krw_amount:
+                needed_krw = target_krw_amount - current_usdt_krw_value
+                krw_to_buy = needed_krw
                 
-                if current_usdt_krw_value < target_krw_amount:
-                    needed_krw = target_krw_amount - current_usdt_krw_value
-                    krw_to_buy = needed_krw
-                    
-                    # 최소 주문 금액 체크는 determine_action_and_amount에서 수행
-                    print(f"  [매수 레벨] 김프 {kimp_level}% 이하 도달. 시드 목표 {target_ratio}%. 매수 필요: {needed_krw:,.0f} KRW")
-                    return max(0, krw_to_buy) 
+                # 최소 주문 금액 체크는 determine_action_and_amount에서 수행
+                self.logger.info(f"[매수 레벨] 김프 {kimp_level}% 이하 도달. 시드 목표 {target_ratio}%. 매수 필요: {needed_krw:,.0f} KRW")
+                return max(0, krw_to_buy) 
                 
         return 0 
 
@@ -71,32 +127,54 @@ class KimchiPremiumStrategy(BaseStrategy):
 
         usdt_to_sell = 0.0
         
-        # 1. 현재 김프 레벨 찾기 (김프가 높아질수록 비중이 커짐)
-        for kimp_level, target_ratio in self.sell_levels:
-            if kimchi_premium >= kimp_level:
-                target_usdt_sold = self.total_usdt_base_for_sell * (target_ratio / 100.0)
-                needed_to_sell = target_usdt_sold - self.total_usdt_sold
-                
-                if needed_to_sell > settings.MIN_USDT_TO_TRADE:
-                    usdt_to_sell = needed_to_sell
-                    print(f"  [매도 레벨] 김프 {kimp_level}% 이상 도달. 총 잔고 목표 {target_ratio}%. 매도 필요: {needed_to_sell:.4f} USDT")
-                    return max(0.0, usdt_to_sell)
+        # 1. 현재 김프에서 발동한 레벨 중 목표 비중이 작은 것부터 확인 (김프가 높아질수록 비중이 커짐)
+        for level_index in self.sell_ladder.triggered_by_ratio(kimchi_premium):
+            kimp_level, target_ratio = self.sell_ladder[level_index]
+            target_usdt_sold = self.total_usdt_base_for_sell * (target_ratio / 100.0)
+            needed_to_sell = target_usdt_sold - self.total_usdt_sold
+            
+            if needed_to_sell > settings.MIN_USDT_TO_TRADE:
+                usdt_to_sell = needed_to_sell
+                self.logger.info(f"[매도 레벨] 김프 {kimp_level}% 이상 도달. 총 잔고 목표 {target_ratio}%. 매도 필요: {needed_to_sell:.4f} USDT")
+                return max(0.0, usdt_to_sell)
                 
         return 0.0
 
 
+    def _vwap_premium(self, current_data, action: str, amount: float):
+        """
+        주문 금액(매수, KRW)/수량(매도, USDT)만큼 KRW-USDT 호가를 소진했을 때의 평균 체결가 기준 김프
+
+        :return: 김프 (%) 또는 호가창/환율이 없거나 잔량이 부족하면 None
+        """
+        book = (current_data.get('orderbooks') or {}).get("KRW-USDT")
+        exchange_rate = current_data.get(USDT_KRW_PRICE)
+        if book is None or not exchange_rate:
+            return None
+        vwap = book.vwap_buy_krw(amount) if action == 'BUY' else book.vwap_sell_volume(amount)
+        if vwap is None:
+            return None
+        return (vwap / exchange_rate - 1) * 100
+
+    def on_fill(self, fill):
+        """매도 체결 시 누적 매도 수량을 주문 수량이 아닌 실제 체결 수량으로 교정합니다."""
+        if fill.action != 'SELL' or not self.is_sell_base_set:
+            return
+        self.total_usdt_sold += fill.executed_volume - fill.requested_amount
+        self.logger.info(f"[체결 반영] 매도 체결 {fill.executed_volume:.4f} USDT @ {fill.avg_price:,.2f}원 | 누적 매도 {self.total_usdt_sold:.4f} USDT")
+
     def determine_action_and_amount(self, current_data: dict, krw_balance: float, symbol_balance: float):
         """
         메인 진입점: BaseStrategy의 추상 메서드 구현
         """
         
         # 1. 데이터 추출
-        kimchi_premium = current_data.get('kimchi_premium')
-        usdt_price = current_data.get('usdt_price') # 업비트 현재가
+        kimchi_premium = current_data.get(KIMCHI_PREMIUM)
+        usdt_price = current_data.get(USDT_PRICE) # 업비트 현재가
         
         # 환율 정보 가져오기 (ExternalData에서 계산 시 사용된 환율 역산 가능하지만, 명시적으로 가져오는 게 좋음)
         # main.py에서 usdt_krw_price 키로 환율을 넘겨주고 있음
-        exchange_rate = current_data.get('usdt_krw_price') 
+        exchange_rate = current_data.get(USDT_KRW_PRICE)
 
         if kimchi_premium is None or usdt_price is None:
             return 'WAIT', None, 0
@@ -105,16 +183,26 @@ class KimchiPremiumStrategy(BaseStrategy):
         # 글로벌 기준가(KRW) 계산 = 환율 * 1.0 (USDT는 $1 고정 가정)
         global_price_krw = exchange_rate * 1.0 if exchange_rate else 0
         
-        print(f"  @매수 감시@ 기준가(환율): {global_price_krw:,.2f}원 | 현재가: {usdt_price:,.0f}원 | 김프: {kimchi_premium:+.2f}%")
+        self.logger.info(f"@매수 감시@ 기준가(환율): {global_price_krw:,.2f}원 | 현재가: {usdt_price:,.0f}원 | 김프: {kimchi_premium:+.2f}%")
 
         current_usdt_balance = symbol_balance 
 
-        # 2. 매도 기준 잔고 관리
-        self._manage_sell_base(kimchi_premium, current_usdt_balance)
+        use_vwap = self.premium_input == PREMIUM_INPUT_VWAP
+
+        # 2. 매도 기준 잔고 관리 (VWAP 모드: 기준 금액 매도 VWAP 김프)
+        base_premium = self._input_premium(current_data, KIMCHI_PREMIUM_VWAP_SELL) if use_vwap else kimchi_premium
+        self._manage_sell_base(base_premium, current_usdt_balance)
 
         # 3. 매도 시그널 체크
         if self.is_sell_base_set:
             usdt_to_sell = self._determine_sell_amount(kimchi_premium)
+
+            if use_vwap and usdt_to_sell > settings.MIN_USDT_TO_TRADE:
+                # 실제 매도 수량으로 호가를 소진한 김프로 다시 판단
+                order_premium = self._vwap_premium(current_data, 'SELL', usdt_to_sell)
+                if order_premium is not None and order_premium < kimchi_premium:
+                    self.logger.info(f"[VWAP 김프] {usdt_to_sell:.4f} USDT 매도 시 김프 {order_premium:+.3f}% (체결가 기준 {kimchi_premium:+.3f}%)")
+                    usdt_to_sell = self._determine_sell_amount(order_premium)
             
             if usdt_to_sell > settings.MIN_USDT_TO_TRADE:
                 self.total_usdt_sold += usdt_to_sell
@@ -123,11 +211,20 @@ class KimchiPremiumStrategy(BaseStrategy):
         # 4. 매수 시그널 체크
         elif not self.is_sell_base_set: 
             krw_to_buy = self._determine_buy_amount(kimchi_premium, current_usdt_balance, usdt_price)
+
+            order_krw = min(krw_to_buy, krw_balance)
+            if use_vwap and order_krw > settings.MIN_TRADE_KRW_AMOUNT:
+                # 실제 주문 금액으로 호가를 소진한 김프로 다시 판단
+                order_premium = self._vwap_premium(current_data, 'BUY', order_krw)
+                if order_premium is not None and order_premium > kimchi_premium:
+                    self.logger.info(f"[VWAP 김프] {order_krw:,.0f} KRW 매수 시 김프 {order_premium:+.3f}% (체결가 기준 {kimchi_premium:+.3f}%)")
+                    krw_to_buy = self._determine_buy_amount(order_premium, current_usdt_balance, usdt_price)
             
             if krw_to_buy > settings.MIN_TRADE_KRW_AMOUNT:
                 final_krw_amount = min(krw_to_buy, krw_balance)
                 
                 if final_krw_amount > settings.MIN_TRADE_KRW_AMOUNT:
+
                     # 매수 진입 시 매도 기준 초기화
                     self.total_usdt_base_for_sell = 0.0
                     self.total_usdt_sold = 0.0
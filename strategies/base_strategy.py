@@ -1,19 +1,62 @@
 # 파일명: strategies/base_strategy.py
+import logging
 from abc import ABC, abstractmethod
 import datetime
+from config import settings
+from core.clock import SYSTEM_CLOCK, StepClock
+from core.market_snapshot import ColumnRowView
+from execution.order_splitter import split_market_order
+
+# evaluate_batch 결과의 행별 판단 코드 (ACTION_NAMES[코드] -> 'WAIT' / 'BUY' / 'SELL')
+ACTION_NAMES = ('WAIT', 'BUY', 'SELL')
+ACTION_CODES = {name: code for code, name in enumerate(ACTION_NAMES)}
+
+
+class BatchDecisions:
+    """evaluate_batch 결과 (행별 판단 코드/주문량 배열과 실제로 전략을 호출한 행 수)"""
+
+    def __init__(self, actions, amounts, evaluated_rows: int):
+        self.actions = actions               # int8[n], ACTION_CODES 값 (판단하지 않고 건너뛴 행은 WAIT)
+        self.amounts = amounts               # float64[n], 매수는 원화 금액, 매도는 수량
+        self.evaluated_rows = evaluated_rows
+
+    def signal_rows(self):
+        """매수/매도 판단이 나온 행 인덱스"""
+        return self.actions.nonzero()[0]
+
+    def __len__(self):
+        return len(self.actions)
+
 
 class BaseStrategy(ABC):
     """모든 자동매매 전략의 기본 클래스입니다."""
+
+    # 재시작 후에도 유지되어야 하는 상태 변수 이름 (storage/state_journal.py 에서 저장/복원)
+    STATE_FIELDS = ()
     
     # 👇 중요: 이 __init__ 함수가 class 내부로 들여쓰기 되어 있어야 합니다.
-    def __init__(self, strategy_config: dict):
+    def __init__(self, strategy_config: dict, clock=None):
         self.config = strategy_config
         self.name = strategy_config.get('name', 'Unknown Strategy')
         self.symbol = strategy_config.get('symbol', 'UNKNOWN')
         self.exchange = strategy_config.get('exchange', 'UPBIT')
         self.params = strategy_config.get('params', {})
+        self.market_code = f"KRW-{self.symbol}" # 업비트 마켓 코드 (호가창 조회용)
+        # 현재 시각은 이 시계로 조회 (실거래: 실제 시간, 리플레이: 가상 시계, 백테스트: 행 시각)
+        self.clock = clock or SYSTEM_CLOCK
+        # 전략 로그에는 전략 이름을 구조화 필드로 붙임 (monitoring/log.py의 반복 메시지 제한도 전략별로 적용)
+        self.logger = logging.LoggerAdapter(logging.getLogger(type(self).__module__), {"strategy": self.name})
         self.current_krw_spent = 0.0 # 자산 관리 및 수익률 계산에 필수
+        self.last_order_context = {} # 마지막 주문 판단 시점의 정보 (체결 반영 시 Fill.context로 돌려받음)
         
+    def now_ms(self, current_data: dict = None) -> int:
+        """시장 데이터의 수집 시각(timestamp_ms)을 우선 사용하고, 없으면 전략 시계의 현재 시각 (ms)"""
+        if current_data is not None:
+            timestamp_ms = current_data.get('timestamp_ms')
+            if timestamp_ms is not None:
+                return int(timestamp_ms)
+        return self.clock.time_ms()
+
     # 날짜-밀리초 변환 헬퍼 함수
     def _convert_date_to_ms(self, date_str: str) -> int:
         try:
@@ -21,12 +64,148 @@ class BaseStrategy(ABC):
             timestamp_sec = datetime.datetime(dt_object.year, dt_object.month, dt_object.day, 0, 0, 0, tzinfo=datetime.timezone.utc).timestamp()
             return int(timestamp_sec * 1000)
         except ValueError as e:
-            print(f"[FATAL ERROR] 날짜 형식 오류 ({date_str}): {e}")
+            self.logger.critical(f"날짜 형식 오류 ({date_str}): {e}")
             return 0
     
+    # ---------------------------------------------------------
+    # 상태 저장/복원 훅 (storage/state_journal.py 에서 사용)
+    # ---------------------------------------------------------
+    def get_state(self) -> dict:
+        """STATE_FIELDS에 해당하는 현재 상태를 JSON으로 저장 가능한 dict로 반환합니다."""
+        return {field: getattr(self, field) for field in self.STATE_FIELDS}
+
+    def restore_state(self, state: dict):
+        """저장된 상태를 복원합니다. (STATE_FIELDS에 없는 키는 무시)"""
+        for field in self.STATE_FIELDS:
+            if field in state:
+                setattr(self, field, state[field])
+
+    def on_fill(self, fill):
+        """
+        주문의 실제 체결 결과(execution/order_tracker.py 의 Fill)를 상태에 반영합니다.
+        기본 구현은 아무것도 하지 않습니다.
+        """
+        pass
+
+    def plan_child_orders(self, action: str, amount: float, current_data: dict) -> list:
+        """
+        호가창 기준 예상 슬리피지가 전략의 MAX_SLIPPAGE_PCT를 넘으면 주문을 자식 주문으로 나눕니다.
+
+        :return: 자식 주문 크기 목록 (호가창이 없거나 나눌 필요가 없으면 [amount])
+        """
+        book = (current_data.get('orderbooks') or {}).get(self.market_code)
+        max_slippage_pct = self.params.get('MAX_SLIPPAGE_PCT', settings.ORDER_MAX_SLIPPAGE_PCT)
+        if action == 'BUY':
+            min_amount = settings.MIN_TRADE_KRW_AMOUNT
+        else:
+            # 매도 자식 주문도 최소 주문 금액 이상이 되도록 최우선 매수 호가로 수량 환산
+            best_bid = book.best_bid if book is not None else None
+            min_amount = max(settings.MIN_USDT_TO_TRADE, settings.MIN_TRADE_KRW_AMOUNT / best_bid if best_bid else 0.0)
+        return split_market_order(book, action, amount, max_slippage_pct, min_amount)
+
+    # ---------------------------------------------------------
+    # 이벤트 기반 스케줄링 훅 (core/scheduler.py 에서 사용)
+    # ---------------------------------------------------------
+    def get_trigger_key(self):
+        """재평가 여부를 판단할 입력 데이터 키를 반환합니다. None이면 매번 평가합니다."""
+        return None
+
+    def get_trigger_bounds(self, current_data: dict):
+        """
+        판단 결과가 바뀌지 않는 입력값 구간 (lower, upper)을 반환합니다.
+        입력값이 lower 이하 또는 upper 이상이 되면 즉시 재평가합니다. (모르면 None)
+        """
+        return None
+
+    def has_significant_change(self, old_value: float, new_value: float) -> bool:
+        """입력값이 재평가가 필요할 만큼 변했는지 판단합니다. (기본: 상대 변화율 기준)"""
+        if old_value == 0:
+            return new_value != 0
+        return abs(new_value - old_value) / abs(old_value) * 100.0 > settings.EVENT_PRICE_CHANGE_THRESHOLD_PCT
+
+    @staticmethod
+    def _nearest_bounds(value: float, trigger_values):
+        """trigger_values 중 value 바로 아래/위 값을 (lower, upper)로 반환합니다."""
+        lower = max((v for v in trigger_values if v < value), default=None)
+        upper = min((v for v in trigger_values if v > value), default=None)
+        return lower, upper
+
+    # ---------------------------------------------------------
+    # 일괄 평가 (backtest/engine.py, 파라미터 탐색에서 사용)
+    # ---------------------------------------------------------
+    def batch_keys(self, columns: dict):
+        """
+        행별 판단 구간 키(int64 배열)를 반환합니다. 키가 같은 연속 구간에서는 상태와 잔고가 그대로이면
+        판단이 바뀌지 않아야 합니다. None이면 모든 행을 평가합니다.
+        """
+        return None
+
+    def next_batch_candidate(self, columns: dict, start: int, stop: int, krw_balance: float, symbol_balance: float) -> int:
+        """
+        키가 같은 구간 [start, stop) 안에서도 판단이 바뀔 수 있는 첫 행 (손절가 도달 등, 없으면 stop)
+        """
+        return stop
+
+    def evaluate_batch(self, columns: dict, krw_balance: float = 0.0, symbol_balance: float = 0.0,
+                       on_order=None) -> BatchDecisions:
+        """
+        {컬럼명: numpy 배열} 형식의 시계열 전체를 한 번에 평가합니다. (backtest/data_loader.py 형식)
+
+        행마다 determine_action_and_amount를 호출한 것과 같은 결과와 상태 변화를 내지만, batch_keys가 바뀌는 행,
+        next_batch_candidate가 알려 준 행, 직전 행에서 주문/상태 변화가 있었던 행만 실제로 전략을 호출합니다.
+        (로그는 그대로 출력되므로 대량 평가 시에는 monitoring.log.silenced()로 감쌀 것)
+
+        :param on_order: 주문 판단이 나온 행에서 호출할 함수 (index, action, amount) -> (원화 잔고, 심볼 잔고) 또는
+                         체결되지 않았으면 None. 없으면 잔고는 처음 값 그대로 유지됩니다.
+        """
+        import numpy as np
+
+        row_count = len(columns['timestamp_ms'])
+        actions = np.zeros(row_count, dtype=np.int8)
+        amounts = np.zeros(row_count)
+        keys = self.batch_keys(columns)
+        change_points = np.flatnonzero(np.diff(keys)) + 1 if keys is not None else None
+        step_clock = self.clock if isinstance(self.clock, StepClock) else None
+        rows = ColumnRowView(columns) # 평가하는 행마다 같은 MarketSnapshot을 다시 채워 전달
+
+        evaluated_rows = 0
+        index = 0
+        force_evaluate = True
+        while index < row_count:
+            if not force_evaluate and change_points is not None:
+                # 다음 키 변경 지점(또는 구간 안의 후보 행)까지는 판단이 같으므로 건너뜀
+                position = int(np.searchsorted(change_points, index, side='left'))
+                stop = int(change_points[position]) if position < len(change_points) else row_count
+                index = self.next_batch_candidate(columns, index, stop, krw_balance, symbol_balance)
+                if index >= row_count:
+                    break
+
+            if step_clock is not None:
+                step_clock.set_time_ms(columns['timestamp_ms'][index])
+            state = self.get_state()
+            action, _, amount = self.determine_action_and_amount(rows.at(index), krw_balance, symbol_balance)
+            evaluated_rows += 1
+
+            # 주문을 냈거나 상태가 바뀌었으면 다음 행도 반드시 다시 평가
+            force_evaluate = self.get_state() != state
+            if action in ('BUY', 'SELL') and amount > 0:
+                actions[index] = ACTION_CODES[action]
+                amounts[index] = amount
+                force_evaluate = True
+                if on_order is not None:
+                    balances = on_order(index, action, amount)
+                    if balances is not None:
+                        krw_balance, symbol_balance = balances
+            index += 1
+
+        return BatchDecisions(actions, amounts, evaluated_rows)
+
     @abstractmethod
     def determine_action_and_amount(self, current_data: dict, krw_balance: float, symbol_balance: float):
         """
         주어진 시장 데이터와 잔고를 기반으로 매매 행동을 결정합니다.
+
+        current_data는 MarketSnapshot(core/market_snapshot.py)입니다. get(슬롯 번호) 또는 get("필드 이름")으로 조회하며,
+        다음 틱에 재사용되므로 평가가 끝난 뒤에도 필요한 값은 따로 복사해 둘 것.
         """
         pass
\ No newline at end of file
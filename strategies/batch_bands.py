@@ -0,0 +1,132 @@
+# 파일명: strategies/batch_bands.py
+"""
+전략의 일괄 평가(BaseStrategy.evaluate_batch)에 쓰는 벡터화 계산입니다.
+전략 판단과 같은 식을 numpy로 전체 시계열에 한 번에 적용해, 판단이 바뀔 수 있는 행(밴드 키 변경 지점,
+구간 안의 손절/매수 후보 행)을 찾습니다. 실거래 기동 시 numpy를 불러오지 않도록 전략에서는 필요할 때만 import합니다.
+"""
+import numpy as np
+from config import settings
+
+# 밴드 키 조합 시 각 자리의 크기 (레벨 개수가 이보다 작아야 함)
+BAND_RADIX = 64
+
+
+def trendline_prices(timestamp_ms: np.ndarray, slope: float, t1: int, p1: float) -> np.ndarray:
+    """전체 시계열의 추세선 가격을 한 번에 계산합니다. (TrendlineStrategy._calculate_trendline_price와 동일)"""
+    timestamp_ms = np.asarray(timestamp_ms, dtype=np.float64)
+    return np.where(timestamp_ms < t1, p1, slope * (timestamp_ms - t1) + p1)
+
+
+def deviation_percent(price: np.ndarray, trend_price: np.ndarray) -> np.ndarray:
+    """추세선 대비 가격 편차 (%)"""
+    return (price - trend_price) / trend_price * 100.0
+
+
+def kimchi_premium(usdt_price: np.ndarray, exchange_rate: np.ndarray, global_usdt_price_usd: float = 1.0) -> np.ndarray:
+    """전체 시계열의 김치 프리미엄 (%)"""
+    return (usdt_price / (global_usdt_price_usd * exchange_rate) - 1) * 100
+
+
+def below_level_band(values: np.ndarray, levels) -> np.ndarray:
+    """
+    '값 <= 레벨' 조건으로 발동하는 레벨(매수)의 밴드 번호를 계산합니다.
+    밴드 번호는 값보다 작은 레벨의 개수이며, 값이 레벨을 하향 돌파하면 밴드 번호가 바뀝니다.
+    """
+    return np.searchsorted(np.sort(np.asarray(levels, dtype=np.float64)), values, side='left')
+
+
+def above_level_band(values: np.ndarray, levels) -> np.ndarray:
+    """'값 >= 레벨' 조건으로 발동하는 레벨(매도)의 밴드 번호 (값 이하인 레벨의 개수)"""
+    return np.searchsorted(np.sort(np.asarray(levels, dtype=np.float64)), values, side='right')
+
+
+def _missing(columns: dict, name: str, row_count: int) -> np.ndarray:
+    """행별 값 누락 여부 (컬럼 자체가 없으면 모든 행 누락)"""
+    values = columns.get(name)
+    return np.isnan(values) if values is not None else np.ones(row_count, dtype=bool)
+
+
+def _combine(*parts) -> np.ndarray:
+    key = np.zeros(len(parts[0][0]), dtype=np.int64)
+    for band, radix in parts:
+        key = key * radix + band.astype(np.int64)
+    return key
+
+
+def trendline_band_keys(strategy, columns: dict) -> np.ndarray:
+    """
+    TrendlineStrategy의 판단에 영향을 주는 모든 조건(매수 레벨 밴드, 매도 플랜 밴드,
+    매도선 이탈 여부, 매수/매도 유효기간)을 하나의 정수 키로 묶어 행별로 계산합니다.
+    키가 같은 연속 구간에서는 (잔고/손절 변화가 없다면) 전략의 판단이 바뀌지 않습니다.
+    """
+    timestamp_ms = columns['timestamp_ms']
+    price = columns[strategy.price_key]
+
+    buy_trend = trendline_prices(timestamp_ms, strategy.buy_slope, strategy.buy_t1, strategy.buy_p1)
+    sell_trend = trendline_prices(timestamp_ms, strategy.sell_slope, strategy.sell_t1, strategy.sell_p1)
+    buy_deviation = deviation_percent(price, buy_trend)
+    sell_deviation = deviation_percent(price, sell_trend)
+
+    buy_band = below_level_band(buy_deviation, strategy.buy_ladder.levels)
+    sell_band = above_level_band(sell_deviation, strategy.sell_ladder.levels)
+
+    return _combine(
+        (buy_band, BAND_RADIX),
+        (sell_band, BAND_RADIX),
+        (price < sell_trend, 2),
+        (timestamp_ms < strategy.buy_valid_end_ms, 2),
+        (timestamp_ms < strategy.sell_valid_end_ms, 2),
+        (np.isnan(price), 2),
+        (_missing(columns, 'usdt_krw_price', len(price)), 2),
+    )
+
+
+def kimchi_band_keys(strategy, columns: dict) -> np.ndarray:
+    """KimchiPremiumStrategy의 매수/매도 레벨 밴드와 매도 기준 설정 임계값 돌파 여부를 정수 키로 묶습니다."""
+    premium = columns['kimchi_premium']
+
+    buy_band = below_level_band(premium, strategy.buy_ladder.levels)
+    sell_band = above_level_band(premium, strategy.sell_ladder.levels)
+
+    return _combine(
+        (buy_band, BAND_RADIX),
+        (sell_band, BAND_RADIX),
+        (premium >= strategy.reset_threshold, 2),
+        (np.isnan(premium), 2),
+        (_missing(columns, 'usdt_price', len(premium)), 2),
+    )
+
+
+def first_stop_loss_row(strategy, columns: dict, start: int, stop: int) -> int:
+    """[start, stop) 중 손절 조건(수익률 <= SELL_STOP_LOSS_RATIO)을 처음 만족하는 행 (없으면 stop)"""
+    avg_buy_price = strategy.avg_buy_price
+    if avg_buy_price <= 0 or stop <= start:
+        return stop
+    price = columns[strategy.price_key][start:stop]
+    # _determine_sell_amount와 같은 식으로 계산 (경계값에서도 행별 평가와 같은 결과)
+    hits = np.flatnonzero((price - avg_buy_price) / avg_buy_price * 100.0 <= strategy.sell_stop_loss_ratio)
+    return start + int(hits[0]) if len(hits) else stop
+
+
+def first_kimchi_buy_row(strategy, columns: dict, start: int, stop: int,
+                         krw_balance: float, symbol_balance: float) -> int:
+    """
+    김프 밴드가 같은 구간 [start, stop) 중 KimchiPremiumStrategy가 매수할 첫 행 (없으면 stop).
+    보유 USDT의 원화 가치(잔고 x 업비트 가격)를 _determine_buy_amount와 같은 순서로 목표 금액과 비교합니다.
+    """
+    premium = columns['kimchi_premium'][start]
+    if strategy.is_sell_base_set or stop <= start or premium != premium or 'usdt_price' not in columns:
+        return stop
+    triggered = strategy.buy_ladder.triggered_by_ratio(float(premium))
+    if not triggered:
+        return stop
+
+    # 목표 비중이 작은 레벨부터 '보유 가치 < 목표 금액'인 첫 레벨의 부족분을 매수
+    targets = np.array([strategy.total_seed_krw * (strategy.buy_ladder.ratios[i] / 100.0) for i in triggered])
+    value = symbol_balance * columns['usdt_price'][start:stop]
+    position = np.searchsorted(targets, value, side='right')
+    found = position < len(targets)
+    needed = targets[np.minimum(position, len(targets) - 1)] - value
+    buy = found & (needed > settings.MIN_TRADE_KRW_AMOUNT) & (np.minimum(needed, krw_balance) > settings.MIN_TRADE_KRW_AMOUNT)
+    hits = np.flatnonzero(buy)
+    return start + int(hits[0]) if len(hits) else stop
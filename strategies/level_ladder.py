@@ -0,0 +1,78 @@
+# 파일명: strategies/level_ladder.py
+from bisect import bisect_left, bisect_right
+
+TRIGGER_BELOW = "below" # 값 <= 레벨 일 때 발동 (매수 레벨: 낮을수록 비중 큼)
+TRIGGER_ABOVE = "above" # 값 >= 레벨 일 때 발동 (매도 레벨: 높을수록 비중 큼)
+
+
+class LevelLadder:
+    """
+    [(레벨, 목표 비중 %), ...] 설정을 전략 초기화 시 한 번만 정렬/검증해 둔 레벨 사다리입니다.
+
+    매 틱마다 정렬하거나 전체를 선형 탐색하는 대신 bisect로 '현재 값이 어느 밴드에 있는지'와
+    '바로 위/아래 발동 레벨'을 찾습니다. 설정의 입력 순서와 관계없이 레벨 오름차순으로 보관합니다.
+    """
+
+    def __init__(self, levels, trigger: str, name: str = "levels"):
+        if trigger not in (TRIGGER_BELOW, TRIGGER_ABOVE):
+            raise ValueError(f"{name}: 알 수 없는 발동 방향 {trigger}")
+
+        pairs = sorted((level, ratio) for level, ratio in levels)
+        self.name = name
+        self.trigger = trigger
+        self.levels = tuple(level for level, _ in pairs)
+        self.ratios = tuple(ratio for _, ratio in pairs)
+        self._validate()
+
+    def _validate(self):
+        """레벨은 중복 없이 증가해야 하며, 목표 비중은 발동 방향으로 갈수록 커져야 합니다."""
+        for i in range(1, len(self.levels)):
+            if self.levels[i] == self.levels[i - 1]:
+                raise ValueError(f"{self.name}: 중복된 레벨 {self.levels[i]}")
+
+            if self.trigger == TRIGGER_BELOW and self.ratios[i] > self.ratios[i - 1]:
+                raise ValueError(f"{self.name}: 레벨이 낮을수록 목표 비중이 커야 합니다 "
+                                 f"({self.levels[i - 1]}: {self.ratios[i - 1]}% / {self.levels[i]}: {self.ratios[i]}%)")
+            if self.trigger == TRIGGER_ABOVE and self.ratios[i] < self.ratios[i - 1]:
+                raise ValueError(f"{self.name}: 레벨이 높을수록 목표 비중이 커야 합니다 "
+                                 f"({self.levels[i - 1]}: {self.ratios[i - 1]}% / {self.levels[i]}: {self.ratios[i]}%)")
+
+    def __len__(self):
+        return len(self.levels)
+
+    def __getitem__(self, index: int):
+        return self.levels[index], self.ratios[index]
+
+    def triggered_range(self, value: float) -> range:
+        """value에서 발동한 레벨들의 인덱스 범위 (레벨 오름차순 인덱스)"""
+        if self.trigger == TRIGGER_BELOW:
+            return range(bisect_left(self.levels, value), len(self.levels))
+        return range(0, bisect_right(self.levels, value))
+
+    def triggered_by_ratio(self, value: float) -> range:
+        """발동한 레벨들의 인덱스를 목표 비중이 작은 것부터 순서대로 반환합니다."""
+        triggered = self.triggered_range(value)
+        if self.trigger == TRIGGER_BELOW:
+            return triggered[::-1]
+        return triggered
+
+    def deepest_triggered(self, value: float):
+        """발동한 레벨 중 목표 비중이 가장 큰 레벨의 인덱스 (없으면 None)"""
+        triggered = self.triggered_range(value)
+        if not triggered:
+            return None
+        return triggered[0] if self.trigger == TRIGGER_BELOW else triggered[-1]
+
+    def next_trigger_down(self, value: float):
+        """value보다 작은 레벨 중 가장 가까운 레벨 (없으면 None)"""
+        index = bisect_left(self.levels, value)
+        return self.levels[index - 1] if index > 0 else None
+
+    def next_trigger_up(self, value: float):
+        """value보다 큰 레벨 중 가장 가까운 레벨 (없으면 None)"""
+        index = bisect_right(self.levels, value)
+        return self.levels[index] if index < len(self.levels) else None
+
+    def bounds(self, value: float):
+        """(아래 발동 레벨, 위 발동 레벨). 이 구간 안에서는 발동 레벨 집합이 바뀌지 않습니다."""
+        return self.next_trigger_down(value), self.next_trigger_up(value)
@@ -0,0 +1,148 @@
+# 파일명: strategies/registry.py
+import importlib
+import logging
+import threading
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# 패키지 메타데이터로 전략을 등록할 때 사용하는 entry point 그룹
+# 예) pyproject.toml: [project.entry-points."upbit_bot.strategies"] MY_GRID = "my_pkg.grid:MyGridStrategy"
+ENTRY_POINT_GROUP = "upbit_bot.strategies"
+
+# 기본 제공 전략 (strategy_type -> "모듈:클래스"), 실제 import는 처음 사용할 때 수행
+BUILTIN_STRATEGIES = {
+    "KIMP_GRID": "strategies.USDT_kimchipremium:KimchiPremiumStrategy",
+    "TRENDLINE": "strategies.TrendlineStrategy:TrendlineStrategy",
+}
+
+_targets = dict(BUILTIN_STRATEGIES)
+_classes = {}
+_entry_points_loaded = False
+_lock = threading.Lock()
+
+
+def register_strategy(strategy_type: str, target):
+    """
+    전략을 등록합니다.
+
+    :param target: 전략 클래스 또는 "패키지.모듈:클래스" 경로 문자열 (문자열이면 처음 사용할 때 import)
+    """
+    with _lock:
+        _classes.pop(strategy_type, None)
+        if isinstance(target, str):
+            _targets[strategy_type] = target
+        else:
+            _targets[strategy_type] = f"{target.__module__}:{target.__qualname__}"
+            _classes[strategy_type] = target
+
+
+def available_strategies() -> list:
+    """등록된 strategy_type 목록 (entry point 포함, import 하지 않음)"""
+    _load_entry_points()
+    with _lock:
+        return sorted(set(_targets) | set(settings.STRATEGY_PLUGINS))
+
+
+def get_strategy_class(strategy_type: str):
+    """
+    strategy_type에 해당하는 전략 클래스를 반환합니다. 해당 전략 모듈은 이때 처음 import됩니다.
+
+    찾는 순서: register_strategy / 기본 제공 전략 -> settings.STRATEGY_PLUGINS -> entry point
+    -> strategy_type 자체가 "모듈:클래스" 경로인 경우
+
+    :return: 전략 클래스 또는 찾을 수 없으면 None
+    """
+    with _lock:
+        strategy_class = _classes.get(strategy_type)
+    if strategy_class is not None:
+        return strategy_class
+
+    target = _resolve_target(strategy_type)
+    if target is None:
+        logger.error(f"등록되지 않은 전략 유형입니다: {strategy_type}")
+        return None
+
+    try:
+        strategy_class = _import_target(target)
+    except (ImportError, AttributeError, ValueError) as e:
+        logger.error(f"전략 {strategy_type} ({target}) 로드 실패: {e}")
+        return None
+
+    with _lock:
+        _classes[strategy_type] = strategy_class
+    return strategy_class
+
+
+def create_strategy(strategy_config: dict, clock=None):
+    """
+    strategy_config로 전략 인스턴스를 생성합니다.
+
+    :param clock: 전략이 현재 시각 조회에 쓸 시계 (core/clock.py, None이면 실제 시간)
+    :return: 전략 인스턴스 또는 전략 클래스를 찾을 수 없으면 None
+    """
+    strategy_class = get_strategy_class(strategy_config["strategy_type"])
+    if strategy_class is None:
+        return None
+    strategy = strategy_class(strategy_config)
+    if clock is not None:
+        # 생성자 인자 형식이 다른 플러그인 전략도 있으므로 생성 후 속성으로 주입
+        strategy.clock = clock
+    return strategy
+
+
+def _resolve_target(strategy_type: str):
+    with _lock:
+        target = _targets.get(strategy_type)
+    if target is not None:
+        return target
+
+    target = settings.STRATEGY_PLUGINS.get(strategy_type)
+    if target is not None:
+        return target
+
+    _load_entry_points()
+    with _lock:
+        target = _targets.get(strategy_type)
+    if target is not None:
+        return target
+
+    if ":" in strategy_type:
+        return strategy_type
+    return None
+
+
+def _load_entry_points():
+    """설치된 패키지의 전략 entry point를 한 번만 읽습니다. (로드는 하지 않고 경로만 등록)"""
+    global _entry_points_loaded
+    if _entry_points_loaded:
+        return
+
+    # importlib.metadata는 설치 패키지 목록을 훑으므로 기본 전략만 쓰는 경우에는 import하지 않음
+    from importlib.metadata import entry_points
+
+    try:
+        discovered = entry_points(group=ENTRY_POINT_GROUP)
+    except Exception as e:
+        logger.warning(f"전략 entry point 조회 실패: {e}")
+        discovered = []
+
+    with _lock:
+        for entry_point in discovered:
+            _targets.setdefault(entry_point.name, entry_point.value)
+        _entry_points_loaded = True
+
+
+def _import_target(target: str):
+    """"패키지.모듈:클래스" (또는 "패키지.모듈.클래스") 경로의 객체를 import합니다."""
+    if ":" in target:
+        module_name, _, attr_path = target.partition(":")
+    else:
+        module_name, _, attr_path = target.rpartition(".")
+    if not module_name or not attr_path:
+        raise ValueError(f"잘못된 전략 경로: {target}")
+
+    obj = importlib.import_module(module_name)
+    for attr in attr_path.split("."):
+        obj = getattr(obj, attr)
+    return obj